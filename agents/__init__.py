@@ -1,3 +1,6 @@
-from .openai_agent import OpenAIAgent
+from .openai_agent import OpenAIAgent, EventCallback
+from .mcp_manager import MCPSessionManager, MCPToolError
+from .model_router import ModelRouter
+from .tool_cache import MCPResultCache
 
-__all__ = ["OpenAIAgent"]
+__all__ = ["OpenAIAgent", "EventCallback", "MCPSessionManager", "MCPToolError", "ModelRouter", "MCPResultCache"]
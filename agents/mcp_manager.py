@@ -0,0 +1,295 @@
+import asyncio
+import itertools
+import logging
+import os
+import re
+import shlex
+from datetime import timedelta
+from typing import Any, Dict, List, Optional
+
+from mcp import ClientSession, StdioServerParameters
+from mcp.client.stdio import stdio_client
+
+logger = logging.getLogger(__name__)
+
+# 도구 오류 문구에서 API 한도 초과 / 재시도 대기 시간 판별 (Brave: "Rate limit exceeded", 429, X-RateLimit-Reset)
+_RATE_LIMIT_PATTERN = re.compile(r"rate[ -]?limit|too many requests|\b429\b", re.IGNORECASE)
+_RETRY_AFTER_PATTERN = re.compile(
+    r"(?:retry[ -]after|x-ratelimit-reset)\D{0,5}(\d+(?:\.\d+)?)", re.IGNORECASE
+)
+
+
+class MCPToolError(RuntimeError):
+    """
+    도구가 오류 결과(isError=True)를 반환 - 오류 문구가 검색 결과로 캐시/분석되지 않도록 예외로 전달
+
+    업스트림(검색 API) 장애로 보아 재시도 / 서킷 브레이커 집계 대상이며,
+    한도 초과 문구에 대기 시간이 있으면 retry_after(초)로 전달합니다.
+    """
+
+    def __init__(self, tool_name: str, message: str):
+        super().__init__(f"{tool_name} 도구 오류: {message}")
+        self.tool_name = tool_name
+        self.message = message
+        self.rate_limited = bool(_RATE_LIMIT_PATTERN.search(message))
+        match = _RETRY_AFTER_PATTERN.search(message) if self.rate_limited else None
+        self.retry_after: Optional[float] = float(match.group(1)) if match else None
+
+
+class MCPServerProcess:
+    """
+    상시 실행되는 MCP stdio 서버 프로세스 하나와 그 세션
+
+    stdio_client / ClientSession 컨텍스트는 진입한 태스크에서 종료되어야 하므로
+    전용 러너 태스크가 프로세스 수명 동안 컨텍스트를 유지합니다.
+    """
+
+    def __init__(self, name: str, params: StdioServerParameters):
+        self.name = name
+        self.params = params
+        self.session: Optional[ClientSession] = None
+        self.in_flight = 0  # 현재 처리 중인 도구 호출 수
+        self._ready = asyncio.Event()
+        self._stop = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self._error: Optional[BaseException] = None
+
+    @property
+    def healthy(self) -> bool:
+        """세션이 살아 있는지 여부"""
+        return self.session is not None and self._task is not None and not self._task.done()
+
+    async def start(self, timeout: float):
+        """서버 프로세스 시작 및 세션 초기화 완료까지 대기"""
+        self._ready.clear()
+        self._stop.clear()
+        self._error = None
+        self._task = asyncio.create_task(self._run(), name=f"mcp:{self.name}")
+
+        try:
+            await asyncio.wait_for(self._ready.wait(), timeout)
+        except asyncio.TimeoutError:
+            await self.stop()
+            raise TimeoutError(f"MCP 서버 시작 시간 초과 ({self.name})")
+
+        if not self.healthy:
+            raise RuntimeError(f"MCP 서버 시작 실패 ({self.name}): {self._error}")
+
+    async def _run(self):
+        """프로세스 수명 동안 stdio/세션 컨텍스트 유지"""
+        try:
+            async with stdio_client(self.params) as (read, write):
+                async with ClientSession(read, write) as session:
+                    await session.initialize()
+                    self.session = session
+                    self._ready.set()
+                    await self._stop.wait()
+        except Exception as e:
+            self._error = e
+            logger.warning("[MCP] 서버 종료됨 (%s): %s", self.name, e)
+        finally:
+            self.session = None
+            self._ready.set()
+
+    async def stop(self):
+        """세션 종료 및 프로세스 정리"""
+        self._stop.set()
+        if self._task and not self._task.done():
+            try:
+                # 시간 초과 시 wait_for가 러너 태스크를 취소함
+                await asyncio.wait_for(self._task, 5)
+            except asyncio.TimeoutError:
+                pass
+        self.session = None
+
+    async def ping(self, timeout: float) -> bool:
+        """헬스체크 (MCP ping 요청)"""
+        if not self.healthy:
+            return False
+        try:
+            await asyncio.wait_for(self.session.send_ping(), timeout)
+            return True
+        except Exception:
+            return False
+
+
+class MCPSessionManager:
+    """
+    상시 실행 MCP 서버 풀 관리자
+
+    - 애플리케이션 시작(lifespan) 시 서버 프로세스를 미리 띄워 요청 경로에서 프로세스 기동 비용 제거
+    - 주기적인 ping 헬스체크 및 비정상 프로세스 자동 재시작
+    - 세마포어로 전체 동시 도구 호출 수 제한, 가장 한가한 프로세스로 분배
+    """
+
+    def __init__(
+        self,
+        name: str,
+        params: StdioServerParameters,
+        pool_size: int = 2,
+        max_concurrency: int = 8,
+        health_interval: float = 30.0,
+        start_timeout: float = 60.0,
+        call_timeout: float = 30.0,
+    ):
+        self.name = name
+        self.params = params
+        self.health_interval = health_interval
+        self.start_timeout = start_timeout
+        self.call_timeout = call_timeout
+        self.servers = [MCPServerProcess(f"{name}-{i}", params) for i in range(max(1, pool_size))]
+        self.tools: List[Dict[str, Any]] = []  # OpenAI function calling 형식 도구 목록
+        self._semaphore = asyncio.Semaphore(max(1, max_concurrency))
+        self._health_task: Optional[asyncio.Task] = None
+        self._restart_locks = {server.name: asyncio.Lock() for server in self.servers}
+        self._round_robin = itertools.count()
+        self._background: set[asyncio.Task] = set()  # 재시작 태스크 참조 유지
+
+    @classmethod
+    def brave_search_from_env(cls) -> Optional["MCPSessionManager"]:
+        """
+        BRAVE_API_KEY 및 MCP_* 환경 변수로 Brave Search 서버 풀 생성 (키가 없으면 None)
+
+        BRAVE_MCP_COMMAND / BRAVE_MCP_ARGS로 실행 명령을 바꿀 수 있습니다 (벤치마크용 스텁 서버 등).
+        """
+        api_key = os.getenv("BRAVE_API_KEY")
+        if not api_key:
+            return None
+
+        params = StdioServerParameters(
+            command=os.getenv("BRAVE_MCP_COMMAND", "npx"),
+            args=shlex.split(os.getenv("BRAVE_MCP_ARGS", "-y @modelcontextprotocol/server-brave-search")),
+            env={"BRAVE_API_KEY": api_key},
+        )
+        return cls(
+            "brave-search",
+            params,
+            pool_size=int(os.getenv("MCP_POOL_SIZE", "2")),
+            max_concurrency=int(os.getenv("MCP_MAX_CONCURRENCY", "8")),
+            health_interval=float(os.getenv("MCP_HEALTH_INTERVAL", "30")),
+        )
+
+    @property
+    def started(self) -> bool:
+        return self._health_task is not None
+
+    async def start(self):
+        """모든 서버 프로세스를 동시에 기동하고 도구 목록 로드"""
+        results = await asyncio.gather(
+            *(server.start(self.start_timeout) for server in self.servers),
+            return_exceptions=True,
+        )
+        for server, result in zip(self.servers, results):
+            if isinstance(result, BaseException):
+                logger.error("[MCP] 서버 기동 실패 (%s): %s", server.name, result)
+
+        healthy = [server for server in self.servers if server.healthy]
+        if not healthy:
+            raise RuntimeError(f"MCP 서버를 하나도 시작하지 못했습니다 ({self.name})")
+
+        tools_list = await healthy[0].session.list_tools()
+        self.tools = [
+            {
+                "type": "function",
+                "function": {
+                    "name": tool.name,
+                    "description": tool.description or "",
+                    "parameters": tool.inputSchema,
+                },
+            }
+            for tool in tools_list.tools
+        ]
+
+        self._health_task = asyncio.create_task(self._health_loop(), name=f"mcp-health:{self.name}")
+        logger.info("[MCP] %s 서버 풀 시작 (%d/%d개 정상)", self.name, len(healthy), len(self.servers))
+
+    async def stop(self):
+        """헬스체크 중단 및 모든 서버 프로세스 종료"""
+        if self._health_task:
+            self._health_task.cancel()
+            try:
+                await self._health_task
+            except asyncio.CancelledError:
+                pass
+            self._health_task = None
+
+        await asyncio.gather(*(server.stop() for server in self.servers), return_exceptions=True)
+        self.tools = []
+
+    async def call_tool(self, tool_name: str, arguments: Dict[str, Any]) -> str:
+        """
+        가장 한가한 정상 서버로 도구 호출
+
+        Args:
+            tool_name: MCP 도구 이름
+            arguments: 도구 인자
+
+        Returns:
+            도구 결과 텍스트 (content의 text 항목을 줄바꿈으로 연결)
+
+        Raises:
+            MCPToolError: 도구가 오류 결과(isError=True)를 반환한 경우 (API 한도 초과, 업스트림 오류 등)
+        """
+        async with self._semaphore:
+            server = self._pick_server()
+            if server is None:
+                raise RuntimeError(f"사용 가능한 MCP 서버가 없습니다 ({self.name})")
+
+            server.in_flight += 1
+            try:
+                result = await server.session.call_tool(
+                    tool_name,
+                    arguments,
+                    read_timeout_seconds=timedelta(seconds=self.call_timeout),
+                )
+            except Exception:
+                # 프로세스 이상일 수 있으므로 백그라운드에서 점검/재시작
+                task = asyncio.create_task(self._check_and_restart(server))
+                self._background.add(task)
+                task.add_done_callback(self._background.discard)
+                raise
+            finally:
+                server.in_flight -= 1
+
+        contents = []
+        for content in result.content:
+            if hasattr(content, "text"):
+                contents.append(content.text)
+        text = "\n".join(contents)
+        if result.isError:
+            raise MCPToolError(tool_name, text)
+        return text
+
+    def _pick_server(self) -> Optional[MCPServerProcess]:
+        """정상 서버 중 처리 중인 호출이 가장 적은 서버 선택 (동률이면 라운드로빈)"""
+        healthy = [server for server in self.servers if server.healthy]
+        if not healthy:
+            return None
+        offset = next(self._round_robin) % len(healthy)
+        rotated = healthy[offset:] + healthy[:offset]
+        return min(rotated, key=lambda server: server.in_flight)
+
+    async def _health_loop(self):
+        """주기적으로 각 서버를 ping 하고 응답이 없으면 재시작"""
+        while True:
+            await asyncio.sleep(self.health_interval)
+            await asyncio.gather(
+                *(self._check_and_restart(server) for server in self.servers),
+                return_exceptions=True,
+            )
+
+    async def _check_and_restart(self, server: MCPServerProcess):
+        """서버 상태 확인 후 비정상이면 재시작 (서버별 중복 재시작 방지)"""
+        lock = self._restart_locks[server.name]
+        if lock.locked():
+            return
+        async with lock:
+            if await server.ping(timeout=5):
+                return
+            logger.warning("[MCP] 서버 응답 없음, 재시작 (%s)", server.name)
+            await server.stop()
+            try:
+                await server.start(self.start_timeout)
+                logger.info("[MCP] 서버 재시작 완료 (%s)", server.name)
+            except Exception as e:
+                logger.error("[MCP] 서버 재시작 실패 (%s): %s", server.name, e)
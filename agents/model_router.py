@@ -0,0 +1,158 @@
+"""
+단계별 모델 선택 (모델 티어링 + 지연 시간 기반 대체 모델)
+
+단계:
+    symbol: 기업명 → 티커 변환 (짧은 응답, 작은 모델로 충분)
+    tool_round: 웹 검색 도구 호출 라운드 (어떤 검색을 할지 결정)
+    analysis: 최종 분석 답변 생성
+
+단계마다 주 모델의 응답 시간을 EWMA로 추적하고, 기준을 넘으면 쿨다운 동안 대체 모델을 사용합니다.
+쿨다운이 끝나면 주 모델을 다시 시도하여 회복 여부를 판단합니다.
+
+환경 변수 (단계명 대문자: SYMBOL / TOOL_ROUND / ANALYSIS):
+    OPENAI_MODEL: 기본 모델 (기본 gpt-5, analysis 단계 기본값)
+    OPENAI_MODEL_<단계>: 단계별 모델 (symbol 기본 gpt-5-mini, tool_round 기본 analysis 모델)
+    OPENAI_REASONING_EFFORT_<단계>: 단계별 reasoning_effort (symbol 기본 minimal, 빈 값이면 전달하지 않음)
+    OPENAI_FALLBACK_MODEL_<단계>: 대체 모델 (빈 값이면 대체하지 않음)
+    OPENAI_FALLBACK_REASONING_EFFORT_<단계>: 대체 모델의 reasoning_effort (기본: 전달하지 않음 - 비추론 모델 호환)
+    OPENAI_FALLBACK_LATENCY_<단계>: 대체 전환 기준 EWMA 응답 시간(초)
+    OPENAI_FALLBACK_COOLDOWN_SECONDS: 대체 모델 사용 시간 (기본 300초)
+"""
+import logging
+import os
+import time
+from dataclasses import dataclass
+from typing import Dict, Optional
+
+from utils.metrics import MODEL_FALLBACKS
+
+logger = logging.getLogger(__name__)
+
+STAGES = ("symbol", "tool_round", "analysis")
+
+_DEFAULT_FALLBACK_LATENCY = {"symbol": 5.0, "tool_round": 30.0, "analysis": 60.0}
+
+
+@dataclass
+class StageModel:
+    """단계별 모델 설정과 주 모델 응답 시간 상태"""
+
+    primary: str
+    fallback: Optional[str] = None
+    latency_threshold: float = 60.0
+    reasoning_effort: Optional[str] = None
+    fallback_reasoning_effort: Optional[str] = None
+    ewma: Optional[float] = None
+    degraded_until: float = 0.0
+
+
+class ModelRouter:
+    """
+    단계별 모델 선택기
+
+    사용 예시:
+        router = ModelRouter.from_env()
+        model = router.select("symbol")
+        options = router.options("symbol", model)
+        ...
+        router.observe("symbol", model, elapsed)
+    """
+
+    def __init__(self, stages: Dict[str, StageModel], alpha: float = 0.3, cooldown: float = 300.0):
+        """
+        Args:
+            stages: 단계명 → StageModel
+            alpha: EWMA 가중치 (최근 관측값 비중)
+            cooldown: 대체 모델 사용 시간 (초)
+        """
+        self.stages = stages
+        self.alpha = alpha
+        self.cooldown = cooldown
+
+    @classmethod
+    def from_env(cls) -> "ModelRouter":
+        """환경 변수로 단계별 모델 구성"""
+        default_model = os.getenv("OPENAI_MODEL", "gpt-5")
+        analysis_model = os.getenv("OPENAI_MODEL_ANALYSIS") or default_model
+        primaries = {
+            "symbol": os.getenv("OPENAI_MODEL_SYMBOL") or "gpt-5-mini",
+            "tool_round": os.getenv("OPENAI_MODEL_TOOL_ROUND") or analysis_model,
+            "analysis": analysis_model,
+        }
+        stages = {}
+        for stage in STAGES:
+            key = stage.upper()
+            default_effort = "minimal" if stage == "symbol" else ""
+            stages[stage] = StageModel(
+                primary=primaries[stage],
+                fallback=os.getenv(f"OPENAI_FALLBACK_MODEL_{key}") or None,
+                latency_threshold=float(
+                    os.getenv(f"OPENAI_FALLBACK_LATENCY_{key}", str(_DEFAULT_FALLBACK_LATENCY[stage]))
+                ),
+                reasoning_effort=os.getenv(f"OPENAI_REASONING_EFFORT_{key}", default_effort) or None,
+                fallback_reasoning_effort=os.getenv(f"OPENAI_FALLBACK_REASONING_EFFORT_{key}") or None,
+            )
+        return cls(stages, cooldown=float(os.getenv("OPENAI_FALLBACK_COOLDOWN_SECONDS", "300")))
+
+    def model(self, stage: str) -> str:
+        """단계의 주 모델"""
+        return self.stages[stage].primary
+
+    def select(self, stage: str) -> str:
+        """현재 사용할 모델 (주 모델 지연 시간이 기준을 넘은 쿨다운 중이면 대체 모델)"""
+        config = self.stages[stage]
+        if config.fallback and config.degraded_until:
+            if time.monotonic() < config.degraded_until:
+                MODEL_FALLBACKS.inc(stage=stage)
+                return config.fallback
+            # 쿨다운 종료 - 이전 측정값을 버리고 주 모델 재시도
+            config.degraded_until = 0.0
+            config.ewma = None
+            logger.info("[MODEL] %s 단계 주 모델 %s 재시도", stage, config.primary)
+        return config.primary
+
+    def options(self, stage: str, model: Optional[str] = None) -> Dict[str, str]:
+        """
+        단계별 추가 요청 인자 (reasoning_effort)
+
+        Args:
+            stage: 단계명
+            model: 실제로 호출할 모델 (대체 모델이면 대체 모델용 설정 사용, 기본: 주 모델)
+        """
+        config = self.stages[stage]
+        uses_fallback = model is not None and model != config.primary and model == config.fallback
+        effort = config.fallback_reasoning_effort if uses_fallback else config.reasoning_effort
+        return {"reasoning_effort": effort} if effort else {}
+
+    def observe(self, stage: str, model: str, elapsed: float):
+        """
+        응답 시간 기록 (주 모델만 추적, 시간 초과도 경과 시간으로 기록)
+
+        Args:
+            stage: 단계명
+            model: 호출한 모델
+            elapsed: 응답 시간 (초)
+        """
+        config = self.stages.get(stage)
+        if config is None or model != config.primary:
+            return
+        config.ewma = elapsed if config.ewma is None else self.alpha * elapsed + (1 - self.alpha) * config.ewma
+        if config.fallback and not config.degraded_until and config.ewma > config.latency_threshold:
+            config.degraded_until = time.monotonic() + self.cooldown
+            logger.warning(
+                "[MODEL] %s 단계 %s 응답 지연 (EWMA %.2fs > %.2fs) - %.0f초 동안 %s 사용",
+                stage, config.primary, config.ewma, config.latency_threshold, self.cooldown, config.fallback,
+            )
+
+    def stats(self) -> Dict[str, Dict[str, Optional[object]]]:
+        """단계별 모델 / 지연 시간 상태"""
+        now = time.monotonic()
+        return {
+            stage: {
+                "model": config.primary,
+                "fallback": config.fallback,
+                "latency_ewma": round(config.ewma, 3) if config.ewma is not None else None,
+                "degraded": bool(config.degraded_until and now < config.degraded_until),
+            }
+            for stage, config in self.stages.items()
+        }
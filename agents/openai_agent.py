@@ -1,129 +1,491 @@
+import logging
 import os
 import json
 import asyncio
-from typing import List, Dict, Any, Optional
-from openai import OpenAI
+import time
+from email.utils import parsedate_to_datetime
+from typing import Awaitable, Callable, List, Dict, Any, Optional
+import openai
+from openai import AsyncOpenAI
+from openai.types.chat import ChatCompletion, ChatCompletionMessage
+from openai.types.chat.chat_completion import Choice
+from openai.types.chat.chat_completion_message_function_tool_call import (
+    ChatCompletionMessageFunctionToolCall,
+    Function,
+)
 from dotenv import load_dotenv
-from mcp import ClientSession, StdioServerParameters
-from mcp.client.stdio import stdio_client
-from config import get_search_instruction
+from mcp.shared.exceptions import McpError
+from mcp.types import INVALID_PARAMS, METHOD_NOT_FOUND
+from .mcp_manager import MCPSessionManager, MCPToolError
+from .model_router import ModelRouter
+from .prompts import ANALYSIS, ANALYSIS_WITH_SEARCH, SYMBOL_RESOLVE, PromptCacheStats, PromptTemplate
+from .tool_cache import MCPResultCache
+from utils import CircuitBreaker, CircuitOpenError, Deadline, RetryPolicy, hedged
+from utils.metrics import (
+    FORCED_FINAL_ANSWERS,
+    OPENAI_COST,
+    OPENAI_REQUEST_DURATION,
+    OPENAI_TOKENS,
+    TOOL_CALLS,
+    TOOL_CALLS_PER_ANALYSIS,
+    TOOL_ROUNDS_PER_ANALYSIS,
+    span,
+)
 
 # 환경 변수 로드
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
+# 진행 이벤트 콜백: (이벤트 이름, 데이터) - 스트리밍 응답(SSE)에 사용
+EventCallback = Callable[[str, Dict[str, Any]], Awaitable[None]]
+
+_RECOMMENDATION_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "action": {"type": "string", "enum": ["BUY", "SELL", "HOLD"]},
+        "reason": {"type": "string"},
+    },
+    "required": ["action", "reason"],
+    "additionalProperties": False,
+}
+
+# 모델별 단가 (USD / 100만 토큰: 입력, 캐시 적중 입력, 출력) - OPENAI_PRICE_*는 분석 모델 단가를 덮어씀
+MODEL_PRICES = {
+    "gpt-5": (1.25, 0.125, 10.0),
+    "gpt-5-mini": (0.25, 0.025, 2.0),
+    "gpt-5-nano": (0.05, 0.005, 0.4),
+}
+
+# 구조화 출력 스키마 (models.StockAnalysisResult와 동일한 구조, strict 모드)
+ANALYSIS_RESPONSE_FORMAT = {
+    "type": "json_schema",
+    "json_schema": {
+        "name": "stock_analysis",
+        "strict": True,
+        "schema": {
+            "type": "object",
+            "properties": {
+                "short_term": _RECOMMENDATION_SCHEMA,
+                "mid_term": _RECOMMENDATION_SCHEMA,
+                "long_term": _RECOMMENDATION_SCHEMA,
+                "analysis": {"type": "string"},
+            },
+            "required": ["short_term", "mid_term", "long_term", "analysis"],
+            "additionalProperties": False,
+        },
+    },
+}
+
+
+def _is_transient_openai_error(error: BaseException) -> bool:
+    """재시도 / 서킷 집계 대상 OpenAI 오류 (연결 오류, 429, 5xx - 요청 오류와 할당량 소진은 제외)"""
+    if isinstance(error, openai.APIConnectionError):
+        return True
+    if isinstance(error, openai.APIStatusError):
+        if error.status_code == 429:
+            return getattr(error, "code", None) != "insufficient_quota"
+        return error.status_code in (408, 409) or error.status_code >= 500
+    return False
+
+
+def _openai_retry_after(error: BaseException) -> Optional[float]:
+    """OpenAI 오류 응답의 Retry-After(초) (retry-after-ms / 초 / HTTP 날짜 형식)"""
+    if not isinstance(error, openai.APIStatusError):
+        return None
+    headers = error.response.headers
+    try:
+        if headers.get("retry-after-ms"):
+            return float(headers["retry-after-ms"]) / 1000
+        value = headers.get("retry-after")
+        if not value:
+            return None
+        try:
+            return float(value)
+        except ValueError:
+            return parsedate_to_datetime(value).timestamp() - time.time()
+    except (TypeError, ValueError):
+        return None
+
+
+def _is_transient_mcp_error(error: BaseException) -> bool:
+    """
+    재시도 / 서킷 집계 대상 MCP 오류
+
+    전송 오류와 도구 오류 결과(isError - 한도 초과, 검색 API 오류)는 포함하고,
+    잘못된 도구명/인자 오류는 제외합니다.
+    """
+    if isinstance(error, McpError):
+        return error.error.code not in (INVALID_PARAMS, METHOD_NOT_FOUND)
+    return True
+
+
+def _mcp_retry_after(error: BaseException) -> Optional[float]:
+    """도구 한도 초과 오류 문구의 재시도 대기 시간(초)"""
+    if isinstance(error, MCPToolError) and error.rate_limited:
+        return error.retry_after
+    return None
+
 
 class OpenAIAgent:
     """OpenAI GPT-5와 MCP를 통합한 에이전트"""
 
     def __init__(self):
-        self.client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
-        self.model = "gpt-5"
-        self.mcp_sessions: Dict[str, ClientSession] = {}
-        self.mcp_tools: List[Dict[str, Any]] = []
+        # 비동기 클라이언트: 모델 응답을 기다리는 동안 이벤트 루프를 막지 않음
+        # 재시도는 아래 RetryPolicy가 담당 (SDK 내장 재시도 비활성화)
+        self.client = AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY"), max_retries=0)
+        # OpenAI / MCP 재시도(지수 백오프 + jitter, Retry-After 준수)와 서킷 브레이커
+        self.openai_retry = RetryPolicy(
+            "openai",
+            max_attempts=int(os.getenv("OPENAI_RETRY_ATTEMPTS", "3")),
+            base_delay=float(os.getenv("OPENAI_RETRY_BASE_DELAY", "0.5")),
+            max_delay=float(os.getenv("OPENAI_RETRY_MAX_DELAY", "8")),
+            retry_after=_openai_retry_after,
+        )
+        self.openai_breaker = CircuitBreaker(
+            "openai",
+            failure_threshold=int(os.getenv("OPENAI_CIRCUIT_FAILURES", "5")),
+            recovery_timeout=float(os.getenv("OPENAI_CIRCUIT_RECOVERY_SECONDS", "30")),
+        )
+        self.mcp_retry = RetryPolicy(
+            "mcp",
+            max_attempts=int(os.getenv("MCP_RETRY_ATTEMPTS", "2")),
+            base_delay=float(os.getenv("MCP_RETRY_BASE_DELAY", "0.2")),
+            max_delay=float(os.getenv("MCP_RETRY_MAX_DELAY", "8")),
+            retry_after=_mcp_retry_after,
+        )
+        self.mcp_breaker = CircuitBreaker(
+            "mcp",
+            failure_threshold=int(os.getenv("MCP_CIRCUIT_FAILURES", "5")),
+            recovery_timeout=float(os.getenv("MCP_CIRCUIT_RECOVERY_SECONDS", "30")),
+        )
+        # 심볼 변환 헤지 요청 대기 시간(초, 0이면 비활성화)
+        self.symbol_hedge_delay = float(os.getenv("OPENAI_SYMBOL_HEDGE_DELAY_SECONDS", "0"))
+        # 단계별 모델 (symbol / tool_round / analysis) 및 지연 시간 기반 대체 모델
+        self.models = ModelRouter.from_env()
+        self.model = self.models.model("analysis")
+        # 상시 실행 Brave Search MCP 서버 풀 (BRAVE_API_KEY가 없으면 None)
+        self.mcp: Optional[MCPSessionManager] = MCPSessionManager.brave_search_from_env()
+        # 한 라운드 내 도구 호출 동시 실행 상한 / 호출당 제한 시간(초)
+        self.tool_concurrency = int(os.getenv("MCP_TOOL_CONCURRENCY", "5"))
+        self.tool_timeout = float(os.getenv("MCP_TOOL_TIMEOUT", "20"))
+        # 도구 호출 루프 상한: 최대 라운드 수 / 모델 호출당 제한 시간(초) / 최종 답변용으로 남겨 둘 시간(초)
+        self.max_tool_rounds = int(os.getenv("MAX_TOOL_ROUNDS", "3"))
+        self.model_timeout = float(os.getenv("OPENAI_CALL_TIMEOUT", "60"))
+        self.final_answer_reserve = float(os.getenv("FINAL_ANSWER_RESERVE_SECONDS", "20"))
+        # 도구 결과 최대 길이 (라운드마다 늘어나는 대화 이력 제한)
+        self.max_tool_result_chars = int(os.getenv("MAX_TOOL_RESULT_CHARS", "8000"))
+        # 도구 결과 캐시 (정규화된 도구명+인자 기준)
+        self.tool_cache = MCPResultCache.from_env()
+        # 분석 응답 형식: json(구조화 출력, 기본값) / markdown(기존 형식)
+        self.output_mode = "markdown" if os.getenv("ANALYSIS_OUTPUT_MODE", "json").lower() == "markdown" else "json"
+        # 프롬프트 템플릿별 캐시 적중 토큰 통계
+        self.prompt_cache = PromptCacheStats()
+        # 비용 메트릭 단가 (USD / 100만 토큰, 분석 모델 기준 - 그 외 모델은 MODEL_PRICES 사용)
+        default_prices = MODEL_PRICES.get(self.model, MODEL_PRICES["gpt-5"])
+        self.price_input = float(os.getenv("OPENAI_PRICE_INPUT_PER_1M", str(default_prices[0])))
+        self.price_cached_input = float(os.getenv("OPENAI_PRICE_CACHED_INPUT_PER_1M", str(default_prices[1])))
+        self.price_output = float(os.getenv("OPENAI_PRICE_OUTPUT_PER_1M", str(default_prices[2])))
+
+    @property
+    def mcp_tools(self) -> List[Dict[str, Any]]:
+        """OpenAI function calling 형식의 MCP 도구 목록"""
+        return self.mcp.tools if self.mcp else []
 
     async def initialize_mcp(self):
-        """MCP 서버 초기화 및 연결"""
+        """MCP 서버 풀 기동 (애플리케이션 시작 시 미리 호출하여 워밍업)"""
         try:
-            # Brave Search MCP 서버 연결
-            brave_api_key = os.getenv("BRAVE_API_KEY")
-            if brave_api_key:
-                await self._connect_brave_search(brave_api_key)
-                print("[MCP] Brave Search 연결 완료")
-            else:
-                print("[MCP] BRAVE_API_KEY가 설정되지 않았습니다. 웹 검색 기능이 비활성화됩니다.")
+            if self.mcp is None:
+                logger.warning("[MCP] BRAVE_API_KEY가 설정되지 않았습니다. 웹 검색 기능이 비활성화됩니다.")
+            elif not self.mcp.started:
+                await self.mcp.start()
+                logger.info("[MCP] Brave Search 연결 완료")
         except Exception as e:
-            print(f"[MCP] 초기화 중 오류 발생: {e}")
-
-    async def _connect_brave_search(self, api_key: str):
-        """Brave Search MCP 서버에 연결"""
-        server_params = StdioServerParameters(
-            command="npx",
-            args=["-y", "@modelcontextprotocol/server-brave-search"],
-            env={"BRAVE_API_KEY": api_key}
+            logger.error("[MCP] 초기화 중 오류 발생: %s", e)
+
+    async def _call_mcp_tool(self, tool_name: str, arguments: Dict[str, Any]) -> str:
+        """MCP 도구 호출 (결과 캐시 우선)"""
+        if self.mcp is None:
+            return ""
+        return await self.tool_cache.get_or_call(
+            tool_name, arguments, lambda: self._call_mcp_tool_uncached(tool_name, arguments)
         )
 
-        stdio_transport = await stdio_client(server_params)
-        stdio, write = stdio_transport
-        session = ClientSession(stdio, write)
-
-        await session.initialize()
-        self.mcp_sessions["brave-search"] = session
-
-        # 도구 목록 가져오기
-        tools_list = await session.list_tools()
-        for tool in tools_list.tools:
-            openai_tool = {
-                "type": "function",
-                "function": {
-                    "name": tool.name,
-                    "description": tool.description or "",
-                    "parameters": tool.inputSchema
-                }
-            }
-            self.mcp_tools.append(openai_tool)
+    async def _call_mcp_tool_uncached(self, tool_name: str, arguments: Dict[str, Any]) -> str:
+        """MCP 서버 풀로 실제 도구 호출 (일시적 오류는 재시도, 최종 실패나 서킷 열림 시 빈 문자열)"""
+        try:
+            result = await self.mcp_breaker.call(
+                lambda: self.mcp_retry.run(
+                    lambda: self.mcp.call_tool(tool_name, arguments), _is_transient_mcp_error
+                ),
+                _is_transient_mcp_error,
+            )
+        except CircuitOpenError as e:
+            logger.warning("[MCP] 도구 호출 생략 (%s): %s", tool_name, e)
+            TOOL_CALLS.inc(tool=tool_name, status="circuit_open")
+            return ""
+        except Exception as e:
+            logger.warning("[MCP] 도구 호출 오류 (%s): %s", tool_name, e)
+            rate_limited = isinstance(e, MCPToolError) and e.rate_limited
+            TOOL_CALLS.inc(tool=tool_name, status="rate_limited" if rate_limited else "error")
+            return ""
+        TOOL_CALLS.inc(tool=tool_name, status="ok")
+        return result
+
+    async def _run_tool_calls(
+        self, tool_calls, on_event: Optional[EventCallback] = None, timeout: Optional[float] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        한 라운드의 도구 호출을 동시에 실행
 
-    async def _call_mcp_tool(self, tool_name: str, arguments: Dict[str, Any]) -> str:
-        """MCP 도구 호출"""
-        for session in self.mcp_sessions.values():
+        Args:
+            tool_calls: 모델 응답의 tool_calls 목록
+            on_event: 진행 이벤트 콜백 (도구 호출 시작/완료)
+            timeout: 호출당 제한 시간 (기본: tool_timeout)
+
+        Returns:
+            tool 메시지 목록 (tool_calls와 같은 순서)
+        """
+        if timeout is None:
+            timeout = self.tool_timeout
+        semaphore = asyncio.Semaphore(max(1, self.tool_concurrency))
+
+        async def _run(tool_call) -> Dict[str, Any]:
+            tool_name = tool_call.function.name
             try:
-                result = await session.call_tool(tool_name, arguments)
-                if result and hasattr(result, 'content'):
-                    contents = []
-                    for content in result.content:
-                        if hasattr(content, 'text'):
-                            contents.append(content.text)
-                    return "\n".join(contents)
-            except Exception as e:
-                print(f"[MCP] 도구 호출 오류 ({tool_name}): {e}")
-        return ""
+                tool_args = json.loads(tool_call.function.arguments or "{}")
+            except json.JSONDecodeError:
+                tool_args = {}
+
+            logger.info("[MCP] 도구 호출: %s - %s", tool_name, tool_args)
+            if on_event:
+                await on_event("tool_call", {"id": tool_call.id, "name": tool_name, "arguments": tool_args})
+
+            async with semaphore:
+                try:
+                    with span("tool_call"):
+                        tool_result = await asyncio.wait_for(
+                            self._call_mcp_tool(tool_name, tool_args), timeout
+                        )
+                except asyncio.TimeoutError:
+                    logger.warning("[MCP] 도구 호출 시간 초과 (%s, %.1fs)", tool_name, timeout)
+                    TOOL_CALLS.inc(tool=tool_name, status="timeout")
+                    tool_result = ""
+
+            if on_event:
+                await on_event("tool_result", {"id": tool_call.id, "name": tool_name, "chars": len(tool_result)})
+            if len(tool_result) > self.max_tool_result_chars:
+                tool_result = tool_result[:self.max_tool_result_chars]
+
+            return {
+                "role": "tool",
+                "tool_call_id": tool_call.id,
+                "content": tool_result,
+            }
+
+        # gather는 입력 순서대로 결과를 반환하므로 tool_call_id 순서가 유지됨
+        return await asyncio.gather(*(_run(tool_call) for tool_call in tool_calls))
+
+    async def _create_completion(
+        self,
+        on_event: Optional[EventCallback] = None,
+        prompt: Optional[PromptTemplate] = None,
+        timeout: Optional[float] = None,
+        stage: str = "analysis",
+        **kwargs,
+    ) -> ChatCompletion:
+        """
+        Chat Completion 호출 (프롬프트 템플릿별 캐시 적중 토큰 / 지연 시간 / 비용 메트릭 기록)
+
+        on_event가 주어지면 스트리밍으로 호출하여 토큰마다 "token" 이벤트를 보내고,
+        청크를 모아 일반 호출과 같은 ChatCompletion 객체로 반환합니다.
+        timeout이 주어지면 스트리밍을 포함한 호출 전체가 그 시간 안에 끝나지 않을 때 TimeoutError가 발생합니다.
+        model을 지정하지 않으면 stage(symbol / tool_round / analysis)에 맞는 모델을 선택합니다.
+        """
+        if prompt is not None:
+            kwargs.setdefault("prompt_cache_key", prompt.cache_key)
+        prompt_label = prompt.cache_key if prompt is not None else "none"
+        if "model" not in kwargs:
+            kwargs["model"] = self.models.select(stage)
+            kwargs.update(self.models.options(stage, kwargs["model"]))
+        model = kwargs["model"]
+
+        start = time.perf_counter()
+        try:
+            response = await asyncio.wait_for(
+                self._request_completion(
+                    on_event, deadline=Deadline.after(timeout) if timeout is not None else None, **kwargs
+                ),
+                timeout,
+            )
+        except asyncio.TimeoutError:
+            self.models.observe(stage, model, time.perf_counter() - start)
+            # 호출당 제한 시간 전체를 써도 응답이 없으면 업스트림 장애로 집계 (마감 시각 때문에 짧아진 경우 제외)
+            if timeout is not None and timeout >= self.model_timeout:
+                self.openai_breaker.record_failure()
+            raise
+        finally:
+            OPENAI_REQUEST_DURATION.observe(time.perf_counter() - start, prompt=prompt_label, model=model)
+        self.models.observe(stage, model, time.perf_counter() - start)
+
+        cached = 0
+        if prompt is not None:
+            cached = self.prompt_cache.record(prompt, response.usage)
+            if response.usage:
+                logger.info(
+                    "[PROMPT CACHE] %s - cached %d/%d prompt tokens",
+                    prompt.cache_key, cached, response.usage.prompt_tokens,
+                )
+        self._record_usage_metrics(prompt_label, model, response.usage, cached)
+        return response
+
+    def _record_usage_metrics(self, prompt_label: str, model: str, usage: Optional[Any], cached: int):
+        """토큰 사용량 / 예상 비용 카운터 기록 (cached는 prompt 토큰 중 캐시 적중분)"""
+        if usage is None:
+            return
+        prompt_tokens = usage.prompt_tokens or 0
+        completion_tokens = usage.completion_tokens or 0
+        OPENAI_TOKENS.inc(prompt_tokens, prompt=prompt_label, model=model, type="prompt")
+        OPENAI_TOKENS.inc(cached, prompt=prompt_label, model=model, type="cached")
+        OPENAI_TOKENS.inc(completion_tokens, prompt=prompt_label, model=model, type="completion")
+
+        price_input, price_cached_input, price_output = self._prices(model)
+        cost = (
+            (prompt_tokens - cached) * price_input
+            + cached * price_cached_input
+            + completion_tokens * price_output
+        ) / 1_000_000
+        OPENAI_COST.inc(cost, prompt=prompt_label, model=model)
+
+    def _prices(self, model: str) -> tuple[float, float, float]:
+        """모델 단가 (분석 모델은 OPENAI_PRICE_* 설정값, 그 외는 MODEL_PRICES, 모르는 모델은 분석 모델 단가)"""
+        if model != self.model and model in MODEL_PRICES:
+            return MODEL_PRICES[model]
+        return self.price_input, self.price_cached_input, self.price_output
+
+    async def _request_completion(
+        self, on_event: Optional[EventCallback] = None, deadline: Optional[Deadline] = None, **kwargs
+    ) -> ChatCompletion:
+        """Chat Completion 요청 (on_event가 있으면 스트리밍 후 ChatCompletion으로 조립, deadline: 재시도 대기 한도)"""
+        if on_event is None:
+            return await self._call_openai(lambda: self.client.chat.completions.create(**kwargs), deadline)
+
+        # 스트림 시작 전 오류만 재시도 (토큰 전송 후 재시도하면 이벤트가 중복됨)
+        stream = await self._call_openai(
+            lambda: self.client.chat.completions.create(
+                stream=True, stream_options={"include_usage": True}, **kwargs
+            ),
+            deadline,
+        )
+
+        content_parts: List[str] = []
+        tool_calls: Dict[int, Dict[str, Any]] = {}
+        finish_reason = "stop"
+        completion_id, model, usage = "", kwargs.get("model", self.model), None
+
+        async for chunk in stream:
+            completion_id = chunk.id or completion_id
+            model = chunk.model or model
+            if chunk.usage:
+                usage = chunk.usage
+            if not chunk.choices:
+                continue
+
+            choice = chunk.choices[0]
+            delta = choice.delta
+            if delta.content:
+                content_parts.append(delta.content)
+                await on_event("token", {"text": delta.content})
+            for tool_delta in delta.tool_calls or []:
+                call = tool_calls.setdefault(tool_delta.index, {"id": "", "name": "", "arguments": ""})
+                if tool_delta.id:
+                    call["id"] = tool_delta.id
+                if tool_delta.function and tool_delta.function.name:
+                    call["name"] += tool_delta.function.name
+                if tool_delta.function and tool_delta.function.arguments:
+                    call["arguments"] += tool_delta.function.arguments
+            if choice.finish_reason:
+                finish_reason = choice.finish_reason
+
+        message = ChatCompletionMessage(
+            role="assistant",
+            content="".join(content_parts) or None,
+            tool_calls=[
+                ChatCompletionMessageFunctionToolCall(
+                    id=call["id"],
+                    type="function",
+                    function=Function(name=call["name"], arguments=call["arguments"]),
+                )
+                for _, call in sorted(tool_calls.items())
+            ] or None,
+        )
+        return ChatCompletion(
+            id=completion_id,
+            object="chat.completion",
+            created=int(time.time()),
+            model=model,
+            choices=[Choice(index=0, finish_reason=finish_reason, message=message)],
+            usage=usage,
+        )
+
+    async def _call_openai(self, fn: Callable[[], Awaitable[Any]], deadline: Optional[Deadline] = None) -> Any:
+        """서킷 브레이커 확인 후 일시적 오류(연결 오류, 429, 5xx)는 백오프하며 재시도 (deadline 이내에서만)"""
+        return await self.openai_breaker.call(
+            lambda: self.openai_retry.run(fn, _is_transient_openai_error, deadline), _is_transient_openai_error
+        )
+
+    def _call_timeout(self, deadline: Optional[Deadline], reserve: float = 0.0) -> float:
+        """
+        모델 호출 제한 시간 (model_timeout, 마감 시각이 있으면 남은 시간 - reserve 이내)
+
+        남은 시간이 거의 없어도 최소 1초는 시도합니다 (실패 시 호출부에서 캐시 대체 응답 사용).
+        """
+        if deadline is None:
+            return self.model_timeout
+        return max(1.0, deadline.timeout(self.model_timeout, reserve))
+
+    @property
+    def _output_options(self) -> Dict[str, Any]:
+        """출력 모드별 Chat Completion 추가 인자 (json 모드: response_format)"""
+        if self.output_mode == "json":
+            return {"response_format": ANALYSIS_RESPONSE_FORMAT}
+        return {}
 
     async def cleanup_mcp(self):
-        """MCP 세션 정리"""
-        for session in self.mcp_sessions.values():
-            try:
-                await session.__aexit__(None, None, None)
-            except:
-                pass
-        self.mcp_sessions.clear()
-        self.mcp_tools.clear()
+        """MCP 서버 풀 종료"""
+        if self.mcp:
+            await self.mcp.stop()
 
-    def get_stock_info(self, company: str) -> tuple[str, str]:
+    async def get_stock_info(self, company: str, deadline: Optional[Deadline] = None) -> tuple[str, str]:
         """
         기업명이나 심볼을 정확한 주식 티커 심볼과 정식 기업명으로 변환
 
         Args:
             company: 기업명 또는 심볼 (예: "테슬라", "TSLA")
+            deadline: 요청 마감 시각 (호출 제한 시간 계산)
 
         Returns:
             (심볼, 정식 기업명) 튜플 (예: ("TSLA", "Tesla, Inc."))
         """
-        response = self.client.chat.completions.create(
-            model=self.model,
-            messages=[
-                {
-                    "role": "system",
-                    "content": """당신은 주식 심볼 전문가입니다.
-사용자가 입력한 기업명이나 심볼을 정확한 주식 티커 심볼과 정식 기업명으로 변환해주세요.
-
-예시:
-- "테슬라" → TSLA|Tesla, Inc.
-- "NVDA" → NVDA|NVIDIA Corporation
-- "애플" → AAPL|Apple Inc.
-- "삼성전자" → 005930.KS|Samsung Electronics Co., Ltd.
-- "SK하이닉스" → 000660.KS|SK hynix Inc.
-
-반드시 "심볼|정식기업명" 형식으로만 답변하고 다른 설명은 하지 마세요."""
-                },
-                {
-                    "role": "user",
-                    "content": f"{company}"
-                }
-            ],
-            max_completion_tokens=500
-        )
+        def resolve() -> Awaitable[ChatCompletion]:
+            return self._create_completion(
+                prompt=SYMBOL_RESOLVE,
+                stage="symbol",
+                messages=SYMBOL_RESOLVE.messages(company=company),
+                max_completion_tokens=500,
+                timeout=self._call_timeout(deadline),
+            )
 
-        print(f"[DEBUG] Stock info response finish_reason: {response.choices[0].finish_reason}")
-        print(f"[DEBUG] Stock info response content: '{response.choices[0].message.content}'")
+        # 짧고 멱등한 호출이므로 응답이 늦으면 같은 요청을 하나 더 보내 꼬리 지연 단축
+        if self.symbol_hedge_delay > 0:
+            response = await hedged(resolve, self.symbol_hedge_delay, label="symbol_resolve")
+        else:
+            response = await resolve()
+
+        logger.debug(
+            "Stock info response finish_reason=%s content=%r",
+            response.choices[0].finish_reason, response.choices[0].message.content,
+        )
 
         result = response.choices[0].message.content
         if result and "|" in result:
@@ -132,165 +494,137 @@ class OpenAIAgent:
             company_name = parts[1].strip() if len(parts) > 1 else company
             return (symbol, company_name)
         else:
-            print(f"[ERROR] Invalid stock info result for company: {company}")
+            logger.error("Invalid stock info result for company: %s", company)
             return (company, company)  # 변환 실패 시 입력값 그대로 반환
 
-    async def analyze_stock_with_mcp(self, symbol: str, company: str) -> str:
+    async def analyze_stock_with_mcp(
+        self,
+        symbol: str,
+        company: str,
+        on_event: Optional[EventCallback] = None,
+        deadline: Optional[Deadline] = None,
+    ) -> str:
         """
         MCP를 사용하여 최신 정보를 포함한 주식 종합 분석
 
+        도구 호출 라운드가 max_tool_rounds에 이르거나, 남은 시간이 final_answer_reserve 이하이거나,
+        도구 라운드 중 모델 호출이 시간 초과되면 더 이상 도구를 쓰지 않고(tool_choice="none")
+        그때까지 수집한 정보로 최종 답변을 생성합니다.
+
+        도구 라운드는 tool_round 단계 모델이 진행하고, 그 모델이 분석 모델과 다르면
+        검색이 끝난 뒤 분석 모델이 최종 답변을 다시 생성합니다.
+
         Args:
             symbol: 주식 티커 심볼 (예: "TSLA")
             company: 원래 입력된 기업명 (예: "테슬라")
+            on_event: 진행 이벤트 콜백 (도구 호출, 모델 토큰 스트리밍)
+            deadline: 요청 마감 시각 (없으면 라운드 수 / 호출당 제한 시간만 적용)
 
         Returns:
-            AI가 생성한 분석 텍스트
+            AI가 생성한 분석 텍스트 (json 모드: StockAnalysisResult 스키마의 JSON 문자열)
         """
-        # 검색 가이드라인 생성
-        search_instruction = get_search_instruction()
-
-        messages = [
-            {
-                "role": "system",
-                "content": f"""당신은 전문 주식 투자 분석가입니다.
-사용자가 제공한 주식 종목에 대해 단기, 중기, 장기로 구분하여 투자 의견을 제시해야 합니다.
-
-최신 정보가 필요하면 brave_web_search 도구를 사용하여 다음을 검색하세요:
-
-{search_instruction}
-
-검색할 정보:
-1. 최신 주가 동향 및 거래량
-2. 최근 뉴스 및 공시사항
-3. 경제/정치적 이슈
-4. 산업 트렌드
-5. 기업 실적 발표
-
-분석 후 반드시 다음 형식으로 답변하세요:
-
-**단기 투자 의견 (1일~1주일)**: [BUY/SELL/HOLD 중 하나]
-**단기 이유**:
-- [이유 1]
-- [이유 2]
-- [이유 3]
-
-**중기 투자 의견 (1주일~3개월)**: [BUY/SELL/HOLD 중 하나]
-**중기 이유**:
-- [이유 1]
-- [이유 2]
-- [이유 3]
-
-**장기 투자 의견 (3개월~1년)**: [BUY/SELL/HOLD 중 하나]
-**장기 이유**:
-- [이유 1]
-- [이유 2]
-- [이유 3]
-
-**종합 분석**:
-[최신 정보를 바탕으로 한 상세 분석]"""
-            },
-            {
-                "role": "user",
-                "content": f"{symbol} ({company}) 주식에 대한 최신 정보를 검색하고 종합 분석과 투자 의견을 제시해주세요."
-            }
-        ]
+        prompt = ANALYSIS_WITH_SEARCH[self.output_mode]
+        messages = prompt.messages(symbol=symbol, company=company)
 
         # MCP 도구가 있으면 함께 전달
         tools = self.mcp_tools if self.mcp_tools else None
-
-        response = self.client.chat.completions.create(
-            model=self.model,
+        options = dict(
+            prompt=prompt,
             messages=messages,
             tools=tools,
-            max_completion_tokens=5000
+            max_completion_tokens=5000,
+            **self._output_options,
         )
+        # 도구를 쓸 수 있는 동안은 최종 답변 시간을 남겨 두고 호출
+        reserve = self.final_answer_reserve if tools else 0.0
 
-        # 도구 호출이 있는지 확인
-        while response.choices[0].finish_reason == "tool_calls":
-            tool_calls = response.choices[0].message.tool_calls
-            messages.append(response.choices[0].message)
-
-            # 각 도구 호출 처리
-            for tool_call in tool_calls:
-                tool_name = tool_call.function.name
-                tool_args = json.loads(tool_call.function.arguments)
+        # 도구 라운드 전용 모델이 따로 있으면 그 모델의 답변은 스트리밍하지 않음 (최종 답변만 전달)
+        tiered = bool(tools) and self.models.model("tool_round") != self.models.model("analysis")
+        round_stage = "tool_round" if tools else "analysis"
 
-                print(f"[MCP] 도구 호출: {tool_name} - {tool_args}")
-
-                # MCP 도구 실행 (비동기)
-                tool_result = await self._call_mcp_tool(tool_name, tool_args)
+        rounds, calls = 0, 0
+        stop_reason: Optional[str] = None
+        while True:
+            try:
+                response = await self._create_completion(
+                    None if tiered else on_event,
+                    timeout=self._call_timeout(deadline, reserve),
+                    stage=round_stage,
+                    **options,
+                )
+            except asyncio.TimeoutError:
+                if not tools:
+                    raise
+                stop_reason = "timeout"
+                break
+
+            # 도구 호출이 있는지 확인
+            if response.choices[0].finish_reason != "tool_calls":
+                if tiered:
+                    stop_reason = "synthesis"
+                break
+            if rounds >= self.max_tool_rounds:
+                stop_reason = "max_rounds"
+                break
+            if deadline is not None and deadline.remaining() <= self.final_answer_reserve:
+                stop_reason = "deadline"
+                break
 
-                messages.append({
-                    "role": "tool",
-                    "tool_call_id": tool_call.id,
-                    "content": tool_result
-                })
+            tool_calls = response.choices[0].message.tool_calls
+            messages.append(response.choices[0].message)
+            rounds += 1
+            calls += len(tool_calls)
 
-            # 다음 응답 생성
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=messages,
-                tools=tools,
-                max_completion_tokens=5000
+            # 도구 호출 동시 실행 (결과는 호출 순서대로 추가)
+            tool_timeout = (
+                deadline.timeout(self.tool_timeout, self.final_answer_reserve) if deadline else self.tool_timeout
+            )
+            with span("tool_round"):
+                messages.extend(await self._run_tool_calls(tool_calls, on_event, tool_timeout))
+
+        if stop_reason:
+            # 마지막 tool_calls 응답은 버리고(결과 없는 호출이 이력에 남지 않도록) 도구 없이 최종 답변 강제
+            if stop_reason != "synthesis":
+                logger.warning(
+                    "[AGENT] %s 도구 루프 중단 (%s, %d라운드) - 수집한 정보로 최종 답변 생성",
+                    symbol, stop_reason, rounds,
+                )
+                FORCED_FINAL_ANSWERS.inc(reason=stop_reason)
+            response = await self._create_completion(
+                on_event, timeout=self._call_timeout(deadline), stage="analysis", tool_choice="none", **options
             )
 
+        TOOL_ROUNDS_PER_ANALYSIS.observe(rounds)
+        TOOL_CALLS_PER_ANALYSIS.observe(calls)
         return response.choices[0].message.content
 
-    def analyze_stock(self, symbol: str, company: str) -> str:
+    async def analyze_stock(
+        self,
+        symbol: str,
+        company: str,
+        on_event: Optional[EventCallback] = None,
+        deadline: Optional[Deadline] = None,
+    ) -> str:
         """
         주식 종목을 종합 분석 (기존 방식 - MCP 없이)
 
         Args:
             symbol: 주식 티커 심볼 (예: "TSLA")
             company: 원래 입력된 기업명 (예: "테슬라")
+            on_event: 진행 이벤트 콜백 (모델 토큰 스트리밍)
+            deadline: 요청 마감 시각 (호출 제한 시간 계산)
 
         Returns:
-            AI가 생성한 분석 텍스트
+            AI가 생성한 분석 텍스트 (json 모드: StockAnalysisResult 스키마의 JSON 문자열)
         """
-        response = self.client.chat.completions.create(
-            model=self.model,
-            messages=[
-                {
-                    "role": "system",
-                    "content": """당신은 전문 주식 투자 분석가입니다.
-사용자가 제공한 주식 종목에 대해 단기, 중기, 장기로 구분하여 투자 의견을 제시해야 합니다.
-
-다음 항목들을 철저히 분석하세요:
-1. 기간별 거래 내역 및 가격 추세 분석 (1년, 6개월, 3개월, 1개월, 1주일, 3일, 1일)
-2. 관련 경제 뉴스 및 시장 동향
-3. 정치적 요인 및 규제 변화
-4. 기업 실적 및 재무 상태
-5. 산업 전망 및 경쟁 환경
-
-분석 후 반드시 다음 형식으로 답변하세요:
-
-**단기 투자 의견 (1일~1주일)**: [BUY/SELL/HOLD 중 하나]
-**단기 이유**:
-- [이유 1]
-- [이유 2]
-- [이유 3]
-
-**중기 투자 의견 (1주일~3개월)**: [BUY/SELL/HOLD 중 하나]
-**중기 이유**:
-- [이유 1]
-- [이유 2]
-- [이유 3]
-
-**장기 투자 의견 (3개월~1년)**: [BUY/SELL/HOLD 중 하나]
-**장기 이유**:
-- [이유 1]
-- [이유 2]
-- [이유 3]
-
-**종합 분석**:
-[기간별 거래 패턴, 뉴스 분석, 경제/정치적 요인을 포함한 상세 분석]"""
-                },
-                {
-                    "role": "user",
-                    "content": f"{symbol} ({company}) 주식에 대한 종합 분석과 투자 의견을 제시해주세요."
-                }
-            ],
-            max_completion_tokens=5000
+        prompt = ANALYSIS[self.output_mode]
+        response = await self._create_completion(
+            on_event,
+            prompt=prompt,
+            messages=prompt.messages(symbol=symbol, company=company),
+            max_completion_tokens=5000,
+            timeout=self._call_timeout(deadline),
+            **self._output_options,
         )
 
         return response.choices[0].message.content
@@ -0,0 +1,179 @@
+"""
+프롬프트 템플릿 레지스트리
+
+OpenAI 프롬프트 캐싱은 요청 앞부분(prefix)이 이전 요청과 같을 때 적용되므로,
+시스템 프롬프트는 모듈 import 시 한 번만 만들어 매 요청 동일한 문자열을 사용하고
+심볼/기업명 같은 가변 데이터는 항상 마지막 user 메시지에만 넣습니다.
+
+프롬프트 내용을 바꾸면 해당 템플릿의 version을 올리세요
+(prompt_cache_key와 사용량 통계가 버전별로 분리됩니다).
+"""
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+from config import get_search_instruction
+
+
+@dataclass(frozen=True)
+class PromptTemplate:
+    """고정 시스템 프롬프트 + 가변 user 메시지 템플릿"""
+
+    name: str
+    version: str
+    system: str
+    user: str  # str.format 템플릿 (가변 데이터는 여기에만)
+
+    @property
+    def cache_key(self) -> str:
+        """prompt_cache_key (같은 prefix 요청을 같은 캐시로 라우팅)"""
+        return f"{self.name}:{self.version}"
+
+    def messages(self, **variables: Any) -> List[Dict[str, Any]]:
+        """[system, user] 메시지 목록 생성"""
+        return [
+            {"role": "system", "content": self.system},
+            {"role": "user", "content": self.user.format(**variables)},
+        ]
+
+
+def _format_instruction(output_mode: str, analysis_hint: str) -> str:
+    """
+    시스템 프롬프트의 답변 형식 안내
+
+    Args:
+        output_mode: "json" 또는 "markdown"
+        analysis_hint: 종합 분석에 담을 내용 설명
+    """
+    if output_mode == "json":
+        return f"""분석 후 반드시 지정된 JSON 스키마로 답변하세요:
+- short_term (1일~1주일), mid_term (1주일~3개월), long_term (3개월~1년)
+  - action: BUY/SELL/HOLD 중 하나
+  - reason: 핵심 이유 3개 ("- "로 시작하는 줄, 줄바꿈으로 구분)
+- analysis: {analysis_hint}"""
+
+    return f"""분석 후 반드시 다음 형식으로 답변하세요:
+
+**단기 투자 의견 (1일~1주일)**: [BUY/SELL/HOLD 중 하나]
+**단기 이유**:
+- [이유 1]
+- [이유 2]
+- [이유 3]
+
+**중기 투자 의견 (1주일~3개월)**: [BUY/SELL/HOLD 중 하나]
+**중기 이유**:
+- [이유 1]
+- [이유 2]
+- [이유 3]
+
+**장기 투자 의견 (3개월~1년)**: [BUY/SELL/HOLD 중 하나]
+**장기 이유**:
+- [이유 1]
+- [이유 2]
+- [이유 3]
+
+**종합 분석**:
+[{analysis_hint}]"""
+
+
+SYMBOL_RESOLVE = PromptTemplate(
+    name="symbol_resolve",
+    version="1",
+    system="""당신은 주식 심볼 전문가입니다.
+사용자가 입력한 기업명이나 심볼을 정확한 주식 티커 심볼과 정식 기업명으로 변환해주세요.
+
+예시:
+- "테슬라" → TSLA|Tesla, Inc.
+- "NVDA" → NVDA|NVIDIA Corporation
+- "애플" → AAPL|Apple Inc.
+- "삼성전자" → 005930.KS|Samsung Electronics Co., Ltd.
+- "SK하이닉스" → 000660.KS|SK hynix Inc.
+
+반드시 "심볼|정식기업명" 형식으로만 답변하고 다른 설명은 하지 마세요.""",
+    user="{company}",
+)
+
+
+def _analysis_with_search(output_mode: str) -> PromptTemplate:
+    return PromptTemplate(
+        name=f"analysis_mcp_{output_mode}",
+        version="1",
+        system=f"""당신은 전문 주식 투자 분석가입니다.
+사용자가 제공한 주식 종목에 대해 단기, 중기, 장기로 구분하여 투자 의견을 제시해야 합니다.
+
+최신 정보가 필요하면 brave_web_search 도구를 사용하여 다음을 검색하세요:
+
+{get_search_instruction()}
+
+검색할 정보:
+1. 최신 주가 동향 및 거래량
+2. 최근 뉴스 및 공시사항
+3. 경제/정치적 이슈
+4. 산업 트렌드
+5. 기업 실적 발표
+
+{_format_instruction(output_mode, "최신 정보를 바탕으로 한 상세 분석")}""",
+        user="{symbol} ({company}) 주식에 대한 최신 정보를 검색하고 종합 분석과 투자 의견을 제시해주세요.",
+    )
+
+
+def _analysis(output_mode: str) -> PromptTemplate:
+    return PromptTemplate(
+        name=f"analysis_{output_mode}",
+        version="1",
+        system=f"""당신은 전문 주식 투자 분석가입니다.
+사용자가 제공한 주식 종목에 대해 단기, 중기, 장기로 구분하여 투자 의견을 제시해야 합니다.
+
+다음 항목들을 철저히 분석하세요:
+1. 기간별 거래 내역 및 가격 추세 분석 (1년, 6개월, 3개월, 1개월, 1주일, 3일, 1일)
+2. 관련 경제 뉴스 및 시장 동향
+3. 정치적 요인 및 규제 변화
+4. 기업 실적 및 재무 상태
+5. 산업 전망 및 경쟁 환경
+
+{_format_instruction(output_mode, "기간별 거래 패턴, 뉴스 분석, 경제/정치적 요인을 포함한 상세 분석")}""",
+        user="{symbol} ({company}) 주식에 대한 종합 분석과 투자 의견을 제시해주세요.",
+    )
+
+
+# import 시 한 번만 생성 (출력 모드별)
+ANALYSIS_WITH_SEARCH = {mode: _analysis_with_search(mode) for mode in ("json", "markdown")}
+ANALYSIS = {mode: _analysis(mode) for mode in ("json", "markdown")}
+
+
+class PromptCacheStats:
+    """템플릿별 프롬프트 토큰 / 캐시 적중 토큰(cached_tokens) 집계"""
+
+    def __init__(self):
+        self._stats: Dict[str, Dict[str, int]] = {}
+
+    def record(self, prompt: PromptTemplate, usage: Optional[Any]) -> int:
+        """
+        API 응답 usage 기록
+
+        Returns:
+            이번 호출의 cached_tokens
+        """
+        if usage is None:
+            return 0
+        details = getattr(usage, "prompt_tokens_details", None)
+        cached = (getattr(details, "cached_tokens", None) or 0) if details else 0
+
+        entry = self._stats.setdefault(
+            prompt.cache_key, {"calls": 0, "prompt_tokens": 0, "cached_tokens": 0, "completion_tokens": 0}
+        )
+        entry["calls"] += 1
+        entry["prompt_tokens"] += usage.prompt_tokens or 0
+        entry["cached_tokens"] += cached
+        entry["completion_tokens"] += usage.completion_tokens or 0
+        return cached
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """템플릿(name:version)별 누적 사용량과 캐시 적중률"""
+        return {
+            key: {
+                **entry,
+                "cache_hit_rate": round(entry["cached_tokens"] / entry["prompt_tokens"], 4)
+                if entry["prompt_tokens"] else 0.0,
+            }
+            for key, entry in self._stats.items()
+        }
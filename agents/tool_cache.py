@@ -0,0 +1,158 @@
+import hashlib
+import json
+import logging
+import os
+import re
+import unicodedata
+from datetime import datetime, timedelta
+from typing import Any, Dict, Tuple
+
+from database import run_db, StockRepository
+from utils import SingleFlight, TTLCache
+from utils.metrics import CACHE_EVENTS
+
+logger = logging.getLogger(__name__)
+
+# 쿼리 성격별 TTL 구간 (초)
+TTL_REALTIME = 15 * 60  # 주가/시세 등 당일 변동 정보
+TTL_DEFAULT = 2 * 60 * 60  # 일반 뉴스/동향
+TTL_FILINGS = 24 * 60 * 60  # 실적/공시 등 자주 바뀌지 않는 정보
+
+_REALTIME_KEYWORDS = (
+    "price", "quote", "today", "premarket", "after hours", "intraday", "live",
+    "주가", "시세", "현재가", "오늘", "실시간", "장중", "시간외",
+)
+_FILINGS_KEYWORDS = (
+    "earnings", "filing", "10-k", "10-q", "8-k", "annual report", "quarterly report",
+    "sec.gov", "dart.fss.or.kr", "guidance",
+    "실적", "공시", "사업보고서", "분기보고서", "재무제표", "잠정실적",
+)
+
+
+def _normalize_value(value: Any) -> Any:
+    """인자 값 정규화 (문자열: 유니코드 정규화 + 소문자 + 공백 정리)"""
+    if isinstance(value, str):
+        value = unicodedata.normalize("NFKC", value).casefold()
+        return re.sub(r"\s+", " ", value).strip()
+    if isinstance(value, dict):
+        return {str(k): _normalize_value(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_normalize_value(v) for v in value]
+    return value
+
+
+def normalize_tool_call(tool_name: str, arguments: Dict[str, Any]) -> Tuple[str, str]:
+    """
+    도구 호출을 캐시 키로 정규화
+
+    Returns:
+        (캐시 키(SHA-256), 정규화된 인자 JSON) 튜플
+    """
+    normalized_args = json.dumps(
+        _normalize_value(arguments), ensure_ascii=False, sort_keys=True, separators=(",", ":")
+    )
+    raw_key = f"{tool_name.strip().lower()}:{normalized_args}"
+    return hashlib.sha256(raw_key.encode("utf-8")).hexdigest(), normalized_args
+
+
+def classify_ttl(normalized_args: str) -> int:
+    """쿼리 내용에 따라 TTL 구간 결정 (시세 < 일반 < 실적/공시)"""
+    if any(keyword in normalized_args for keyword in _REALTIME_KEYWORDS):
+        return TTL_REALTIME
+    if any(keyword in normalized_args for keyword in _FILINGS_KEYWORDS):
+        return TTL_FILINGS
+    return TTL_DEFAULT
+
+
+class MCPResultCache:
+    """
+    MCP 도구 호출 결과 캐시
+
+    - L1: 프로세스 메모리 (TTLCache)
+    - L2(선택): PostgreSQL mcp_tool_result_cache 테이블 - 워커/컨테이너 간 공유
+    - 같은 키의 동시 호출은 하나의 실제 호출로 합침
+    """
+
+    def __init__(self, maxsize: int = 2048, use_db: bool = False):
+        self.memory: TTLCache[str] = TTLCache(maxsize, TTL_DEFAULT)
+        self.use_db = use_db
+        self.db_hits = 0
+        self._flight = SingleFlight()
+
+    @classmethod
+    def from_env(cls) -> "MCPResultCache":
+        """TOOL_CACHE_SIZE / TOOL_CACHE_DB 환경 변수로 생성"""
+        return cls(
+            maxsize=int(os.getenv("TOOL_CACHE_SIZE", "2048")),
+            use_db=os.getenv("TOOL_CACHE_DB", "false").lower() in ("1", "true", "yes"),
+        )
+
+    async def get_or_call(self, tool_name: str, arguments: Dict[str, Any], call) -> str:
+        """
+        캐시 조회 후 없으면 실제 도구 호출 결과를 저장하여 반환
+
+        Args:
+            tool_name: 도구 이름
+            arguments: 도구 인자
+            call: 실제 도구 호출 코루틴 팩토리
+
+        Returns:
+            도구 결과 텍스트
+        """
+        cache_key, normalized_args = normalize_tool_call(tool_name, arguments)
+
+        cached = self.memory.get(cache_key)
+        if cached is not None:
+            logger.info("[TOOL CACHE HIT] %s - %s", tool_name, normalized_args)
+            CACHE_EVENTS.inc(cache="tool_l1", result="hit")
+            return cached
+        CACHE_EVENTS.inc(cache="tool_l1", result="miss")
+
+        return await self._flight.do(
+            cache_key, lambda: self._load_or_call(cache_key, tool_name, normalized_args, call)
+        )
+
+    async def _load_or_call(self, cache_key: str, tool_name: str, normalized_args: str, call) -> str:
+        """DB(L2) 조회 → 실제 호출 → 저장 (DB 오류는 캐시 미스로 처리)"""
+        if self.use_db:
+            try:
+                stored = await self._run_db(lambda repo: repo.get_tool_result(cache_key))
+            except Exception as e:
+                logger.warning("[TOOL CACHE] DB 조회 실패, 도구 직접 호출: %s", e)
+                stored = None
+            if stored:
+                result, expires_at = stored
+                self.db_hits += 1
+                self.memory.set(cache_key, result, (expires_at - datetime.utcnow()).total_seconds())
+                logger.info("[TOOL CACHE HIT:DB] %s - %s", tool_name, normalized_args)
+                CACHE_EVENTS.inc(cache="tool_db", result="hit")
+                return result
+            CACHE_EVENTS.inc(cache="tool_db", result="miss")
+
+        result = await call()
+
+        # 도구 오류(isError)는 call에서 예외로 전달되고, 빈 결과(시간 초과/서킷 열림)는 캐시하지 않음
+        if result:
+            ttl = classify_ttl(normalized_args)
+            self.memory.set(cache_key, result, ttl)
+            if self.use_db:
+                expires_at = datetime.utcnow() + timedelta(seconds=ttl)
+                try:
+                    await self._run_db(
+                        lambda repo: repo.save_tool_result(
+                            cache_key, tool_name, normalized_args, result, expires_at
+                        )
+                    )
+                except Exception as e:
+                    logger.warning("[TOOL CACHE] DB 저장 실패: %s", e)
+
+        return result
+
+    @staticmethod
+    async def _run_db(fn):
+        """DB 작업을 이벤트 루프 블로킹 없이 실행"""
+        return await run_db(lambda db: fn(StockRepository(db)))
+
+    def stats(self) -> Dict[str, Any]:
+        """캐시 통계 (메모리 + DB 적중 수)"""
+        return {**self.memory.stats(), "db_enabled": self.use_db, "db_hits": self.db_hits}
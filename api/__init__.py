@@ -1,3 +1,4 @@
-from .stock_api import router
+from .stock_api import router, stock_service
+from .system_api import router as system_router
 
-__all__ = ["router"]
+__all__ = ["router", "system_router", "stock_service"]
@@ -1,26 +1,249 @@
-from fastapi import APIRouter, HTTPException
-from models import StockResponse
+import asyncio
+import hashlib
+import json
+import os
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Any, AsyncIterator, Dict, Optional, Tuple
+from fastapi import APIRouter, HTTPException, Request, Response
+from fastapi.responses import StreamingResponse
+from models import StockBatchRequest, StockJobResponse, StockRequest, StockResponse
 from services import StockService
+from utils import CircuitOpenError, Deadline
+from utils.metrics import CACHE_EVENTS
 
 router = APIRouter(prefix="/api/stock", tags=["stock"])
 
 # 서비스 인스턴스 생성
 stock_service = StockService()
 
+# SSE 응답 공통 헤더 (프록시 버퍼링 비활성화)
+SSE_HEADERS = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+
+# 요청당 분석 시간 예산 (초) - 초과하면 도구 검색을 멈추고 수집한 정보로 최종 답변 생성
+REQUEST_DEADLINE_SECONDS = float(os.getenv("REQUEST_DEADLINE_SECONDS", "90"))
+
+# 진행 중인 작업 조회 시 권장 재조회 간격 (초, Retry-After 헤더)
+JOB_POLL_AFTER_SECONDS = int(os.getenv("JOB_POLL_AFTER_SECONDS", "5"))
+
+
+def format_sse(event: str, data: Dict[str, Any]) -> str:
+    """Server-Sent Events 메시지 포맷"""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False, default=str)}\n\n"
+
+
+def make_etag(symbol: str, updated_at: datetime, stale: bool = False) -> str:
+    """분석 행(심볼 + 분석 시각) 기준 ETag (stale 대체 응답은 본문이 다르므로 구분)"""
+    digest = hashlib.sha1(f"{symbol}:{updated_at.isoformat()}".encode()).hexdigest()[:16]
+    return f'"{digest}{"-stale" if stale else ""}"'
+
+
+def validator_headers(symbol: str, updated_at: datetime, max_age: float, stale: bool = False) -> Dict[str, str]:
+    """
+    조건부 요청 검증 헤더 (ETag, Last-Modified, Cache-Control)
+
+    Args:
+        symbol: 주식 심볼
+        updated_at: 분석 시각 (UTC)
+        max_age: 남은 유효 시간 (초) - stale 응답이거나 0 이하면 no-cache
+        stale: 유효 시간이 지난 대체 응답 여부
+    """
+    cache_control = "no-cache" if stale or max_age <= 0 else f"public, max-age={int(max_age)}"
+    return {
+        "ETag": make_etag(symbol, updated_at, stale),
+        "Last-Modified": format_datetime(updated_at.replace(tzinfo=timezone.utc), usegmt=True),
+        "Cache-Control": cache_control,
+    }
+
+
+def is_not_modified(request: Request, etag: str, updated_at: datetime) -> bool:
+    """If-None-Match(우선) / If-Modified-Since 조건 일치 여부"""
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match:
+        candidates = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+        return "*" in candidates or etag in candidates
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        if since.tzinfo is None:
+            since = since.replace(tzinfo=timezone.utc)
+        # HTTP 날짜는 초 단위이므로 분석 시각의 초 미만은 버리고 비교
+        return updated_at.replace(tzinfo=timezone.utc, microsecond=0) <= since
+    return False
+
+
+@router.post("/batch")
+async def analyze_stock_batch(request: StockBatchRequest):
+    """
+    여러 종목을 일괄 분석하여 완료되는 순서대로 Server-Sent Events로 반환하는 API
+
+    캐시된 종목은 즉시 전송되고, 캐시 미스 종목만 제한된 동시성으로 분석합니다.
+
+    이벤트 종류:
+        result: {"company": 입력값, "data": StockResponse}
+        error: {"company": 입력값, "detail": 오류 메시지}
+        done: {"total": 전체 건수, "succeeded": 성공 건수, "failed": 실패 건수} - 마지막 이벤트
+
+    Args:
+        request: StockBatchRequest (companies: 기업명 또는 심볼 목록, 최대 200개)
+    """
+    async def event_stream() -> AsyncIterator[str]:
+        succeeded = failed = 0
+        try:
+            async for company, result in stock_service.analyze_batch_async(
+                request.companies, deadline_seconds=REQUEST_DEADLINE_SECONDS
+            ):
+                if isinstance(result, Exception):
+                    failed += 1
+                    yield format_sse("error", {"company": company, "detail": f"Error: {str(result)}"})
+                else:
+                    succeeded += 1
+                    yield format_sse("result", {"company": company, "data": result.model_dump()})
+        except Exception as e:
+            # 일괄 조회 단계 오류 (DB 장애 등) - 스트림이 이미 시작되었으므로 이벤트로 전달
+            yield format_sse("error", {"company": None, "detail": f"Error: {str(e)}"})
+        yield format_sse("done", {"total": succeeded + failed, "succeeded": succeeded, "failed": failed})
+
+    return StreamingResponse(event_stream(), media_type="text/event-stream", headers=SSE_HEADERS)
+
+
+@router.post("/jobs", response_model=StockJobResponse, status_code=202)
+async def submit_analysis_job(body: StockRequest, request: Request, response: Response):
+    """
+    분석 작업을 제출하고 작업 ID를 즉시 반환하는 API (긴 분석으로 인한 프록시 시간 초과 방지)
+
+    같은 종목의 대기/실행 중인 작업이 있으면 새로 만들지 않고 그 작업을 반환합니다 (deduplicated: true).
+    결과는 Location 헤더의 GET /api/stock/jobs/{job_id}로 조회합니다.
+
+    Args:
+        body: StockRequest (company: 기업명 또는 심볼)
+
+    Returns:
+        StockJobResponse: 작업 상태 (queued / running)
+    """
+    try:
+        job = await stock_service.jobs.submit(body.company)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error: {str(e)}")
+    response.headers["Location"] = str(request.url_for("get_analysis_job", job_id=job.job_id))
+    return job
+
+
+@router.get("/jobs/{job_id}", response_model=StockJobResponse)
+async def get_analysis_job(job_id: str, response: Response):
+    """
+    분석 작업 상태/결과 조회 API
+
+    Args:
+        job_id: 작업 ID
+
+    Returns:
+        StockJobResponse: succeeded이면 result, failed이면 error 포함
+        (queued / running이면 Retry-After 헤더로 다음 조회 시점 안내)
+    """
+    job = await stock_service.jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="작업을 찾을 수 없습니다")
+    if job.status in ("queued", "running"):
+        response.headers["Retry-After"] = str(JOB_POLL_AFTER_SECONDS)
+    return job
+
 
 @router.get("/{company}", response_model=StockResponse)
-async def get_stock_analysis(company: str):
+async def get_stock_analysis(company: str, request: Request, response: Response):
     """
     주식 종목을 종합 분석하고 매수/매도/홀딩 추천을 제공하는 API
     기업명 또는 심볼 모두 사용 가능 (예: "테슬라", "TSLA", "엔비디아", "NVDA")
 
+    응답에는 ETag / Last-Modified / Cache-Control(max-age = 남은 캐시 유효 시간)이 포함되며,
+    If-None-Match / If-Modified-Since가 최신 분석과 일치하면 본문 없이 304를 반환합니다.
+
     Args:
         company: 기업명 또는 심볼
 
     Returns:
         StockResponse: 분석 결과
     """
+    deadline = Deadline.after(REQUEST_DEADLINE_SECONDS)
     try:
-        return stock_service.analyze_stock(company)
+        # 조건부 요청: 분석 시각만 조회하여 변경이 없으면 본문 직렬화 없이 304
+        if "if-none-match" in request.headers or "if-modified-since" in request.headers:
+            version = await stock_service.get_analysis_version(company, deadline)
+            if version:
+                symbol, updated_at = version
+                headers = validator_headers(symbol, updated_at, stock_service.remaining_ttl(updated_at))
+                if is_not_modified(request, headers["ETag"], updated_at):
+                    CACHE_EVENTS.inc(cache="http_conditional", result="hit")
+                    return Response(status_code=304, headers=headers)
+            CACHE_EVENTS.inc(cache="http_conditional", result="miss")
+
+        result = await stock_service.analyze_stock_async(company, deadline=deadline)
+        if result.updated_at:
+            response.headers.update(
+                validator_headers(
+                    result.symbol, result.updated_at, stock_service.remaining_ttl(result.updated_at), result.stale
+                )
+            )
+        return result
+    except CircuitOpenError as e:
+        # 업스트림 장애 중이고 대체할 캐시도 없음 - 재시도 시점 안내
+        raise HTTPException(
+            status_code=503,
+            detail=f"Error: {str(e)}",
+            headers={"Retry-After": str(max(1, int(e.retry_after)))},
+        )
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error: {str(e)}")
+
+
+@router.get("/{company}/stream")
+async def stream_stock_analysis(company: str):
+    """
+    주식 분석 진행 상황을 Server-Sent Events로 스트리밍하는 API
+
+    이벤트 종류:
+        start: 요청 접수 (즉시 전송)
+        symbol: 심볼 변환 완료
+        cache_hit / cache_miss: 분석 캐시 조회 결과
+        waiting: 같은 심볼의 진행 중인 분석 결과 대기
+        tool_call / tool_result: 웹 검색 도구 호출 시작/완료
+        token: 모델 출력 토큰
+        result: 최종 분석 결과 (StockResponse) - 마지막 이벤트
+        error: 오류 발생 - 마지막 이벤트
+
+    Args:
+        company: 기업명 또는 심볼
+    """
+    queue: "asyncio.Queue[Optional[Tuple[str, Dict[str, Any]]]]" = asyncio.Queue()
+
+    async def on_event(event: str, data: Dict[str, Any]):
+        queue.put_nowait((event, data))
+
+    deadline = Deadline.after(REQUEST_DEADLINE_SECONDS)
+
+    async def run():
+        try:
+            result = await stock_service.analyze_stock_async(company, on_event=on_event, deadline=deadline)
+            queue.put_nowait(("result", result.model_dump()))
+        except Exception as e:
+            queue.put_nowait(("error", {"detail": f"Error: {str(e)}"}))
+        finally:
+            queue.put_nowait(None)
+
+    async def event_stream() -> AsyncIterator[str]:
+        yield format_sse("start", {"company": company})
+        task = asyncio.create_task(run())
+        try:
+            while (item := await queue.get()) is not None:
+                event, data = item
+                yield format_sse(event, data)
+        finally:
+            # 클라이언트 연결 종료 시 대기만 취소 (공유 분석 작업은 계속 진행되어 캐시에 저장됨)
+            if not task.done():
+                task.cancel()
+
+    return StreamingResponse(event_stream(), media_type="text/event-stream", headers=SSE_HEADERS)
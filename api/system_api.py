@@ -0,0 +1,54 @@
+from fastapi import APIRouter
+from database import pool_stats
+from .stock_api import stock_service
+
+router = APIRouter(prefix="/api/system", tags=["system"])
+
+
+@router.get("/cache")
+async def get_cache_stats():
+    """
+    L1 인메모리 캐시 통계 (크기, 적중/실패 횟수, 적중률)
+
+    Returns:
+        심볼 매핑 / 분석 결과 / MCP 도구 결과 캐시별 통계와
+        프롬프트 템플릿별 OpenAI 프롬프트 캐시 적중 토큰(cached_tokens)
+    """
+    return stock_service.cache_stats()
+
+
+@router.get("/models")
+async def get_model_stats():
+    """
+    단계별 OpenAI 모델 현황 (이 워커 기준)
+
+    Returns:
+        단계(symbol / tool_round / analysis)별 주 모델, 대체 모델,
+        주 모델 응답 시간 EWMA(초), 대체 모델 사용 중 여부(degraded)
+    """
+    return stock_service.agent.models.stats()
+
+
+@router.get("/circuits")
+async def get_circuit_stats():
+    """
+    업스트림 서킷 브레이커 상태 (이 워커 기준)
+
+    Returns:
+        openai / mcp별 상태(closed / open / half_open)와 연속 실패 횟수
+    """
+    return {
+        "openai": stock_service.agent.openai_breaker.stats(),
+        "mcp": stock_service.agent.mcp_breaker.stats(),
+    }
+
+
+@router.get("/pool")
+async def get_pool_stats():
+    """
+    DB 연결 풀 현황 (이 워커 기준)
+
+    Returns:
+        워커 수/연결 예산과 엔진별 사용 중·유휴·초과 연결 수, 누적 획득 대기 시간
+    """
+    return pool_stats()
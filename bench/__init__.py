@@ -0,0 +1 @@
+"""오프라인 부하 테스트 / 벤치마크 (가짜 OpenAI 서버 + MCP 스텁 + 로컬 PostgreSQL)"""
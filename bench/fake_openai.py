@@ -0,0 +1,262 @@
+"""
+벤치마크용 가짜 OpenAI Chat Completions 서버
+
+실제 GPT-5 대신 설정한 지연 시간 후 고정 응답을 돌려줍니다.
+- 심볼 변환 요청: "입력값 대문자|입력값 대문자 Inc."
+- 분석 요청 (tools 포함, 아직 도구 결과가 없을 때): brave_web_search tool_calls
+- 분석 요청 (그 외): response_format이 있으면 StockAnalysisResult JSON, 없으면 마크다운
+- stream=True면 SSE 청크를 토큰 간격마다 전송 (stream_options.include_usage 지원)
+- 같은 prompt_cache_key의 두 번째 요청부터 시스템 프롬프트 토큰을 cached_tokens로 보고
+
+실행:
+    python -m bench.fake_openai --port 18080 --latency-ms 800 --token-delay-ms 5
+
+GET /stats: 요청 종류별 호출 수, POST /stats/reset: 초기화
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+import uuid
+from typing import Any, Dict, List
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+ANALYSIS_JSON = {
+    "short_term": {"action": "BUY", "reason": "- 단기 모멘텀\n- 거래량 증가\n- 실적 기대"},
+    "mid_term": {"action": "HOLD", "reason": "- 밸류에이션 부담\n- 업황 회복 지연\n- 금리 불확실성"},
+    "long_term": {"action": "BUY", "reason": "- 시장 점유율\n- 신사업 성장\n- 재무 건전성"},
+    "analysis": "벤치마크용 고정 분석 결과입니다. " * 20,
+}
+
+ANALYSIS_MARKDOWN = """**단기 투자 의견 (1일~1주일)**: BUY
+**단기 이유**:
+- 단기 모멘텀
+- 거래량 증가
+- 실적 기대
+
+**중기 투자 의견 (1주일~3개월)**: HOLD
+**중기 이유**:
+- 밸류에이션 부담
+- 업황 회복 지연
+- 금리 불확실성
+
+**장기 투자 의견 (3개월~1년)**: BUY
+**장기 이유**:
+- 시장 점유율
+- 신사업 성장
+- 재무 건전성
+
+**종합 분석**:
+""" + "벤치마크용 고정 분석 결과입니다. " * 20
+
+
+class FakeOpenAIConfig:
+    """응답 지연 / 스트리밍 / 도구 호출 설정"""
+
+    def __init__(
+        self,
+        latency_ms: float = 800,
+        jitter_ms: float = 200,
+        token_delay_ms: float = 5,
+        chunk_chars: int = 8,
+        tool_calls: int = 2,
+        error_rate: float = 0.0,
+    ):
+        self.latency_ms = latency_ms  # 첫 토큰까지 지연 (TTFT)
+        self.jitter_ms = jitter_ms
+        self.token_delay_ms = token_delay_ms  # 스트리밍 청크 간격
+        self.chunk_chars = chunk_chars  # 청크당 문자 수
+        self.tool_calls = tool_calls  # 분석 첫 응답의 도구 호출 수 (0이면 도구 없이 바로 답변)
+        self.error_rate = error_rate  # 429 응답 비율
+
+
+def _estimate_tokens(text: str) -> int:
+    return max(1, len(text) // 4)
+
+
+def _message_text(message: Dict[str, Any]) -> str:
+    content = message.get("content")
+    if isinstance(content, list):
+        return "".join(part.get("text", "") for part in content if isinstance(part, dict))
+    return content or ""
+
+
+def create_app(config: FakeOpenAIConfig) -> FastAPI:
+    """가짜 OpenAI 서버 앱 생성"""
+    app = FastAPI(title="Fake OpenAI")
+    stats: Dict[str, int] = {}
+    seen_cache_keys: set = set()
+
+    def _count(kind: str):
+        stats[kind] = stats.get(kind, 0) + 1
+
+    def _usage(body: Dict[str, Any], completion_text: str) -> Dict[str, Any]:
+        messages = body.get("messages", [])
+        prompt_tokens = sum(_estimate_tokens(_message_text(m)) for m in messages)
+        cached = 0
+        cache_key = body.get("prompt_cache_key")
+        if cache_key and messages:
+            if cache_key in seen_cache_keys:
+                cached = min(prompt_tokens, _estimate_tokens(_message_text(messages[0])))
+            seen_cache_keys.add(cache_key)
+        completion_tokens = _estimate_tokens(completion_text)
+        return {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens,
+            "prompt_tokens_details": {"cached_tokens": cached},
+        }
+
+    def _build_reply(body: Dict[str, Any]) -> Dict[str, Any]:
+        """요청 종류에 맞는 assistant 메시지와 finish_reason 결정"""
+        messages = body.get("messages", [])
+        system = _message_text(messages[0]) if messages else ""
+        user = _message_text(messages[-1]) if messages else ""
+
+        if "주식 심볼 전문가" in system:
+            _count("symbol_resolve")
+            symbol = user.strip().upper()
+            return {"content": f"{symbol}|{symbol} Inc.", "tool_calls": None, "finish_reason": "stop"}
+
+        has_tool_results = any(m.get("role") == "tool" for m in messages)
+        if body.get("tools") and config.tool_calls > 0 and not has_tool_results:
+            _count("analysis_tool_calls")
+            subject = user.split(" ")[0]
+            tool_calls = [
+                {
+                    "id": f"call_{uuid.uuid4().hex[:12]}",
+                    "type": "function",
+                    "function": {
+                        "name": "brave_web_search",
+                        "arguments": json.dumps({"query": f"{subject} stock news {i}"}),
+                    },
+                }
+                for i in range(config.tool_calls)
+            ]
+            return {"content": None, "tool_calls": tool_calls, "finish_reason": "tool_calls"}
+
+        _count("analysis")
+        if body.get("response_format"):
+            content = json.dumps(ANALYSIS_JSON, ensure_ascii=False)
+        else:
+            content = ANALYSIS_MARKDOWN
+        return {"content": content, "tool_calls": None, "finish_reason": "stop"}
+
+    async def _first_token_delay():
+        delay = config.latency_ms + random.uniform(-config.jitter_ms, config.jitter_ms)
+        await asyncio.sleep(max(0.0, delay) / 1000)
+
+    @app.post("/v1/chat/completions")
+    async def chat_completions(request: Request):
+        body = await request.json()
+        _count("requests")
+
+        if config.error_rate and random.random() < config.error_rate:
+            _count("rate_limited")
+            return JSONResponse(
+                {"error": {"message": "Rate limit reached (fake)", "type": "rate_limit_error"}},
+                status_code=429,
+                headers={"retry-after": "1"},
+            )
+
+        reply = _build_reply(body)
+        completion_id = f"chatcmpl-{uuid.uuid4().hex}"
+        model = body.get("model", "gpt-5")
+        created = int(time.time())
+        usage = _usage(body, reply["content"] or json.dumps(reply["tool_calls"]))
+
+        if not body.get("stream"):
+            await _first_token_delay()
+            return {
+                "id": completion_id,
+                "object": "chat.completion",
+                "created": created,
+                "model": model,
+                "choices": [{
+                    "index": 0,
+                    "message": {"role": "assistant", "content": reply["content"], "tool_calls": reply["tool_calls"]},
+                    "finish_reason": reply["finish_reason"],
+                }],
+                "usage": usage,
+            }
+
+        include_usage = (body.get("stream_options") or {}).get("include_usage", False)
+
+        def _chunk(delta: Dict[str, Any], finish_reason=None, chunk_usage=None) -> str:
+            payload = {
+                "id": completion_id,
+                "object": "chat.completion.chunk",
+                "created": created,
+                "model": model,
+                "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}] if delta is not None else [],
+                "usage": chunk_usage,
+            }
+            return f"data: {json.dumps(payload, ensure_ascii=False)}\n\n"
+
+        async def stream():
+            await _first_token_delay()
+            yield _chunk({"role": "assistant", "content": ""})
+            if reply["tool_calls"]:
+                for index, call in enumerate(reply["tool_calls"]):
+                    yield _chunk({"tool_calls": [{
+                        "index": index, "id": call["id"], "type": "function",
+                        "function": {"name": call["function"]["name"], "arguments": call["function"]["arguments"]},
+                    }]})
+            else:
+                content = reply["content"]
+                for start in range(0, len(content), config.chunk_chars):
+                    if config.token_delay_ms:
+                        await asyncio.sleep(config.token_delay_ms / 1000)
+                    yield _chunk({"content": content[start:start + config.chunk_chars]})
+            yield _chunk({}, finish_reason=reply["finish_reason"])
+            if include_usage:
+                yield _chunk(None, chunk_usage=usage)
+            yield "data: [DONE]\n\n"
+
+        return StreamingResponse(stream(), media_type="text/event-stream")
+
+    @app.get("/stats")
+    async def get_stats() -> Dict[str, int]:
+        return dict(stats)
+
+    @app.post("/stats/reset")
+    async def reset_stats() -> Dict[str, int]:
+        stats.clear()
+        return {}
+
+    return app
+
+
+def parse_args(argv: List[str] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="벤치마크용 가짜 OpenAI 서버")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=18080)
+    parser.add_argument("--latency-ms", type=float, default=800, help="첫 토큰까지 지연 (기본 800ms)")
+    parser.add_argument("--jitter-ms", type=float, default=200, help="지연 시간 무작위 편차 (기본 ±200ms)")
+    parser.add_argument("--token-delay-ms", type=float, default=5, help="스트리밍 청크 간격 (기본 5ms)")
+    parser.add_argument("--chunk-chars", type=int, default=8, help="스트리밍 청크당 문자 수 (기본 8)")
+    parser.add_argument("--tool-calls", type=int, default=2, help="분석 1회당 도구 호출 수 (기본 2)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="429 응답 비율 (0~1, 기본 0)")
+    return parser.parse_args(argv)
+
+
+def main(argv: List[str] = None):
+    import uvicorn
+
+    args = parse_args(argv)
+    config = FakeOpenAIConfig(
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        token_delay_ms=args.token_delay_ms,
+        chunk_chars=args.chunk_chars,
+        tool_calls=args.tool_calls,
+        error_rate=args.error_rate,
+    )
+    uvicorn.run(create_app(config), host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
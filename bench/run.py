@@ -0,0 +1,313 @@
+"""
+오프라인 부하 테스트 / 벤치마크 실행기
+
+가짜 OpenAI 서버(bench.fake_openai)와 Brave Search MCP 스텁(bench.stub_mcp_server),
+로컬 PostgreSQL(bench/docker-compose.yml)을 사용하므로 실제 API 비용이 들지 않습니다.
+애플리케이션은 같은 프로세스에서 ASGI로 직접 호출합니다 (워커 1개 기준).
+
+실행:
+    docker compose -f bench/docker-compose.yml up -d
+    python -m bench.run all --requests 200 --concurrency 20 --output bench/results/base.json
+    python -m bench.run hot_burst --baseline bench/results/base.json
+
+주의: 매 시나리오 시작 시 벤치마크 DB(BENCH_DB_NAME, 기본 stock_bench)의 테이블을 다시 만듭니다.
+"""
+import argparse
+import asyncio
+import json
+import math
+import os
+import random
+import shlex
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import httpx
+
+from .scenarios import SCENARIOS, BenchOptions, BenchRequest
+
+STUB_MCP_PATH = Path(__file__).resolve().parent / "stub_mcp_server.py"
+
+
+def configure_environment(args: argparse.Namespace):
+    """
+    애플리케이션 import 전에 환경 변수 설정
+
+    DB / OpenAI / MCP 연결은 항상 벤치마크용으로 덮어쓰고,
+    나머지 튜닝 값(L1_CACHE_SIZE, BATCH_CONCURRENCY 등)은 셸에서 지정한 값을 그대로 사용합니다.
+    """
+    os.environ.update({
+        "DB_HOST": os.getenv("BENCH_DB_HOST", "localhost"),
+        "DB_PORT": os.getenv("BENCH_DB_PORT", "55432"),
+        "DB_NAME": os.getenv("BENCH_DB_NAME", "stock_bench"),
+        "DB_USER": os.getenv("BENCH_DB_USER", "bench"),
+        "DB_PASSWORD": os.getenv("BENCH_DB_PASSWORD", "bench"),
+        "OPENAI_API_KEY": "bench",
+        "BRAVE_API_KEY": "bench",
+        "BRAVE_MCP_COMMAND": sys.executable,
+        "BRAVE_MCP_ARGS": " ".join(shlex.quote(part) for part in (
+            str(STUB_MCP_PATH),
+            "--latency-ms", str(args.mcp_latency_ms),
+            "--jitter-ms", str(args.mcp_jitter_ms),
+        )),
+    })
+    os.environ.setdefault("UVICORN_WORKERS", "1")
+    os.environ.setdefault("PREWARM_ENABLED", "false")
+    os.environ.setdefault("ANALYSIS_RETENTION_DAYS", "0")
+    os.environ.setdefault("JOB_WORKERS", "0")  # 작업 워커 폴링 쿼리가 db_queries에 섞이지 않도록
+
+
+def start_fake_openai(args: argparse.Namespace) -> subprocess.Popen:
+    """가짜 OpenAI 서버 하위 프로세스 시작 후 응답할 때까지 대기"""
+    process = subprocess.Popen([
+        sys.executable, "-m", "bench.fake_openai",
+        "--port", str(args.openai_port),
+        "--latency-ms", str(args.openai_latency_ms),
+        "--jitter-ms", str(args.openai_jitter_ms),
+        "--token-delay-ms", str(args.token_delay_ms),
+        "--tool-calls", str(args.tool_calls),
+        "--error-rate", str(args.openai_error_rate),
+    ], cwd=Path(__file__).resolve().parent.parent)
+
+    deadline = time.monotonic() + 15
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError("가짜 OpenAI 서버 시작 실패")
+        try:
+            httpx.get(f"http://127.0.0.1:{args.openai_port}/stats", timeout=1)
+            return process
+        except httpx.HTTPError:
+            time.sleep(0.2)
+    process.terminate()
+    raise TimeoutError("가짜 OpenAI 서버 시작 시간 초과")
+
+
+class QueryCounter:
+    """SQLAlchemy 엔진에서 실행된 SQL 문 수 집계"""
+
+    def __init__(self, *engines):
+        from sqlalchemy import event
+
+        self.count = 0
+        for engine in engines:
+            if engine is not None:
+                event.listen(getattr(engine, "sync_engine", engine), "before_cursor_execute", self._on_execute)
+
+    def _on_execute(self, *_):
+        self.count += 1
+
+
+def percentile(sorted_values: List[float], p: float) -> float:
+    """nearest-rank 백분위수"""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(p / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+async def _run_requests(
+    client: httpx.AsyncClient, requests: List[BenchRequest], concurrency: int
+) -> List[Dict[str, Any]]:
+    """concurrency개 작업자가 요청 목록을 순서대로 나눠 실행"""
+    queue: asyncio.Queue = asyncio.Queue()
+    for request in requests:
+        queue.put_nowait(request)
+    samples: List[Dict[str, Any]] = []
+
+    async def worker():
+        while not queue.empty():
+            request = queue.get_nowait()
+            start = time.perf_counter()
+            try:
+                response = await client.request(request.method, request.path, json=request.json)
+                # 일괄 분석(SSE)은 스트림 안의 error 이벤트도 실패로 집계
+                failed = response.status_code >= 400 or "event: error" in response.text
+                status = response.status_code
+            except Exception as e:
+                failed, status = True, type(e).__name__
+            samples.append({"latency": time.perf_counter() - start, "failed": failed, "status": status})
+
+    await asyncio.gather(*(worker() for _ in range(max(1, concurrency))))
+    return samples
+
+
+async def _fake_openai_requests(openai_url: str) -> int:
+    async with httpx.AsyncClient() as client:
+        return (await client.get(f"{openai_url}/stats")).json().get("requests", 0)
+
+
+async def reset_state(stock_service):
+    """시나리오 간 상태 초기화 (벤치마크 DB 테이블 재생성 + 인메모리 캐시 비우기)"""
+    from database import engine, init_db
+    from database.models import Base
+
+    await asyncio.to_thread(Base.metadata.drop_all, engine)
+    await asyncio.to_thread(init_db)
+    stock_service.symbol_l1.clear()
+    stock_service.analysis_l1.clear()
+    stock_service.agent.tool_cache.memory.clear()
+
+
+async def run_scenario(
+    name: str, options: BenchOptions, client: httpx.AsyncClient, stock_service,
+    counter: QueryCounter, openai_url: str, reset: bool,
+) -> Dict[str, Any]:
+    """시나리오 하나 실행 후 결과 요약"""
+    from utils.metrics import TOOL_CALLS
+
+    scenario = SCENARIOS[name]
+    if reset:
+        await reset_state(stock_service)
+
+    warmup = scenario.warmup(options, random.Random(options.seed))
+    if warmup:
+        await _run_requests(client, warmup, options.concurrency)
+
+    requests = scenario.build(options, random.Random(options.seed))
+    queries_before = counter.count
+    openai_before = await _fake_openai_requests(openai_url)
+    tools_before = TOOL_CALLS.total()
+
+    started = time.perf_counter()
+    samples = await _run_requests(client, requests, options.concurrency)
+    elapsed = time.perf_counter() - started
+
+    latencies = sorted(sample["latency"] * 1000 for sample in samples)
+    errors = sum(1 for sample in samples if sample["failed"])
+    db_queries = counter.count - queries_before
+    return {
+        "scenario": name,
+        "requests": len(samples),
+        "concurrency": options.concurrency,
+        "errors": errors,
+        "duration_s": round(elapsed, 3),
+        "rps": round(len(samples) / elapsed, 2) if elapsed else 0.0,
+        "latency_ms": {
+            "p50": round(percentile(latencies, 50), 2),
+            "p95": round(percentile(latencies, 95), 2),
+            "p99": round(percentile(latencies, 99), 2),
+            "max": round(latencies[-1], 2) if latencies else 0.0,
+            "mean": round(sum(latencies) / len(latencies), 2) if latencies else 0.0,
+        },
+        "db_queries": db_queries,
+        "db_queries_per_request": round(db_queries / len(samples), 2) if samples else 0.0,
+        "openai_requests": await _fake_openai_requests(openai_url) - openai_before,
+        "mcp_tool_calls": int(TOOL_CALLS.total() - tools_before),
+    }
+
+
+def print_result(result: Dict[str, Any], baseline: Optional[Dict[str, Any]] = None):
+    """결과 출력 (기준 결과가 있으면 변화율 함께 표시)"""
+    latency = result["latency_ms"]
+    rows = [
+        ("rps", result["rps"], True),
+        ("p50_ms", latency["p50"], False),
+        ("p95_ms", latency["p95"], False),
+        ("p99_ms", latency["p99"], False),
+        ("errors", result["errors"], False),
+        ("db_queries/req", result["db_queries_per_request"], False),
+        ("openai_requests", result["openai_requests"], False),
+        ("mcp_tool_calls", result["mcp_tool_calls"], False),
+    ]
+    base_values = {}
+    if baseline:
+        base_latency = baseline["latency_ms"]
+        base_values = {
+            "rps": baseline["rps"], "p50_ms": base_latency["p50"], "p95_ms": base_latency["p95"],
+            "p99_ms": base_latency["p99"], "errors": baseline["errors"],
+            "db_queries/req": baseline["db_queries_per_request"],
+            "openai_requests": baseline["openai_requests"], "mcp_tool_calls": baseline["mcp_tool_calls"],
+        }
+
+    print(f"\n[BENCH] {result['scenario']} - {result['requests']} requests, "
+          f"concurrency {result['concurrency']}, {result['duration_s']}s")
+    for label, value, higher_is_better in rows:
+        line = f"  {label:<16} {value:>12}"
+        if label in base_values:
+            base = base_values[label]
+            change = ((value - base) / base * 100) if base else 0.0
+            better = (change > 0) == higher_is_better if change else None
+            mark = "" if better is None else (" (better)" if better else " (worse)")
+            line += f"   baseline {base:>12}  {change:+.1f}%{mark}"
+        print(line)
+
+
+def parse_args(argv: List[str] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="오프라인 부하 테스트 / 벤치마크")
+    parser.add_argument("scenario", choices=[*SCENARIOS, "all"], help="실행할 시나리오")
+    parser.add_argument("--requests", type=int, default=200, help="측정 요청 수 (기본 200)")
+    parser.add_argument("--concurrency", type=int, default=20, help="동시 요청 수 (기본 20)")
+    parser.add_argument("--batch-size", type=int, default=20, help="batch_screener 요청당 종목 수 (기본 20)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--openai-url", help="이미 실행 중인 가짜 OpenAI 서버 주소 (없으면 하위 프로세스로 시작)")
+    parser.add_argument("--openai-port", type=int, default=18080)
+    parser.add_argument("--openai-latency-ms", type=float, default=800)
+    parser.add_argument("--openai-jitter-ms", type=float, default=200)
+    parser.add_argument("--openai-error-rate", type=float, default=0.0)
+    parser.add_argument("--token-delay-ms", type=float, default=5)
+    parser.add_argument("--tool-calls", type=int, default=2)
+    parser.add_argument("--mcp-latency-ms", type=float, default=300)
+    parser.add_argument("--mcp-jitter-ms", type=float, default=100)
+    parser.add_argument("--no-reset", action="store_true", help="시나리오 시작 시 DB/캐시를 초기화하지 않음")
+    parser.add_argument("--output", help="결과 JSON 저장 경로")
+    parser.add_argument("--baseline", help="비교할 기준 결과 JSON 경로")
+    return parser.parse_args(argv)
+
+
+async def main_async(args: argparse.Namespace, openai_url: str) -> List[Dict[str, Any]]:
+    # 환경 변수 설정 후 import (엔진/에이전트가 import 시점에 설정을 읽음)
+    import main as app_module
+    from api import stock_service
+    from database import async_engine, engine
+
+    # 에이전트 클라이언트를 가짜 OpenAI 서버로 교체 (max_retries=0 등 운영 클라이언트 설정 유지)
+    stock_service.agent.client = stock_service.agent.client.with_options(
+        base_url=f"{openai_url}/v1", api_key="bench"
+    )
+    counter = QueryCounter(engine, async_engine)
+    options = BenchOptions(
+        requests=args.requests, concurrency=args.concurrency, batch_size=args.batch_size, seed=args.seed
+    )
+    names = list(SCENARIOS) if args.scenario == "all" else [args.scenario]
+    baseline = {}
+    if args.baseline:
+        baseline = {item["scenario"]: item for item in json.loads(Path(args.baseline).read_text())}
+
+    results = []
+    transport = httpx.ASGITransport(app=app_module.app)
+    async with app_module.lifespan(app_module.app):
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+            for name in names:
+                result = await run_scenario(
+                    name, options, client, stock_service, counter, openai_url, reset=not args.no_reset
+                )
+                print_result(result, baseline.get(name))
+                results.append(result)
+    return results
+
+
+def main(argv: List[str] = None):
+    args = parse_args(argv)
+    openai_url = args.openai_url or f"http://127.0.0.1:{args.openai_port}"
+    configure_environment(args)
+
+    process = None if args.openai_url else start_fake_openai(args)
+    try:
+        results = asyncio.run(main_async(args, openai_url))
+    finally:
+        if process:
+            process.terminate()
+            process.wait()
+
+    if args.output:
+        output = Path(args.output)
+        output.parent.mkdir(parents=True, exist_ok=True)
+        output.write_text(json.dumps(results, ensure_ascii=False, indent=2))
+        print(f"\n[BENCH] 결과 저장: {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+"""
+벤치마크 시나리오
+
+각 시나리오는 측정 전 워밍업 요청과 측정 대상 요청 목록을 만듭니다.
+같은 seed면 같은 요청 순서가 만들어지므로 변경 전후 결과를 비교할 수 있습니다.
+"""
+import csv
+import random
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+SYMBOLS_PATH = Path(__file__).resolve().parent.parent / "config" / "stock_symbols.csv"
+
+# 동시 요청이 몰리는 인기 종목 (로컬 심볼 데이터에 있는 종목)
+HOT_SYMBOLS = ["TSLA", "AAPL", "NVDA", "MSFT", "005930.KS"]
+
+
+@dataclass
+class BenchOptions:
+    """시나리오 공통 설정"""
+    requests: int = 200
+    concurrency: int = 20
+    batch_size: int = 20
+    seed: int = 42
+
+
+@dataclass
+class BenchRequest:
+    """API 요청 하나"""
+    method: str
+    path: str
+    json: Optional[Dict[str, Any]] = None
+
+
+@dataclass
+class Scenario:
+    name: str
+    description: str
+    build: Callable[[BenchOptions, random.Random], List[BenchRequest]]
+    warmup: Callable[[BenchOptions, random.Random], List[BenchRequest]] = field(default=lambda options, rng: [])
+
+
+def _known_symbols() -> List[str]:
+    """로컬 심볼 데이터(config/stock_symbols.csv)의 심볼 목록"""
+    with SYMBOLS_PATH.open(encoding="utf-8") as f:
+        return [row["symbol"] for row in csv.DictReader(f)]
+
+
+def _unknown_symbol(i: int) -> str:
+    """로컬 데이터에 없는 가상 심볼 (심볼 변환까지 LLM 경로를 거침)"""
+    return f"BENCHX{i:05d}"
+
+
+def _get(symbol: str) -> BenchRequest:
+    return BenchRequest("GET", f"/api/stock/{symbol}")
+
+
+def _hot_burst(options: BenchOptions, rng: random.Random) -> List[BenchRequest]:
+    return [_get(rng.choice(HOT_SYMBOLS)) for _ in range(options.requests)]
+
+
+def _long_tail(options: BenchOptions, rng: random.Random) -> List[BenchRequest]:
+    return [_get(_unknown_symbol(i)) for i in range(options.requests)]
+
+
+def _screener_universe() -> List[str]:
+    known = _known_symbols()[:60]
+    return known + [_unknown_symbol(i) for i in range(40)]
+
+
+def _batch_screener(options: BenchOptions, rng: random.Random) -> List[BenchRequest]:
+    universe = _screener_universe()
+    size = min(options.batch_size, len(universe))
+    return [
+        BenchRequest("POST", "/api/stock/batch", {"companies": rng.sample(universe, size)})
+        for _ in range(options.requests)
+    ]
+
+
+def _cache_universe() -> List[str]:
+    return _known_symbols()[:20]
+
+
+def _cache_only_warmup(options: BenchOptions, rng: random.Random) -> List[BenchRequest]:
+    return [_get(symbol) for symbol in _cache_universe()]
+
+
+def _cache_only(options: BenchOptions, rng: random.Random) -> List[BenchRequest]:
+    universe = _cache_universe()
+    return [_get(rng.choice(universe)) for _ in range(options.requests)]
+
+
+SCENARIOS: Dict[str, Scenario] = {
+    scenario.name: scenario
+    for scenario in (
+        Scenario(
+            "hot_burst",
+            "빈 캐시에서 소수 인기 종목에 동시 요청 집중 (단일 비행/코디네이션 효과)",
+            _hot_burst,
+        ),
+        Scenario(
+            "long_tail",
+            "매 요청이 서로 다른 미지 종목 - 심볼 변환부터 분석까지 전부 캐시 미스",
+            _long_tail,
+        ),
+        Scenario(
+            "batch_screener",
+            "POST /api/stock/batch로 100개 종목 풀에서 batch_size개씩 무작위 조회",
+            _batch_screener,
+        ),
+        Scenario(
+            "cache_only",
+            "20개 종목을 미리 분석한 뒤 캐시 적중 요청만 측정 (L1_CACHE_SIZE=0이면 DB 캐시 경로)",
+            _cache_only,
+            warmup=_cache_only_warmup,
+        ),
+    )
+}
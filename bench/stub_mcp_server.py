@@ -0,0 +1,55 @@
+"""
+벤치마크용 Brave Search MCP 스텁 서버 (stdio)
+
+@modelcontextprotocol/server-brave-search와 같은 도구 이름/인자로
+설정한 지연 시간 후 고정 검색 결과를 돌려줍니다. 외부 API를 호출하지 않습니다.
+
+MCPSessionManager가 하위 프로세스로 실행하므로 설정은 환경 변수가 아닌 인자로 전달합니다:
+    BRAVE_MCP_COMMAND=python
+    BRAVE_MCP_ARGS="bench/stub_mcp_server.py --latency-ms 300"
+"""
+import argparse
+import asyncio
+import random
+
+from mcp.server.fastmcp import FastMCP
+
+
+def create_server(latency_ms: float, jitter_ms: float) -> FastMCP:
+    """지연 시간이 설정된 스텁 서버 생성"""
+    server = FastMCP("brave-search-stub", log_level="WARNING")
+
+    async def _delay():
+        delay = latency_ms + random.uniform(-jitter_ms, jitter_ms)
+        await asyncio.sleep(max(0.0, delay) / 1000)
+
+    @server.tool()
+    async def brave_web_search(query: str, count: int = 10, offset: int = 0) -> str:
+        """Performs a web search using the Brave Search API (stub)."""
+        await _delay()
+        return "\n\n".join(
+            f"Title: {query} - result {offset + i + 1}\n"
+            f"Description: Stub search result for benchmarking ({query}).\n"
+            f"URL: https://example.com/{offset + i + 1}"
+            for i in range(min(count, 5))
+        )
+
+    @server.tool()
+    async def brave_local_search(query: str, count: int = 5) -> str:
+        """Searches for local businesses and places using Brave's Local Search API (stub)."""
+        await _delay()
+        return f"Name: {query} (stub)\nAddress: N/A"
+
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Brave Search MCP 스텁 서버")
+    parser.add_argument("--latency-ms", type=float, default=300, help="도구 호출 지연 (기본 300ms)")
+    parser.add_argument("--jitter-ms", type=float, default=100, help="지연 시간 무작위 편차 (기본 ±100ms)")
+    args = parser.parse_args()
+    create_server(args.latency_ms, args.jitter_ms).run()
+
+
+if __name__ == "__main__":
+    main()
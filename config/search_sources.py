@@ -3,6 +3,7 @@
 
 검색 허용 사이트를 관리합니다.
 """
+from functools import lru_cache
 
 # 미국 주식 정보 출처
 US_STOCK_SOURCES = [
@@ -31,8 +32,9 @@ KR_STOCK_SOURCES = [
 ALLOWED_SOURCES = US_STOCK_SOURCES + KR_STOCK_SOURCES
 
 
+@lru_cache(maxsize=1)
 def get_search_instruction() -> str:
-    """검색 가이드라인 텍스트 생성"""
+    """검색 가이드라인 텍스트 생성 (최초 1회만 생성, 프롬프트 prefix 고정)"""
     us_sites = "\n".join([f"- site:{site}" for site in US_STOCK_SOURCES])
     kr_sites = "\n".join([f"- site:{site}" for site in KR_STOCK_SOURCES])
 
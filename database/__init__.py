@@ -1,15 +1,59 @@
-from .models import Base, StockAnalysisCache, StockSymbolMapping
-from .connection import engine, SessionLocal, get_db, get_db_session, init_db
+from .models import (
+    Base,
+    StockAnalysisCache,
+    StockAnalysisCurrent,
+    StockSymbolMapping,
+    ToolResultCache,
+    StockAccessStats,
+    AnalysisJob,
+)
+from .connection import (
+    engine,
+    lock_engine,
+    SessionLocal,
+    async_engine,
+    AsyncSessionLocal,
+    get_db,
+    get_db_session,
+    init_db,
+    run_db,
+    pool_stats,
+    get_worker_count,
+)
 from .repository import StockRepository
+from .coordination import (
+    AnalysisCoordinator,
+    AnalysisReadyListener,
+    ANALYSIS_READY_CHANNEL,
+    advisory_lock_key,
+    try_advisory_lock,
+    release_advisory_lock,
+)
 
 __all__ = [
     "Base",
     "StockAnalysisCache",
+    "StockAnalysisCurrent",
     "StockSymbolMapping",
+    "ToolResultCache",
+    "StockAccessStats",
+    "AnalysisJob",
     "engine",
+    "lock_engine",
     "SessionLocal",
     "get_db",
     "get_db_session",
     "init_db",
+    "async_engine",
+    "AsyncSessionLocal",
+    "run_db",
+    "pool_stats",
+    "get_worker_count",
     "StockRepository",
+    "AnalysisCoordinator",
+    "AnalysisReadyListener",
+    "ANALYSIS_READY_CHANNEL",
+    "advisory_lock_key",
+    "try_advisory_lock",
+    "release_advisory_lock",
 ]
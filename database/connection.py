@@ -1,13 +1,22 @@
+import asyncio
+import logging
 import os
-from sqlalchemy import create_engine
+import threading
+import time
+from sqlalchemy import create_engine, exc
+from sqlalchemy.engine import Engine
 from sqlalchemy.orm import sessionmaker, Session
-from sqlalchemy.pool import QueuePool
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
 from dotenv import load_dotenv
 from contextlib import contextmanager
-from typing import Generator
+from typing import Any, Callable, Dict, Generator, Optional, Tuple, TypeVar
 
 from .models import Base
 
+T = TypeVar("T")
+
+logger = logging.getLogger(__name__)
+
 # 환경 변수 로드
 load_dotenv()
 
@@ -22,36 +31,179 @@ class DatabaseConfig:
         self.user = os.getenv("DB_USER", "postgres")
         self.password = os.getenv("DB_PASSWORD", "postgres")
 
+        # 컨테이너당 PostgreSQL 연결 총 예산을 워커 수로 나누어 워커별 풀 크기 결정
+        self.workers = get_worker_count()
+        self.connection_budget = int(os.getenv("DB_CONNECTION_BUDGET", "30"))
+        self.pool_timeout = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+        # advisory lock 전용 풀 (분석 리더가 분석 내내 락 연결을 점유하므로 요청 처리 풀과 분리)
+        self.lock_pool_size = max(1, int(os.getenv("DB_LOCK_POOL_SIZE", "3")))
+        self.lock_pool_timeout = float(os.getenv("DB_LOCK_POOL_TIMEOUT", "1"))
+        # 비동기 엔진(asyncpg) 사용 여부 - 선택 의존성 (uv sync --extra async)
+        self.use_async = os.getenv("DB_ASYNC", "false").lower() in ("1", "true", "yes")
+
     @property
     def database_url(self) -> str:
-        """PostgreSQL 연결 URL 생성"""
-        return f"postgresql://{self.user}:{self.password}@{self.host}:{self.port}/{self.database}"
+        """PostgreSQL 연결 URL 생성 (coordination의 LISTEN/NOTIFY가 psycopg2 API를 사용하므로 드라이버 명시)"""
+        return f"postgresql+psycopg2://{self.user}:{self.password}@{self.host}:{self.port}/{self.database}"
+
+    @property
+    def async_database_url(self) -> str:
+        """PostgreSQL 비동기(asyncpg) 연결 URL 생성"""
+        return f"postgresql+asyncpg://{self.user}:{self.password}@{self.host}:{self.port}/{self.database}"
+
+    @property
+    def reserved_connections(self) -> int:
+        """워커당 요청 처리 풀 밖에서 쓰는 연결 수 (advisory lock 전용 풀 + LISTEN 연결)"""
+        return self.lock_pool_size + 1
+
+    def pool_sizes(self, share: float = 1.0) -> Tuple[int, int]:
+        """
+        워커 하나의 엔진 풀 크기 계산
+
+        Args:
+            share: 워커 예산 중 이 엔진에 배정할 비율 (동기/비동기 엔진을 함께 쓸 때 분할)
+
+        Returns:
+            (pool_size, max_overflow) - 상시 연결 2/3, 순간 초과분 1/3
+        """
+        # 워커 예산에서 advisory lock 전용 풀과 LISTEN 연결(1개)을 먼저 제외
+        available = self.connection_budget / max(1, self.workers) - self.reserved_connections
+        per_worker = max(2, int(available * share))
+        pool_size = max(1, per_worker * 2 // 3)
+        return pool_size, per_worker - pool_size
+
+
+def get_worker_count() -> int:
+    """uvicorn 워커 수 (UVICORN_WORKERS, 기본 3)"""
+    return max(1, int(os.getenv("UVICORN_WORKERS", "3")))
+
+
+class PoolStats:
+    """연결 풀 획득 통계 (획득 횟수, 대기 시간, 시간 초과 횟수)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.acquisitions = 0
+        self.timeouts = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    def record(self, wait_seconds: float, timed_out: bool = False):
+        with self._lock:
+            if timed_out:
+                self.timeouts += 1
+            else:
+                self.acquisitions += 1
+                self.total_wait += wait_seconds
+                self.max_wait = max(self.max_wait, wait_seconds)
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "acquisitions": self.acquisitions,
+                "timeouts": self.timeouts,
+                "avg_wait_ms": round(self.total_wait / self.acquisitions * 1000, 3) if self.acquisitions else 0.0,
+                "max_wait_ms": round(self.max_wait * 1000, 3),
+            }
+
+
+class _InstrumentedPoolMixin:
+    """풀에서 연결을 꺼낼 때까지 걸린 시간(신규 연결 생성 포함)을 기록"""
+
+    stats: PoolStats
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except exc.TimeoutError:
+            self.stats.record(time.perf_counter() - start, timed_out=True)
+            raise
+        self.stats.record(time.perf_counter() - start)
+        return connection
+
+
+# 통계는 클래스 속성으로 두어 dispose/recreate로 풀이 새로 만들어져도 누적값 유지
+class InstrumentedQueuePool(_InstrumentedPoolMixin, QueuePool):
+    stats = PoolStats()
+
+
+class InstrumentedAsyncQueuePool(_InstrumentedPoolMixin, AsyncAdaptedQueuePool):
+    stats = PoolStats()
+
+
+class InstrumentedLockPool(InstrumentedQueuePool):
+    stats = PoolStats()
 
 
 # 전역 설정
 config = DatabaseConfig()
 
-# SQLAlchemy 엔진 생성
+# SQLAlchemy 엔진 생성 (비동기 엔진을 함께 쓰면 동기 엔진은 advisory lock/LISTEN 등 보조 용도로 1/3만 배정)
+_sync_pool_size, _sync_max_overflow = config.pool_sizes(1 / 3 if config.use_async else 1.0)
 engine = create_engine(
     config.database_url,
-    poolclass=QueuePool,
-    pool_size=10,
-    max_overflow=20,
+    poolclass=InstrumentedQueuePool,
+    pool_size=_sync_pool_size,
+    max_overflow=_sync_max_overflow,
+    pool_timeout=config.pool_timeout,
     pool_pre_ping=True,  # 연결 상태 체크
     echo=False,  # SQL 로깅 (개발 시 True로 변경 가능)
 )
 
+# advisory lock 전용 엔진 (리더 락 연결을 오래 점유해도 요청 처리 풀이 고갈되지 않도록 분리, 초과 연결 없음)
+lock_engine = create_engine(
+    config.database_url,
+    poolclass=InstrumentedLockPool,
+    pool_size=config.lock_pool_size,
+    max_overflow=0,
+    pool_timeout=config.lock_pool_timeout,  # 모두 사용 중이면 짧게 기다린 뒤 코디네이션 없이 진행
+    pool_pre_ping=True,
+    echo=False,
+)
+
 # 세션 팩토리
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 
+def _create_async_engine():
+    """비동기 엔진/세션 팩토리 생성 (DB_ASYNC=false 이거나 asyncpg가 없으면 None)"""
+    if not config.use_async:
+        return None, None
+    try:
+        from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+        pool_size, max_overflow = config.pool_sizes(2 / 3)
+        async_engine = create_async_engine(
+            config.async_database_url,
+            poolclass=InstrumentedAsyncQueuePool,
+            pool_size=pool_size,
+            max_overflow=max_overflow,
+            pool_timeout=config.pool_timeout,
+            pool_pre_ping=True,
+            echo=False,
+        )
+    except ImportError as e:
+        logger.warning("[DB] 비동기 엔진 생성 실패 (asyncpg 미설치), 동기 엔진 사용: %s", e)
+        return None, None
+    return async_engine, async_sessionmaker(async_engine, expire_on_commit=False)
+
+
+async_engine, AsyncSessionLocal = _create_async_engine()
+
+
 def init_db():
-    """데이터베이스 테이블 초기화"""
+    """
+    데이터베이스 테이블 초기화
+
+    기존 분석 이력으로 stock_analysis_current를 채우는 작업은
+    database.migrate_current_analyses (일회성)로 실행합니다.
+    """
     try:
         Base.metadata.create_all(bind=engine)
-        print("[DB] 데이터베이스 테이블 초기화 완료")
+        logger.info("[DB] 데이터베이스 테이블 초기화 완료")
     except Exception as e:
-        print(f"[DB] 테이블 초기화 실패: {e}")
+        logger.error("[DB] 테이블 초기화 실패: %s", e)
         raise
 
 
@@ -70,12 +222,74 @@ def get_db() -> Generator[Session, None, None]:
         db.commit()
     except Exception as e:
         db.rollback()
-        print(f"[DB] 트랜잭션 롤백: {e}")
+        logger.warning("[DB] 트랜잭션 롤백: %s", e)
         raise
     finally:
         db.close()
 
 
+async def run_db(fn: Callable[[Session], T]) -> T:
+    """
+    세션에서 동기 DB 작업을 실행하되 이벤트 루프를 막지 않음
+
+    - 비동기 엔진 사용 시: AsyncSession.run_sync (asyncpg, 스레드 없음)
+    - 그 외: 워커 스레드에서 get_db() 세션으로 실행
+
+    Args:
+        fn: Session을 받아 동기 DB 작업을 수행하는 함수 (StockRepository 재사용 가능)
+
+    Returns:
+        fn의 반환값
+    """
+    if AsyncSessionLocal is not None:
+        async with AsyncSessionLocal() as session:
+            try:
+                result = await session.run_sync(fn)
+                await session.commit()
+                return result
+            except Exception as e:
+                await session.rollback()
+                logger.warning("[DB] 트랜잭션 롤백: %s", e)
+                raise
+
+    def _work() -> T:
+        with get_db() as db:
+            return fn(db)
+
+    return await asyncio.to_thread(_work)
+
+
+def pool_status(target: Optional[Engine] = None) -> Dict[str, Any]:
+    """
+    연결 풀 현황 (현재 사용 중/유휴/초과 연결 수 + 누적 획득 대기 통계)
+
+    Args:
+        target: 대상 엔진 (기본값: 동기 엔진)
+    """
+    pool = (target or engine).pool
+    status: Dict[str, Any] = {
+        "pool_size": pool.size(),
+        "checked_out": pool.checkedout(),
+        "checked_in": pool.checkedin(),
+        "overflow": max(0, pool.overflow()),  # pool_size를 넘어 추가로 연 연결 수
+    }
+    if isinstance(pool, _InstrumentedPoolMixin):
+        status.update(pool.stats.snapshot())
+    return status
+
+
+def pool_stats() -> Dict[str, Any]:
+    """동기/비동기/advisory lock 엔진 풀 현황과 풀 크기 산정 근거"""
+    return {
+        "workers": config.workers,
+        "connection_budget": config.connection_budget,
+        "reserved_per_worker": config.reserved_connections,
+        "sync": pool_status(engine),
+        "lock": pool_status(lock_engine),
+        "async": pool_status(async_engine.sync_engine) if async_engine is not None else None,
+    }
+
+
 def get_db_session() -> Session:
     """
     FastAPI Dependency용 세션 생성기
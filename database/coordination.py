@@ -0,0 +1,336 @@
+import asyncio
+import hashlib
+import logging
+import os
+import select
+import threading
+import time
+from typing import Awaitable, Callable, Dict, List, Optional, Set, Tuple, TypeVar
+
+from sqlalchemy import exc
+from sqlalchemy.engine import Engine
+
+from utils import Deadline
+
+T = TypeVar("T")
+
+logger = logging.getLogger(__name__)
+
+# 분석 결과 저장 알림 채널 (payload: 심볼)
+ANALYSIS_READY_CHANNEL = "stock_analysis_ready"
+
+
+def advisory_lock_key(name: str) -> int:
+    """이름 → advisory lock 키 (signed 64-bit 해시)"""
+    digest = hashlib.sha1(name.encode("utf-8")).digest()
+    return int.from_bytes(digest[:8], "big", signed=True)
+
+
+def symbol_lock_key(symbol: str) -> int:
+    """심볼 → advisory lock 키"""
+    return advisory_lock_key(f"stock_analysis:{symbol}")
+
+
+def try_advisory_lock(engine: Engine, key: int):
+    """
+    세션 레벨 advisory lock 획득 시도 (동기, 워커 스레드에서 호출)
+
+    Returns:
+        락을 보유한 풀 연결 (획득 실패 시 None) - release_advisory_lock으로 반환해야 함
+    """
+    conn = engine.raw_connection()
+    try:
+        cursor = conn.cursor()
+        cursor.execute("SELECT pg_try_advisory_lock(%s)", (key,))
+        acquired = cursor.fetchone()[0]
+        cursor.close()
+        conn.commit()
+    except Exception:
+        conn.invalidate()
+        raise
+
+    if acquired:
+        return conn
+    conn.close()
+    return None
+
+
+def release_advisory_lock(conn, key: int):
+    """advisory lock 해제 후 연결 반환 (동기, 워커 스레드에서 호출)"""
+    try:
+        cursor = conn.cursor()
+        cursor.execute("SELECT pg_advisory_unlock(%s)", (key,))
+        cursor.close()
+        conn.commit()
+        conn.close()
+    except Exception as e:
+        # 연결을 폐기하면 세션 종료와 함께 락도 해제됨
+        logger.warning("[COALESCE] advisory lock 해제 실패, 연결 폐기: %s", e)
+        conn.invalidate()
+
+
+def _release_abandoned_lock(attempt: asyncio.Future, key: int):
+    """취소된 요청이 남긴 락 획득 결과 정리 (획득했으면 워커 스레드에서 해제)"""
+    if attempt.cancelled() or attempt.exception() is not None:
+        return
+    lock_conn = attempt.result()
+    if lock_conn is not None:
+        logger.info("[COALESCE] 락 획득 도중 요청 취소, advisory lock 반환")
+        asyncio.get_running_loop().run_in_executor(None, release_advisory_lock, lock_conn, key)
+
+
+def _lock_id(key: int) -> Tuple[int, int]:
+    """advisory lock 키 → pg_locks의 (classid, objid) (bigint 키의 상위/하위 32비트)"""
+    unsigned = key & 0xFFFFFFFFFFFFFFFF
+    return unsigned >> 32, unsigned & 0xFFFFFFFF
+
+
+def _resolve(future: asyncio.Future):
+    if not future.done():
+        future.set_result(None)
+
+
+class AnalysisReadyListener:
+    """
+    프로세스당 LISTEN 연결 하나로 분석 완료 대기자를 깨우는 디스패처
+
+    전용 스레드 하나가 풀 밖의 연결에서 NOTIFY를 받아 해당 심볼의 대기자를 깨우고,
+    대기자가 있으면 probe_interval마다 pg_locks를 한 번 조회하여 리더가 락을 놓은
+    (성공/실패/크래시) 심볼의 대기자도 깨웁니다. 대기자는 asyncio.Future만 기다리므로
+    대기 중인 요청 수와 관계없이 연결 1개, 스레드 1개만 사용합니다.
+    """
+
+    def __init__(self, engine: Engine, probe_interval: float = 1.0):
+        self.engine = engine
+        self.probe_interval = probe_interval
+        self._lock = threading.Lock()
+        # 심볼 → [(이벤트 루프, Future, lock 키)]
+        self._waiters: Dict[str, List[Tuple[asyncio.AbstractEventLoop, asyncio.Future, int]]] = {}
+        self._thread: Optional[threading.Thread] = None
+        self._stopped = threading.Event()
+
+    async def wait(self, symbol: str, key: int, timeout: float):
+        """
+        NOTIFY 수신, 리더 락 해제 또는 timeout까지 대기
+
+        Args:
+            symbol: 주식 심볼 (NOTIFY payload)
+            key: 리더가 보유한 advisory lock 키
+            timeout: 최대 대기 시간 (초)
+        """
+        loop = asyncio.get_running_loop()
+        waiter = (loop, loop.create_future(), key)
+        with self._lock:
+            self._waiters.setdefault(symbol, []).append(waiter)
+            if self._thread is None or not self._thread.is_alive():
+                self._stopped.clear()
+                self._thread = threading.Thread(target=self._run, name="analysis-ready-listener", daemon=True)
+                self._thread.start()
+        try:
+            await asyncio.wait_for(waiter[1], timeout)
+        except asyncio.TimeoutError:
+            pass
+        finally:
+            with self._lock:
+                waiters = self._waiters.get(symbol, [])
+                if waiter in waiters:
+                    waiters.remove(waiter)
+                if not waiters:
+                    self._waiters.pop(symbol, None)
+
+    def close(self):
+        """디스패처 스레드 종료"""
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.probe_interval + 1)
+            self._thread = None
+
+    def _wake(self, predicate: Callable[[str, int], bool]):
+        with self._lock:
+            targets = [
+                (loop, future)
+                for symbol, waiters in self._waiters.items()
+                for loop, future, key in waiters
+                if predicate(symbol, key)
+            ]
+        for loop, future in targets:
+            try:
+                loop.call_soon_threadsafe(_resolve, future)
+            except RuntimeError:
+                pass  # 이벤트 루프가 이미 종료됨
+
+    def _connect(self):
+        """풀과 별개인 LISTEN 전용 연결 (autocommit)"""
+        cargs, cparams = self.engine.dialect.create_connect_args(self.engine.url)
+        conn = self.engine.dialect.connect(*cargs, **cparams)
+        conn.autocommit = True
+        cursor = conn.cursor()
+        cursor.execute(f"LISTEN {ANALYSIS_READY_CHANNEL}")
+        cursor.close()
+        return conn
+
+    @staticmethod
+    def _held_locks(conn) -> Set[Tuple[int, int]]:
+        """현재 DB에서 보유 중인 bigint advisory lock의 (classid, objid)"""
+        cursor = conn.cursor()
+        try:
+            cursor.execute(
+                "SELECT classid::bigint, objid::bigint FROM pg_locks "
+                "WHERE locktype = 'advisory' AND objsubid = 1 AND granted "
+                "AND database = (SELECT oid FROM pg_database WHERE datname = current_database())"
+            )
+            return {(row[0], row[1]) for row in cursor.fetchall()}
+        finally:
+            cursor.close()
+
+    def _run(self):
+        conn = None
+        last_probe = 0.0
+        while not self._stopped.is_set():
+            try:
+                if conn is None:
+                    conn = self._connect()
+                    last_probe = 0.0  # 재연결 사이 놓친 NOTIFY는 락 상태 확인으로 보완
+
+                ready, _, _ = select.select([conn], [], [], self.probe_interval)
+                if ready:
+                    conn.poll()
+                    notified = {notify.payload for notify in conn.notifies}
+                    conn.notifies.clear()
+                    if notified:
+                        self._wake(lambda symbol, key: symbol in notified)
+
+                if self._waiters and time.monotonic() - last_probe >= self.probe_interval:
+                    last_probe = time.monotonic()
+                    held = self._held_locks(conn)
+                    self._wake(lambda symbol, key: _lock_id(key) not in held)
+            except Exception as e:
+                logger.warning("[COALESCE] LISTEN 연결 오류, 재연결: %s", e)
+                if conn is not None:
+                    try:
+                        conn.close()
+                    except Exception:
+                        pass
+                    conn = None
+                # 대기자는 깨어나 락 획득을 다시 시도
+                self._wake(lambda symbol, key: True)
+                self._stopped.wait(self.probe_interval)
+
+        if conn is not None:
+            try:
+                conn.close()
+            except Exception:
+                pass
+
+
+class AnalysisCoordinator:
+    """
+    PostgreSQL advisory lock 기반 워커 간 분석 중복 제거
+
+    여러 uvicorn 워커/컨테이너가 같은 심볼을 동시에 분석하지 않도록,
+    심볼 해시로 advisory lock을 잡은 워커(리더)만 분석을 실행합니다.
+    나머지 워커는 프로세스 공용 LISTEN 연결(AnalysisReadyListener)로 대기하다가
+    save_analysis 커밋 시 전송되는 NOTIFY를 받으면 새로 저장된 캐시를 읽어 반환합니다.
+
+    리더의 락 연결은 요청 처리 풀과 분리된 advisory lock 전용 풀(lock_engine)에서 가져오며,
+    전용 풀이 모두 사용 중이면 코디네이션 없이 직접 분석합니다.
+    프로세스 내부에서는 SingleFlight가 이미 심볼당 하나의 요청만 통과시킵니다.
+    """
+
+    def __init__(
+        self,
+        engine: Engine,
+        wait_timeout: float = 120.0,
+        probe_interval: float = 1.0,
+    ):
+        self.engine = engine  # advisory lock 전용 엔진
+        self.wait_timeout = wait_timeout  # 리더 분석 완료 최대 대기 시간 (초, 요청 마감 시각이 더 이르면 그때까지)
+        self.listener = AnalysisReadyListener(engine, probe_interval)
+
+    @classmethod
+    def from_env(cls, engine: Engine) -> Optional["AnalysisCoordinator"]:
+        """
+        환경 변수 설정에 따라 코디네이터 생성
+
+        DISTRIBUTED_COALESCING=true 이고 PostgreSQL 엔진일 때만 활성화됩니다.
+        """
+        enabled = os.getenv("DISTRIBUTED_COALESCING", "false").lower() in ("1", "true", "yes")
+        if not enabled or engine.dialect.name != "postgresql":
+            return None
+        wait_timeout = float(os.getenv("COALESCING_WAIT_SECONDS", "120"))
+        return cls(engine, wait_timeout=wait_timeout)
+
+    def close(self):
+        """LISTEN 디스패처 종료"""
+        self.listener.close()
+
+    async def run(
+        self,
+        symbol: str,
+        read_cached: Callable[[], Awaitable[Optional[T]]],
+        produce: Callable[[], Awaitable[T]],
+        deadline: Optional[Deadline] = None,
+    ) -> T:
+        """
+        심볼 단위로 워커 간 하나의 분석만 실행
+
+        Args:
+            symbol: 주식 심볼
+            read_cached: 저장된 최신 분석을 읽는 코루틴 팩토리 (없으면 None)
+            produce: 실제 분석을 수행하고 저장하는 코루틴 팩토리
+            deadline: 요청 마감 시각 (리더 대기 상한, 지나면 asyncio.TimeoutError)
+
+        Returns:
+            분석 결과 (직접 분석했거나 다른 워커가 저장한 결과)
+        """
+        key = symbol_lock_key(symbol)
+        wait_until = time.monotonic() + self.wait_timeout
+
+        while True:
+            try:
+                lock_conn = await self._try_lock(key)
+            except exc.TimeoutError:
+                logger.warning("[COALESCE] %s - advisory lock 연결 부족, 코디네이션 없이 분석", symbol)
+                return await produce()
+
+            if lock_conn is not None:
+                try:
+                    # 락 획득 직전에 다른 워커가 저장을 마쳤을 수 있으므로 재확인
+                    cached = await read_cached()
+                    if cached is not None:
+                        return cached
+                    return await produce()
+                finally:
+                    await asyncio.to_thread(release_advisory_lock, lock_conn, key)
+
+            if deadline is not None and deadline.expired:
+                raise asyncio.TimeoutError(f"{symbol} - 다른 워커의 분석 완료 대기 중 요청 마감 시각 초과")
+            remaining = wait_until - time.monotonic()
+            if remaining <= 0:
+                logger.warning("[COALESCE] %s - 리더 대기 시간 초과, 직접 분석 실행", symbol)
+                return await produce()
+
+            logger.info("[COALESCE] %s - 다른 워커의 분석 완료 대기", symbol)
+            if deadline is not None:
+                remaining = min(remaining, deadline.remaining())
+            await self.listener.wait(symbol, key, remaining)
+
+            cached = await read_cached()
+            if cached is not None:
+                return cached
+            # 리더가 실패했거나 대기 시간이 끝난 경우: 다시 락 획득을 시도하여 직접 분석
+
+    async def _try_lock(self, key: int):
+        """
+        advisory lock 획득 시도 (워커 스레드)
+
+        락을 잡는 스레드 작업은 취소할 수 없으므로, 호출한 요청이 획득 도중 취소되면
+        작업이 끝난 뒤 획득한 락과 연결을 반환해 세션 레벨 락이 남지 않도록 합니다.
+        """
+        attempt = asyncio.ensure_future(asyncio.to_thread(try_advisory_lock, self.engine, key))
+        try:
+            return await asyncio.shield(attempt)
+        except asyncio.CancelledError:
+            attempt.add_done_callback(lambda done: _release_abandoned_lock(done, key))
+            raise
+
@@ -0,0 +1,31 @@
+"""
+현재 분석 테이블 백필 마이그레이션 (일회성)
+
+stock_analysis_current 도입 전에 쌓인 stock_analysis_cache 이력에서
+심볼별 최신 행을 현재 테이블로 복사합니다 (이미 있는 심볼은 건너뜀).
+
+사용법:
+    uv run python -m database.migrate_current_analyses --dry-run  # 건수만 확인
+    uv run python -m database.migrate_current_analyses
+"""
+import argparse
+
+from .connection import get_db, init_db
+from .repository import StockRepository
+
+
+def main():
+    parser = argparse.ArgumentParser(description="stock_analysis_current 백필")
+    parser.add_argument("--dry-run", action="store_true", help="변경 없이 채울 심볼 수만 출력")
+    args = parser.parse_args()
+
+    init_db()  # 현재 테이블이 아직 없으면 생성
+    with get_db() as db:
+        backfilled = StockRepository(db).backfill_current_analyses(dry_run=args.dry_run)
+
+    mode = "DRY RUN" if args.dry_run else "완료"
+    print(f"[MIGRATE] 현재 분석 테이블 백필 {mode} - {backfilled}개 심볼")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,33 @@
+"""
+심볼 매핑 캐시 정규화 마이그레이션 (일회성)
+
+정규화 키 도입 전에 저장된 "tsla", "TSLA", " Tsla " 같은 중복 행을
+정규화 키 하나로 병합합니다.
+
+사용법:
+    uv run python -m database.migrate_symbol_mapping --dry-run  # 건수만 확인
+    uv run python -m database.migrate_symbol_mapping
+"""
+import argparse
+
+from .connection import get_db
+from .repository import StockRepository
+
+
+def main():
+    parser = argparse.ArgumentParser(description="stock_symbol_mapping 중복 행 병합")
+    parser.add_argument("--dry-run", action="store_true", help="변경 없이 병합 대상 건수만 출력")
+    args = parser.parse_args()
+
+    with get_db() as db:
+        result = StockRepository(db).merge_duplicate_symbol_mappings(dry_run=args.dry_run)
+
+    mode = "DRY RUN" if args.dry_run else "완료"
+    print(
+        f"[MIGRATE] 심볼 매핑 정규화 {mode} - 전체 {result['total']}건, "
+        f"중복 병합 {result['merged']}건, 키 변경 {result['renamed']}건"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,17 +1,13 @@
 from datetime import datetime
-from sqlalchemy import Column, String, DateTime, Text, Integer, Index
+from sqlalchemy import Column, String, DateTime, Text, Integer, Float, Index, text
 from sqlalchemy.ext.declarative import declarative_base
 
 Base = declarative_base()
 
 
-class StockAnalysisCache(Base):
-    """주식 분석 결과 캐시 테이블"""
+class AnalysisColumnsMixin:
+    """분석 결과 공통 컬럼 (이력 테이블 / 현재 테이블 공용)"""
 
-    __tablename__ = "stock_analysis_cache"
-
-    id = Column(Integer, primary_key=True, autoincrement=True)
-    symbol = Column(String(20), nullable=False, index=True)  # 주식 심볼 (예: TSLA)
     company_name = Column(String(200), nullable=False)  # 정식 기업명
 
     # 분석 결과
@@ -26,6 +22,15 @@ class StockAnalysisCache(Base):
 
     analysis = Column(Text, nullable=False)  # 종합 분석
 
+
+class StockAnalysisCache(AnalysisColumnsMixin, Base):
+    """주식 분석 결과 이력 테이블 (append-only, 보존 기간 이후 배치 삭제)"""
+
+    __tablename__ = "stock_analysis_cache"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    symbol = Column(String(20), nullable=False, index=True)  # 주식 심볼 (예: TSLA)
+
     # 메타데이터
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
@@ -39,6 +44,18 @@ class StockAnalysisCache(Base):
         return f"<StockAnalysisCache(symbol='{self.symbol}', company='{self.company_name}', updated='{self.updated_at}')>"
 
 
+class StockAnalysisCurrent(AnalysisColumnsMixin, Base):
+    """심볼별 최신 분석 테이블 (심볼당 1행, 저장 시 upsert - 캐시 조회는 PK 조회)"""
+
+    __tablename__ = "stock_analysis_current"
+
+    symbol = Column(String(20), primary_key=True)  # 주식 심볼
+    updated_at = Column(DateTime, nullable=False)  # 분석 시각
+
+    def __repr__(self):
+        return f"<StockAnalysisCurrent(symbol='{self.symbol}', updated='{self.updated_at}')>"
+
+
 class StockSymbolMapping(Base):
     """기업명 → 심볼 매핑 캐시 테이블"""
 
@@ -54,3 +71,72 @@ class StockSymbolMapping(Base):
 
     def __repr__(self):
         return f"<StockSymbolMapping(query='{self.input_query}' → '{self.symbol}')>"
+
+
+class ToolResultCache(Base):
+    """MCP 도구(웹 검색) 결과 캐시 테이블"""
+
+    __tablename__ = "mcp_tool_result_cache"
+
+    cache_key = Column(String(64), primary_key=True)  # 정규화된 도구명+인자의 SHA-256
+    tool_name = Column(String(100), nullable=False)
+    arguments = Column(Text, nullable=False)  # 정규화된 인자 (JSON)
+    result = Column(Text, nullable=False)
+
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    expires_at = Column(DateTime, nullable=False, index=True)
+
+    def __repr__(self):
+        return f"<ToolResultCache(tool='{self.tool_name}', expires='{self.expires_at}')>"
+
+
+class StockAccessStats(Base):
+    """심볼별 조회 빈도 통계 테이블 (인기 종목 사전 분석용)"""
+
+    __tablename__ = "stock_access_stats"
+
+    symbol = Column(String(20), primary_key=True)
+    company_name = Column(String(200), nullable=False)
+    access_count = Column(Integer, default=0, nullable=False)  # 누적 조회 수
+    score = Column(Float, default=0.0, nullable=False, index=True)  # 시간 감쇠 적용 조회 점수
+    last_accessed_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+    def __repr__(self):
+        return f"<StockAccessStats(symbol='{self.symbol}', count={self.access_count}, score={self.score:.2f})>"
+
+
+# 분석 작업 상태 (queued → running → succeeded / failed)
+JOB_ACTIVE_STATUSES = ("queued", "running")
+JOB_ACTIVE_CONDITION = text("status IN ('queued', 'running')")
+
+
+class AnalysisJob(Base):
+    """비동기 분석 작업 테이블 (POST /api/stock/jobs, 작업 워커가 FOR UPDATE SKIP LOCKED로 가져감)"""
+
+    __tablename__ = "stock_analysis_job"
+
+    id = Column(String(32), primary_key=True)  # 작업 ID (UUID hex)
+    input_query = Column(String(200), nullable=False)  # 사용자 입력 (예: "테슬라")
+    dedupe_key = Column(String(220), nullable=False)  # 중복 제출 판단 키 (심볼 또는 정규화된 입력)
+    symbol = Column(String(20), nullable=True)  # 주식 심볼 (제출 시 알 수 없으면 완료 후 채움)
+    status = Column(String(16), nullable=False, default="queued")
+    attempts = Column(Integer, nullable=False, default=0)  # 실행 시도 횟수 (임대 만료 후 재실행 포함)
+    result = Column(Text, nullable=True)  # 분석 결과 (StockResponse JSON)
+    error = Column(Text, nullable=True)
+
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    started_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
+
+    __table_args__ = (
+        # 대기/실행 중인 작업은 키당 하나만 (동시 중복 제출도 DB에서 차단)
+        Index(
+            "uq_job_active_dedupe", "dedupe_key", unique=True,
+            postgresql_where=JOB_ACTIVE_CONDITION, sqlite_where=JOB_ACTIVE_CONDITION,
+        ),
+        # 워커의 다음 작업 조회 (상태 + 생성 순)
+        Index("idx_job_status_created", "status", "created_at"),
+    )
+
+    def __repr__(self):
+        return f"<AnalysisJob(id='{self.id}', query='{self.input_query}', status='{self.status}')>"
@@ -1,10 +1,22 @@
 from datetime import datetime, timedelta
-from typing import Optional, Tuple
+from typing import Dict, List, Optional, Tuple
 from sqlalchemy.orm import Session
-from sqlalchemy import desc
+from sqlalchemy import and_, desc, func, or_, select, text
+from sqlalchemy.dialects import postgresql, sqlite
 
-from .models import StockAnalysisCache, StockSymbolMapping
-from models import StockResponse, RecommendationDetail
+from .models import (
+    StockAnalysisCache,
+    StockAnalysisCurrent,
+    StockSymbolMapping,
+    ToolResultCache,
+    StockAccessStats,
+    AnalysisJob,
+    JOB_ACTIVE_CONDITION,
+    JOB_ACTIVE_STATUSES,
+)
+from .coordination import ANALYSIS_READY_CHANNEL
+from models import StockResponse, RecommendationDetail, StockJobResponse
+from utils import normalize_query
 
 
 class StockRepository:
@@ -22,14 +34,14 @@ class StockRepository:
         입력 쿼리로 심볼 매핑 조회
 
         Args:
-            input_query: 사용자 입력 (예: "테슬라", "TSLA")
+            input_query: 사용자 입력 (예: "테슬라", "TSLA") - 정규화 키로 조회
 
         Returns:
             (심볼, 기업명) 튜플 또는 None
         """
         mapping = (
             self.db.query(StockSymbolMapping)
-            .filter(StockSymbolMapping.input_query == input_query.strip())
+            .filter(StockSymbolMapping.input_query == normalize_query(input_query))
             .first()
         )
 
@@ -37,18 +49,48 @@ class StockRepository:
             return (mapping.symbol, mapping.company_name)
         return None
 
+    def get_symbol_mappings(self, input_queries: List[str]) -> Dict[str, Tuple[str, str]]:
+        """
+        여러 입력 쿼리의 심볼 매핑을 한 번에 조회 (IN 쿼리)
+
+        Args:
+            input_queries: 사용자 입력 목록
+
+        Returns:
+            {입력 쿼리: (심볼, 기업명)} - 매핑이 없는 쿼리는 제외
+        """
+        # 정규화 키 → 원래 입력 목록 (서로 다른 입력이 같은 키가 될 수 있음)
+        queries: Dict[str, List[str]] = {}
+        for query in input_queries:
+            queries.setdefault(normalize_query(query), []).append(query)
+        if not queries:
+            return {}
+
+        mappings = (
+            self.db.query(StockSymbolMapping)
+            .filter(StockSymbolMapping.input_query.in_(list(queries)))
+            .all()
+        )
+
+        return {
+            query: (mapping.symbol, mapping.company_name)
+            for mapping in mappings
+            for query in queries[mapping.input_query]
+        }
+
     def save_symbol_mapping(self, input_query: str, symbol: str, company_name: str):
         """
         심볼 매핑 저장 (upsert)
 
         Args:
-            input_query: 사용자 입력
+            input_query: 사용자 입력 (정규화 키로 저장)
             symbol: 주식 심볼
             company_name: 정식 기업명
         """
+        input_query = normalize_query(input_query)
         existing = (
             self.db.query(StockSymbolMapping)
-            .filter(StockSymbolMapping.input_query == input_query.strip())
+            .filter(StockSymbolMapping.input_query == input_query)
             .first()
         )
 
@@ -60,7 +102,7 @@ class StockRepository:
         else:
             # 생성
             mapping = StockSymbolMapping(
-                input_query=input_query.strip(),
+                input_query=input_query,
                 symbol=symbol,
                 company_name=company_name,
             )
@@ -68,6 +110,49 @@ class StockRepository:
 
         self.db.commit()
 
+    def merge_duplicate_symbol_mappings(self, dry_run: bool = False) -> Dict[str, int]:
+        """
+        정규화 키가 같은 심볼 매핑 행을 하나로 병합 (일회성 마이그레이션)
+
+        키별로 가장 최근에 갱신된 행의 심볼/기업명을 남기고 나머지는 삭제하며,
+        남은 행의 input_query를 정규화 키로 변경합니다.
+
+        Args:
+            dry_run: True이면 변경 없이 건수만 계산
+
+        Returns:
+            {"total": 전체 행 수, "merged": 삭제된 중복 행 수, "renamed": 키가 바뀐 행 수}
+        """
+        rows = (
+            self.db.query(StockSymbolMapping)
+            .order_by(desc(StockSymbolMapping.updated_at), desc(StockSymbolMapping.id))
+            .all()
+        )
+
+        groups: Dict[str, List[StockSymbolMapping]] = {}
+        for row in rows:
+            groups.setdefault(normalize_query(row.input_query), []).append(row)
+
+        merged = 0
+        renamed = []
+        for key, group in groups.items():
+            keep, duplicates = group[0], group[1:]
+            merged += len(duplicates)
+            if not dry_run:
+                for duplicate in duplicates:
+                    self.db.delete(duplicate)
+            if keep.input_query != key:
+                renamed.append((keep, key))
+
+        if not dry_run:
+            # 삭제를 먼저 반영해야 키 변경 시 unique 제약에 걸리지 않음
+            self.db.flush()
+            for keep, key in renamed:
+                keep.input_query = key
+            self.db.commit()
+
+        return {"total": len(rows), "merged": merged, "renamed": len(renamed)}
+
     # ============================================================
     # 주식 분석 캐시
     # ============================================================
@@ -85,67 +170,636 @@ class StockRepository:
         Returns:
             StockResponse 또는 None
         """
+        cached = self.get_cached_analysis_with_timestamp(symbol, max_age_hours)
+        return cached[0] if cached else None
+
+    def get_cached_analysis_with_timestamp(
+        self, symbol: str, max_age_hours: float = 24
+    ) -> Optional[Tuple[StockResponse, datetime]]:
+        """
+        캐시된 주식 분석과 갱신 시각 조회 (stock_analysis_current PK 조회)
+
+        Args:
+            symbol: 주식 심볼
+            max_age_hours: 캐시 유효 시간 (기본 24시간)
+
+        Returns:
+            (StockResponse, updated_at) 튜플 또는 None
+        """
         cutoff_time = datetime.utcnow() - timedelta(hours=max_age_hours)
 
-        cache = (
-            self.db.query(StockAnalysisCache)
-            .filter(StockAnalysisCache.symbol == symbol)
-            .filter(StockAnalysisCache.updated_at >= cutoff_time)
-            .order_by(desc(StockAnalysisCache.updated_at))
-            .first()
+        current = self.db.get(StockAnalysisCurrent, symbol)
+        if current and current.updated_at >= cutoff_time:
+            return (self._to_response(current), current.updated_at)
+
+        return None
+
+    def get_cached_analyses(
+        self, symbols: List[str], max_age_hours: int = 24
+    ) -> Dict[str, Tuple[StockResponse, datetime]]:
+        """
+        여러 심볼의 최신 캐시 분석을 한 번에 조회
+
+        Args:
+            symbols: 주식 심볼 목록
+            max_age_hours: 캐시 유효 시간 (기본 24시간)
+
+        Returns:
+            {심볼: (StockResponse, updated_at)} - 유효한 캐시가 없는 심볼은 제외
+        """
+        if not symbols:
+            return {}
+
+        cutoff_time = datetime.utcnow() - timedelta(hours=max_age_hours)
+
+        rows = (
+            self.db.query(StockAnalysisCurrent)
+            .filter(StockAnalysisCurrent.symbol.in_(list(set(symbols))))
+            .filter(StockAnalysisCurrent.updated_at >= cutoff_time)
+            .all()
         )
+        return {row.symbol: (self._to_response(row), row.updated_at) for row in rows}
 
-        if cache:
-            return StockResponse(
-                symbol=cache.symbol,
-                company_name=cache.company_name,
-                short_term=RecommendationDetail(
-                    action=cache.short_term_action, reason=cache.short_term_reason
-                ),
-                mid_term=RecommendationDetail(
-                    action=cache.mid_term_action, reason=cache.mid_term_reason
-                ),
-                long_term=RecommendationDetail(
-                    action=cache.long_term_action, reason=cache.long_term_reason
+    @staticmethod
+    def _to_response(cache) -> StockResponse:
+        """분석 ORM 객체(StockAnalysisCache / StockAnalysisCurrent) → StockResponse 변환"""
+        return StockResponse(
+            symbol=cache.symbol,
+            company_name=cache.company_name,
+            short_term=RecommendationDetail(
+                action=cache.short_term_action, reason=cache.short_term_reason
+            ),
+            mid_term=RecommendationDetail(
+                action=cache.mid_term_action, reason=cache.mid_term_reason
+            ),
+            long_term=RecommendationDetail(
+                action=cache.long_term_action, reason=cache.long_term_reason
+            ),
+            analysis=cache.analysis,
+            updated_at=cache.updated_at,
+        )
+
+    def save_analysis(self, response: StockResponse):
+        """
+        주식 분석 결과 저장 (이력 테이블에 추가 + 현재 테이블 upsert, 한 트랜잭션)
+
+        Args:
+            response: StockResponse 객체
+        """
+        updated_at = response.updated_at or datetime.utcnow()
+        values = {
+            "symbol": response.symbol,
+            "company_name": response.company_name,
+            "short_term_action": response.short_term.action,
+            "short_term_reason": response.short_term.reason,
+            "mid_term_action": response.mid_term.action,
+            "mid_term_reason": response.mid_term.reason,
+            "long_term_action": response.long_term.action,
+            "long_term_reason": response.long_term.reason,
+            "analysis": response.analysis,
+            "updated_at": updated_at,
+        }
+
+        self.db.add(StockAnalysisCache(**values, created_at=updated_at))
+        self._upsert_current(values)
+
+        # 커밋 시점에 다른 워커의 대기자에게 알림 (PostgreSQL NOTIFY는 트랜잭션 커밋 후 전달됨)
+        if self.db.get_bind().dialect.name == "postgresql":
+            self.db.execute(
+                text("SELECT pg_notify(:channel, :symbol)"),
+                {"channel": ANALYSIS_READY_CHANNEL, "symbol": response.symbol},
+            )
+
+        self.db.commit()
+
+    def _upsert_current(self, values: Dict):
+        """
+        현재 분석 테이블 upsert (더 최신 결과만 반영)
+
+        PostgreSQL/SQLite는 INSERT ... ON CONFLICT로 워커 간 동시 저장에도 안전하게 처리합니다.
+        """
+        dialect = self.db.get_bind().dialect.name
+        if dialect in ("postgresql", "sqlite"):
+            insert = postgresql.insert if dialect == "postgresql" else sqlite.insert
+            stmt = insert(StockAnalysisCurrent).values(**values)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[StockAnalysisCurrent.symbol],
+                set_={key: stmt.excluded[key] for key in values if key != "symbol"},
+                where=StockAnalysisCurrent.updated_at <= stmt.excluded.updated_at,
+            )
+            self.db.execute(stmt)
+            return
+
+        current = self.db.get(StockAnalysisCurrent, values["symbol"])
+        if current is None:
+            self.db.add(StockAnalysisCurrent(**values))
+        elif current.updated_at <= values["updated_at"]:
+            for key, value in values.items():
+                setattr(current, key, value)
+
+    def backfill_current_analyses(self, dry_run: bool = False) -> int:
+        """
+        이력 테이블의 심볼별 최신 행으로 현재 테이블 채우기 (현재 테이블에 없는 심볼만)
+
+        이력 전체를 GROUP BY 하므로 애플리케이션 시작 시가 아니라
+        일회성 마이그레이션(database.migrate_current_analyses)에서만 실행합니다.
+
+        Args:
+            dry_run: True면 변경 없이 채울 심볼 수만 반환
+
+        Returns:
+            채운(또는 채울) 심볼 수
+        """
+        latest = (
+            select(
+                StockAnalysisCache.symbol,
+                func.max(StockAnalysisCache.updated_at).label("updated_at"),
+            )
+            .where(StockAnalysisCache.symbol.not_in(select(StockAnalysisCurrent.symbol)))
+            .group_by(StockAnalysisCache.symbol)
+            .subquery()
+        )
+        rows = (
+            self.db.query(StockAnalysisCache)
+            .join(
+                latest,
+                and_(
+                    StockAnalysisCache.symbol == latest.c.symbol,
+                    StockAnalysisCache.updated_at == latest.c.updated_at,
                 ),
-                analysis=cache.analysis,
             )
+            .all()
+        )
+        if dry_run:
+            return len({row.symbol for row in rows})
 
-        return None
+        for row in rows:
+            self._upsert_current({
+                "symbol": row.symbol,
+                "company_name": row.company_name,
+                "short_term_action": row.short_term_action,
+                "short_term_reason": row.short_term_reason,
+                "mid_term_action": row.mid_term_action,
+                "mid_term_reason": row.mid_term_reason,
+                "long_term_action": row.long_term_action,
+                "long_term_reason": row.long_term_reason,
+                "analysis": row.analysis,
+                "updated_at": row.updated_at,
+            })
 
-    def save_analysis(self, response: StockResponse):
+        self.db.commit()
+        return len({row.symbol for row in rows})
+
+    def get_latest_analysis_times(self, symbols: List[str]) -> Dict[str, datetime]:
         """
-        주식 분석 결과 저장
+        심볼별 최신 분석 시각 조회 (stock_analysis_current PK 조회)
 
         Args:
-            response: StockResponse 객체
+            symbols: 주식 심볼 목록
+
+        Returns:
+            {심볼: 최신 updated_at} - 분석 이력이 없는 심볼은 제외
         """
-        cache = StockAnalysisCache(
-            symbol=response.symbol,
-            company_name=response.company_name,
-            short_term_action=response.short_term.action,
-            short_term_reason=response.short_term.reason,
-            mid_term_action=response.mid_term.action,
-            mid_term_reason=response.mid_term.reason,
-            long_term_action=response.long_term.action,
-            long_term_reason=response.long_term.reason,
-            analysis=response.analysis,
+        if not symbols:
+            return {}
+
+        rows = (
+            self.db.query(StockAnalysisCurrent.symbol, StockAnalysisCurrent.updated_at)
+            .filter(StockAnalysisCurrent.symbol.in_(list(set(symbols))))
+            .all()
+        )
+        return {symbol: updated_at for symbol, updated_at in rows}
+
+    def delete_analysis_history_batch(self, cutoff_time: datetime, batch_size: int = 500) -> int:
+        """
+        보존 기간이 지난 분석 이력을 최대 batch_size건 삭제 (짧은 트랜잭션으로 락 최소화)
+
+        현재 분석은 stock_analysis_current에 별도로 있으므로 이력은 기간만으로 삭제합니다.
+
+        Args:
+            cutoff_time: 이 시각 이전에 갱신된 이력 삭제
+            batch_size: 한 번에 삭제할 최대 행 수
+
+        Returns:
+            삭제된 행 수 (batch_size보다 작으면 더 삭제할 행이 없음)
+        """
+        ids = (
+            select(StockAnalysisCache.id)
+            .where(StockAnalysisCache.updated_at < cutoff_time)
+            .order_by(StockAnalysisCache.id)
+            .limit(batch_size)
+        )
+        deleted = (
+            self.db.query(StockAnalysisCache)
+            .filter(StockAnalysisCache.id.in_(ids))
+            .delete(synchronize_session=False)
         )
 
-        self.db.add(cache)
         self.db.commit()
+        return deleted
 
-    def delete_old_cache(self, days: int = 30):
+    def delete_old_cache(self, days: int = 30, batch_size: int = 500) -> int:
         """
-        오래된 캐시 데이터 삭제
+        오래된 분석 이력 삭제 (배치 단위로 반복)
 
         Args:
             days: 삭제 기준 일수 (기본 30일)
+            batch_size: 배치당 삭제 행 수
+
+        Returns:
+            삭제된 전체 행 수
         """
         cutoff_time = datetime.utcnow() - timedelta(days=days)
 
-        self.db.query(StockAnalysisCache).filter(
-            StockAnalysisCache.updated_at < cutoff_time
+        total = 0
+        while True:
+            deleted = self.delete_analysis_history_batch(cutoff_time, batch_size)
+            total += deleted
+            if deleted < batch_size:
+                return total
+
+    # ============================================================
+    # MCP 도구 결과 캐시
+    # ============================================================
+
+    def get_tool_result(self, cache_key: str) -> Optional[Tuple[str, datetime]]:
+        """
+        만료되지 않은 도구 결과 조회
+
+        Args:
+            cache_key: 정규화된 도구명+인자 해시
+
+        Returns:
+            (결과 텍스트, 만료 시각) 튜플 또는 None
+        """
+        entry = (
+            self.db.query(ToolResultCache)
+            .filter(ToolResultCache.cache_key == cache_key)
+            .filter(ToolResultCache.expires_at > datetime.utcnow())
+            .first()
+        )
+
+        if entry:
+            return (entry.result, entry.expires_at)
+        return None
+
+    def save_tool_result(
+        self, cache_key: str, tool_name: str, arguments: str, result: str, expires_at: datetime
+    ):
+        """
+        도구 결과 저장 (upsert)
+
+        Args:
+            cache_key: 정규화된 도구명+인자 해시
+            tool_name: 도구 이름
+            arguments: 정규화된 인자 (JSON)
+            result: 도구 결과 텍스트
+            expires_at: 만료 시각
+        """
+        self.db.merge(
+            ToolResultCache(
+                cache_key=cache_key,
+                tool_name=tool_name,
+                arguments=arguments,
+                result=result,
+                created_at=datetime.utcnow(),
+                expires_at=expires_at,
+            )
+        )
+        self.db.commit()
+
+    def delete_expired_tool_results(self):
+        """만료된 도구 결과 삭제"""
+        self.db.query(ToolResultCache).filter(
+            ToolResultCache.expires_at <= datetime.utcnow()
         ).delete()
 
         self.db.commit()
+
+    # ============================================================
+    # 조회 빈도 통계
+    # ============================================================
+
+    def record_access_counts(
+        self, counts: Dict[str, Tuple[str, int]], half_life_hours: float = 24.0
+    ):
+        """
+        심볼별 조회 수 누적 (시간 감쇠 점수 갱신)
+
+        score는 half_life_hours마다 절반으로 감쇠한 뒤 새 조회 수를 더한 값입니다.
+        PostgreSQL/SQLite는 INSERT ... ON CONFLICT DO UPDATE로 감쇠/누적을 한 문장에서 처리해
+        여러 워커가 동시에 반영해도 조회 수가 유실되거나 첫 삽입이 충돌하지 않습니다.
+
+        Args:
+            counts: {심볼: (기업명, 조회 수)}
+            half_life_hours: 점수 반감기 (시간)
+        """
+        if not counts:
+            return
+
+        now = datetime.utcnow()
+        dialect = self.db.get_bind().dialect.name
+        if dialect in ("postgresql", "sqlite"):
+            self._upsert_access_counts(dialect, counts, now, half_life_hours)
+            self.db.commit()
+            return
+
+        existing = {
+            row.symbol: row
+            for row in self.db.query(StockAccessStats)
+            .filter(StockAccessStats.symbol.in_(list(counts)))
+            .all()
+        }
+
+        for symbol, (company_name, count) in counts.items():
+            row = existing.get(symbol)
+            if row:
+                elapsed_hours = (now - row.last_accessed_at).total_seconds() / 3600
+                row.score = row.score * 0.5 ** (elapsed_hours / half_life_hours) + count
+                row.access_count += count
+                row.company_name = company_name
+                row.last_accessed_at = now
+            else:
+                self.db.add(
+                    StockAccessStats(
+                        symbol=symbol,
+                        company_name=company_name,
+                        access_count=count,
+                        score=float(count),
+                        last_accessed_at=now,
+                    )
+                )
+
+        self.db.commit()
+
+    def _upsert_access_counts(
+        self, dialect: str, counts: Dict[str, Tuple[str, int]], now: datetime, half_life_hours: float
+    ):
+        """조회 수 upsert (행 잠금 순서를 맞추도록 심볼 순으로 삽입)"""
+        insert = postgresql.insert if dialect == "postgresql" else sqlite.insert
+        stmt = insert(StockAccessStats).values([
+            {
+                "symbol": symbol,
+                "company_name": company_name,
+                "access_count": count,
+                "score": float(count),
+                "last_accessed_at": now,
+            }
+            for symbol, (company_name, count) in sorted(counts.items())
+        ])
+        excluded = stmt.excluded
+        last_accessed_at = StockAccessStats.last_accessed_at
+        if dialect == "postgresql":
+            elapsed_hours = func.extract("epoch", excluded.last_accessed_at - last_accessed_at) / 3600
+            latest = func.greatest
+        else:
+            elapsed_hours = (func.julianday(excluded.last_accessed_at) - func.julianday(last_accessed_at)) * 24
+            latest = func.max
+        # 워커 간 시계 차이로 경과 시간이 음수가 되어 점수가 커지지 않도록 0 이상으로 제한
+        decay = func.power(0.5, latest(elapsed_hours, 0) / half_life_hours)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[StockAccessStats.symbol],
+            set_={
+                "score": StockAccessStats.score * decay + excluded.score,
+                "access_count": StockAccessStats.access_count + excluded.access_count,
+                "company_name": excluded.company_name,
+                "last_accessed_at": latest(last_accessed_at, excluded.last_accessed_at),
+            },
+        )
+        self.db.execute(stmt)
+
+    def get_top_accessed_symbols(
+        self, limit: int, half_life_hours: float = 24.0
+    ) -> List[Tuple[str, str, float]]:
+        """
+        감쇠 점수 기준 인기 심볼 조회
+
+        저장된 점수는 마지막 조회 시점 기준이므로 현재 시각까지 감쇠를 적용해 다시 정렬합니다.
+
+        Args:
+            limit: 조회할 심볼 수
+            half_life_hours: 점수 반감기 (시간)
+
+        Returns:
+            [(심볼, 기업명, 현재 점수)] - 점수 내림차순
+        """
+        now = datetime.utcnow()
+        rows = (
+            self.db.query(StockAccessStats)
+            .order_by(desc(StockAccessStats.score))
+            .limit(limit * 3)
+            .all()
+        )
+
+        ranked = [
+            (
+                row.symbol,
+                row.company_name,
+                row.score * 0.5 ** ((now - row.last_accessed_at).total_seconds() / 3600 / half_life_hours),
+            )
+            for row in rows
+        ]
+        ranked.sort(key=lambda item: item[2], reverse=True)
+        return ranked[:limit]
+
+    # ============================================================
+    # 비동기 분석 작업
+    # ============================================================
+
+    def submit_job(
+        self, job_id: str, input_query: str, dedupe_key: str, symbol: Optional[str] = None
+    ) -> Tuple[StockJobResponse, bool]:
+        """
+        분석 작업 등록 (같은 dedupe_key의 대기/실행 중인 작업이 있으면 그 작업 반환)
+
+        PostgreSQL/SQLite는 부분 유니크 인덱스(uq_job_active_dedupe)에 대한
+        INSERT ... ON CONFLICT DO NOTHING으로 동시 제출에도 작업을 하나만 만듭니다.
+
+        Args:
+            job_id: 새 작업 ID
+            input_query: 사용자 입력
+            dedupe_key: 중복 제출 판단 키
+            symbol: 주식 심볼 (알 수 없으면 None)
+
+        Returns:
+            (작업, 새로 등록했는지 여부) 튜플
+        """
+        values = dict(
+            id=job_id,
+            input_query=input_query,
+            dedupe_key=dedupe_key,
+            symbol=symbol,
+            status="queued",
+            attempts=0,
+            created_at=datetime.utcnow(),
+        )
+        dialect = self.db.get_bind().dialect.name
+        if dialect in ("postgresql", "sqlite"):
+            insert = postgresql.insert if dialect == "postgresql" else sqlite.insert
+            stmt = insert(AnalysisJob).values(**values).on_conflict_do_nothing(
+                index_elements=[AnalysisJob.dedupe_key],
+                # 파라미터가 아닌 리터럴 조건이어야 PostgreSQL이 부분 인덱스를 충돌 대상으로 추론함
+                index_where=JOB_ACTIVE_CONDITION,
+            )
+            created = self.db.execute(stmt).rowcount > 0
+        else:
+            created = self._get_active_job(dedupe_key) is None
+            if created:
+                self.db.add(AnalysisJob(**values))
+        self.db.commit()
+
+        job = self.db.get(AnalysisJob, job_id) if created else self._get_active_job(dedupe_key)
+        if job is None:
+            # 기존 작업이 방금 끝난 경우 - 다시 등록
+            return self.submit_job(job_id, input_query, dedupe_key, symbol)
+        return self._to_job_response(job, deduplicated=not created), created
+
+    def _get_active_job(self, dedupe_key: str) -> Optional[AnalysisJob]:
+        return (
+            self.db.query(AnalysisJob)
+            .filter(AnalysisJob.dedupe_key == dedupe_key)
+            .filter(AnalysisJob.status.in_(JOB_ACTIVE_STATUSES))
+            .first()
+        )
+
+    def get_job(self, job_id: str) -> Optional[StockJobResponse]:
+        """작업 조회 (PK)"""
+        job = self.db.get(AnalysisJob, job_id)
+        return self._to_job_response(job) if job else None
+
+    def claim_next_job(self, lease_seconds: float, max_attempts: int) -> Optional[Tuple[str, str, int]]:
+        """
+        실행할 작업 하나를 가져와 running으로 표시
+
+        대기 중인 작업과, 실행 중이지만 임대 시간(lease_seconds)이 지난 작업(워커 비정상 종료)을
+        생성 순으로 조회합니다. PostgreSQL에서는 FOR UPDATE SKIP LOCKED로 워커끼리 같은 작업을
+        가져가지 않고, 다른 워커가 잠근 행은 기다리지 않고 건너뜁니다.
+        max_attempts번 실행하고도 끝나지 않은 작업은 failed로 처리합니다.
+
+        Args:
+            lease_seconds: 실행 중 작업의 임대 시간 (초)
+            max_attempts: 최대 실행 시도 횟수
+
+        Returns:
+            (작업 ID, 사용자 입력, 시도 번호) 튜플 또는 None (실행할 작업 없음)
+        """
+        while True:
+            now = datetime.utcnow()
+            job = (
+                self.db.query(AnalysisJob)
+                .filter(
+                    or_(
+                        AnalysisJob.status == "queued",
+                        and_(
+                            AnalysisJob.status == "running",
+                            AnalysisJob.started_at < now - timedelta(seconds=lease_seconds),
+                        ),
+                    )
+                )
+                .order_by(AnalysisJob.created_at)
+                .limit(1)
+                .with_for_update(skip_locked=True)
+                .first()
+            )
+            if job is None:
+                self.db.commit()
+                return None
+
+            if job.attempts >= max_attempts:
+                job.status = "failed"
+                job.error = f"작업이 {max_attempts}회 시도 내에 완료되지 않았습니다"
+                job.finished_at = now
+                self.db.commit()
+                continue
+
+            job.status = "running"
+            job.attempts += 1
+            job.started_at = now
+            claimed = (job.id, job.input_query, job.attempts)
+            self.db.commit()
+            return claimed
+
+    def _claimed_job(self, job_id: str, attempt: int):
+        """
+        해당 시도(attempt)로 실행 중인 작업만 대상으로 하는 쿼리
+
+        임대가 만료되어 다른 워커가 다시 가져간 작업은 attempts가 늘어나 있으므로,
+        늦게 끝난 이전 시도가 새 시도의 상태/결과를 덮어쓰지 않습니다.
+        """
+        return self.db.query(AnalysisJob).filter(
+            AnalysisJob.id == job_id,
+            AnalysisJob.status == "running",
+            AnalysisJob.attempts == attempt,
+        )
+
+    def complete_job(self, job_id: str, attempt: int, result: StockResponse) -> bool:
+        """
+        작업 성공 처리 (결과 JSON 저장)
+
+        Args:
+            job_id: 작업 ID
+            attempt: claim_next_job이 반환한 시도 번호
+            result: 분석 결과
+
+        Returns:
+            반영 여부 (False: 이미 다른 시도가 가져갔거나 끝난 작업)
+        """
+        updated = self._claimed_job(job_id, attempt).update(
+            {
+                "status": "succeeded",
+                "symbol": result.symbol,
+                "result": result.model_dump_json(),
+                "error": None,
+                "finished_at": datetime.utcnow(),
+            },
+            synchronize_session=False,
+        )
+        self.db.commit()
+        return updated > 0
+
+    def fail_job(self, job_id: str, attempt: int, error: str) -> bool:
+        """
+        작업 실패 처리
+
+        Returns:
+            반영 여부 (False: 이미 다른 시도가 가져갔거나 끝난 작업)
+        """
+        updated = self._claimed_job(job_id, attempt).update(
+            {"status": "failed", "error": error, "finished_at": datetime.utcnow()},
+            synchronize_session=False,
+        )
+        self.db.commit()
+        return updated > 0
+
+    def delete_finished_jobs(self, cutoff_time: datetime) -> int:
+        """
+        cutoff_time 이전에 끝난 작업 삭제
+
+        Returns:
+            삭제된 행 수
+        """
+        deleted = (
+            self.db.query(AnalysisJob)
+            .filter(AnalysisJob.status.notin_(JOB_ACTIVE_STATUSES))
+            .filter(AnalysisJob.finished_at < cutoff_time)
+            .delete(synchronize_session=False)
+        )
+        self.db.commit()
+        return deleted
+
+    @staticmethod
+    def _to_job_response(job: AnalysisJob, deduplicated: bool = False) -> StockJobResponse:
+        """AnalysisJob ORM 객체 → StockJobResponse 변환"""
+        return StockJobResponse(
+            job_id=job.id,
+            status=job.status,
+            company=job.input_query,
+            symbol=job.symbol,
+            created_at=job.created_at,
+            started_at=job.started_at,
+            finished_at=job.finished_at,
+            result=StockResponse.model_validate_json(job.result) if job.result else None,
+            error=job.error,
+            deduplicated=deduplicated,
+        )
+
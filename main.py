@@ -1,24 +1,45 @@
+import logging
+import time
 from contextlib import asynccontextmanager
-from fastapi import FastAPI
-from api import router as stock_router
-from database import init_db
+from fastapi import FastAPI, Request
+from fastapi.responses import PlainTextResponse
+from utils.log import RequestIdMiddleware, setup_logging, shutdown_logging
+
+# 구조화 로깅 (비차단 큐 핸들러) - 서비스/DB 모듈 import 중 로그도 잡히도록 가장 먼저 설정
+setup_logging()
+
+from api import router as stock_router, system_router, stock_service  # noqa: E402
+from database import init_db, get_worker_count, async_engine  # noqa: E402
+from utils.metrics import HTTP_REQUEST_DURATION, REGISTRY, prepare_multiprocess_dir  # noqa: E402
+
+logger = logging.getLogger(__name__)
 
 
 @asynccontextmanager
 async def lifespan(_):
     """애플리케이션 라이프사이클 관리"""
     # Startup
+    setup_logging()  # 이전 lifespan 종료 시 리스너가 멈췄다면 다시 시작
+    REGISTRY.start()  # 워커가 여러 개이면 메트릭 스냅샷 기록 (/metrics에서 합산)
     try:
         init_db()
-        print("[APP] 애플리케이션 시작 완료 - DB 연결 성공")
+        logger.info("[APP] 애플리케이션 시작 완료 - DB 연결 성공")
     except Exception as e:
-        print(f"[APP] 데이터베이스 초기화 실패: {e}")
-        print("[APP] 계속 진행하지만 캐시 기능은 비활성화됩니다.")
+        logger.error("[APP] 데이터베이스 초기화 실패: %s", e)
+        logger.warning("[APP] 계속 진행하지만 캐시 기능은 비활성화됩니다.")
+
+    # MCP 서버 풀 워밍업 (요청 경로에서 프로세스 기동 비용 제거)
+    await stock_service.startup()
 
     yield
 
-    # Shutdown (필요한 경우 정리 작업 추가)
-    print("[APP] 애플리케이션 종료")
+    # Shutdown
+    await stock_service.shutdown()
+    if async_engine is not None:
+        await async_engine.dispose()
+    REGISTRY.stop()
+    logger.info("[APP] 애플리케이션 종료")
+    shutdown_logging()  # 워커 프로세스는 atexit 없이 종료될 수 있으므로 여기서 큐를 비움
 
 
 app = FastAPI(
@@ -31,6 +52,33 @@ app = FastAPI(
 
 # 라우터 등록
 app.include_router(stock_router)
+app.include_router(system_router)
+
+# 요청 상관관계 ID (X-Request-ID) - 로그의 request_id 필드
+app.add_middleware(RequestIdMiddleware)
+
+
+@app.middleware("http")
+async def record_request_duration(request: Request, call_next):
+    """라우트 템플릿 단위 HTTP 요청 처리 시간 기록 (/metrics 자체는 제외)"""
+    start = time.perf_counter()
+    response = await call_next(request)
+    route = request.scope.get("route")
+    path = getattr(route, "path", None)
+    if path is not None and path != "/metrics":
+        HTTP_REQUEST_DURATION.observe(
+            time.perf_counter() - start,
+            method=request.method,
+            route=path,
+            status=str(response.status_code),
+        )
+    return response
+
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Prometheus 스크레이프 엔드포인트 (단계별 지연 시간, 캐시 적중, 도구 호출, 토큰/비용 - 모든 워커 합산)"""
+    return PlainTextResponse(REGISTRY.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
 
 
 @app.get("/")
@@ -45,4 +93,8 @@ async def root():
 if __name__ == "__main__":
     import uvicorn
 
-    uvicorn.run("main:app", host="0.0.0.0", port=8000, reload=False, workers=3)
+    workers = get_worker_count()
+    if workers > 1:
+        # 워커 프로세스가 환경 변수로 상속하여 같은 디렉터리에 메트릭 스냅샷 기록
+        prepare_multiprocess_dir()
+    uvicorn.run("main:app", host="0.0.0.0", port=8000, reload=False, workers=workers)
@@ -1,3 +1,17 @@
-from .stock import StockRequest, StockResponse, RecommendationDetail
+from .stock import (
+    StockRequest,
+    StockBatchRequest,
+    StockResponse,
+    RecommendationDetail,
+    StockAnalysisResult,
+    StockJobResponse,
+)
 
-__all__ = ["StockRequest", "StockResponse", "RecommendationDetail"]
+__all__ = [
+    "StockRequest",
+    "StockBatchRequest",
+    "StockResponse",
+    "RecommendationDetail",
+    "StockAnalysisResult",
+    "StockJobResponse",
+]
@@ -1,4 +1,6 @@
-from pydantic import BaseModel
+from datetime import datetime
+from typing import List, Optional
+from pydantic import BaseModel, Field
 
 
 class StockRequest(BaseModel):
@@ -6,12 +8,25 @@ class StockRequest(BaseModel):
     company: str  # 기업명 또는 심볼 (예: "테슬라", "TSLA", "엔비디아", "NVDA")
 
 
+class StockBatchRequest(BaseModel):
+    """주식 일괄 분석 요청 모델"""
+    companies: List[str] = Field(..., min_length=1, max_length=200)  # 기업명 또는 심볼 목록
+
+
 class RecommendationDetail(BaseModel):
     """투자 의견 상세"""
     action: str  # BUY, SELL, HOLD
     reason: str  # 해당 투자 의견의 이유
 
 
+class StockAnalysisResult(BaseModel):
+    """모델 구조화 출력 (ANALYSIS_OUTPUT_MODE=json) - 심볼/기업명을 제외한 분석 본문"""
+    short_term: RecommendationDetail
+    mid_term: RecommendationDetail
+    long_term: RecommendationDetail
+    analysis: str
+
+
 class StockResponse(BaseModel):
     """주식 분석 응답 모델"""
     symbol: str
@@ -20,3 +35,19 @@ class StockResponse(BaseModel):
     mid_term: RecommendationDetail    # 중기 (1주일~3개월)
     long_term: RecommendationDetail   # 장기 (3개월~1년)
     analysis: str  # 종합 분석
+    updated_at: Optional[datetime] = None  # 분석 시각 (UTC)
+    stale: bool = False  # 유효 시간이 지난 캐시 결과 여부 (백그라운드 갱신 중이거나 분석 실패 시 대체 응답)
+
+
+class StockJobResponse(BaseModel):
+    """비동기 분석 작업 상태 응답 모델"""
+    job_id: str
+    status: str  # queued, running, succeeded, failed
+    company: str  # 제출한 기업명 또는 심볼
+    symbol: Optional[str] = None  # 주식 심볼 (제출 시 알 수 없으면 완료 후 채워짐)
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    result: Optional[StockResponse] = None  # 분석 결과 (succeeded일 때)
+    error: Optional[str] = None  # 오류 메시지 (failed일 때)
+    deduplicated: bool = False  # 제출 시 같은 종목의 진행 중인 작업에 합쳐졌는지 여부
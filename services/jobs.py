@@ -0,0 +1,143 @@
+import asyncio
+import logging
+import os
+import uuid
+from typing import List, Optional, Tuple
+
+from models import StockJobResponse
+from utils import Deadline, normalize_query
+from utils.log import request_id_var
+from utils.metrics import JOB_EVENTS, span
+
+logger = logging.getLogger(__name__)
+
+
+class AnalysisJobRunner:
+    """
+    비동기 분석 작업 실행기 (POST /api/stock/jobs)
+
+    - 제출은 stock_analysis_job에 행을 추가하고 즉시 작업 ID를 반환
+    - 같은 종목(심볼, 모르면 정규화된 입력)의 대기/실행 중인 작업이 있으면 그 작업에 합침
+    - 요청 처리와 별개인 워커 태스크가 FOR UPDATE SKIP LOCKED로 작업을 가져가 실행
+      (여러 워커/컨테이너가 같은 테이블을 나눠 처리)
+    - 실행 중 워커가 죽으면 임대 시간(JOB_LEASE_SECONDS)이 지난 뒤 다른 워커가 다시 실행
+    """
+
+    def __init__(self, service):
+        self.service = service
+        self.workers = int(os.getenv("JOB_WORKERS", "2"))  # 0이면 이 프로세스에서는 작업을 실행하지 않음
+        self.poll_interval = float(os.getenv("JOB_POLL_INTERVAL_SECONDS", "2"))
+        self.deadline_seconds = float(os.getenv("JOB_DEADLINE_SECONDS", "300"))  # 작업당 분석 시간 예산
+        self.lease_seconds = float(os.getenv("JOB_LEASE_SECONDS", "600"))
+        self.max_attempts = int(os.getenv("JOB_MAX_ATTEMPTS", "3"))
+        self._wakeup = asyncio.Event()
+        self._tasks: List[asyncio.Task] = []
+
+    def start(self):
+        """워커 태스크 시작"""
+        if not self._tasks:
+            self._tasks = [
+                asyncio.create_task(self._worker(), name=f"analysis-job-worker-{index}")
+                for index in range(max(0, self.workers))
+            ]
+
+    async def stop(self):
+        """워커 태스크 중단 (실행 중이던 작업은 임대 만료 후 다른 워커가 다시 실행)"""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def submit(self, company: str) -> StockJobResponse:
+        """
+        분석 작업 제출
+
+        심볼을 L1 / 로컬 종목 데이터 / 심볼 매핑 캐시로만 확인하므로 AI 호출 없이 즉시 반환합니다.
+
+        Args:
+            company: 기업명 또는 심볼
+
+        Returns:
+            StockJobResponse (기존 작업에 합쳐졌으면 deduplicated=True)
+        """
+        query_key = normalize_query(company)
+        mapping = self.service.symbol_l1.get(query_key) or self.service._resolve_locally(company)
+        if mapping is None:
+            mapping = await self.service._run_db(lambda repo: repo.get_symbol_mapping(company))
+        symbol = mapping[0] if mapping else None
+        dedupe_key = f"symbol:{symbol}" if symbol else f"query:{query_key}"
+
+        job, created = await self.service._run_db(
+            lambda repo: repo.submit_job(uuid.uuid4().hex, company, dedupe_key, symbol)
+        )
+        JOB_EVENTS.inc(event="submitted" if created else "deduplicated")
+        if created:
+            logger.info("[JOB] %s 등록 - %s", job.job_id, company)
+            self._wakeup.set()
+        else:
+            logger.info("[JOB] %s - 진행 중인 작업 %s에 합침", company, job.job_id)
+        return job
+
+    async def get(self, job_id: str) -> Optional[StockJobResponse]:
+        """작업 상태 조회"""
+        return await self.service._run_db(lambda repo: repo.get_job(job_id))
+
+    async def _claim(self) -> Optional[Tuple[str, str, int]]:
+        try:
+            return await self.service._run_db(
+                lambda repo: repo.claim_next_job(self.lease_seconds, self.max_attempts)
+            )
+        except Exception as e:
+            logger.error("[JOB] 작업 조회 오류: %s", e)
+            return None
+
+    async def _worker(self):
+        while True:
+            claimed = await self._claim()
+            if claimed is None:
+                # 새 작업 제출 알림 또는 폴링 주기까지 대기 (다른 워커/컨테이너가 등록한 작업은 폴링으로 확인)
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            await self._run(*claimed)
+
+    async def _run(self, job_id: str, company: str, attempt: int):
+        """작업 1건 실행 (로그 request_id는 작업 ID)"""
+        token = request_id_var.set(f"job-{job_id[:12]}")
+        try:
+            logger.info("[JOB] %s 실행 시작 - %s", job_id, company)
+            try:
+                with span("job"):
+                    result = await self.service.analyze_stock_async(
+                        company, deadline=Deadline.after(self.deadline_seconds)
+                    )
+            except Exception as e:
+                logger.warning("[JOB] %s 실패: %s", job_id, e)
+                error = f"Error: {str(e)}"
+                await self._finish(job_id, "failed", lambda repo: repo.fail_job(job_id, attempt, error))
+                return
+
+            await self._finish(job_id, "succeeded", lambda repo: repo.complete_job(job_id, attempt, result))
+            logger.info("[JOB] %s 완료 - %s", job_id, result.symbol)
+        finally:
+            request_id_var.reset(token)
+
+    async def _finish(self, job_id: str, event: str, fn):
+        """
+        작업 결과 저장 (실패하면 임대 만료 후 다시 실행됨)
+
+        임대 만료로 다른 워커가 이미 다시 가져간 작업이면 결과를 버리고 stale로 집계합니다.
+        """
+        try:
+            applied = await self.service._run_db(fn)
+        except Exception as e:
+            logger.error("[JOB] %s 결과 저장 실패: %s", job_id, e)
+            return
+        if applied:
+            JOB_EVENTS.inc(event=event)
+        else:
+            JOB_EVENTS.inc(event="stale")
+            logger.warning("[JOB] %s 결과 무시 - 임대 만료 후 다른 시도가 실행 중이거나 끝난 작업", job_id)
@@ -0,0 +1,142 @@
+import asyncio
+import logging
+import os
+import time
+from collections import Counter, deque
+from datetime import datetime, timedelta
+from typing import Deque, Dict, List, Optional, Tuple
+
+from database import lock_engine, advisory_lock_key, try_advisory_lock, release_advisory_lock
+
+logger = logging.getLogger(__name__)
+
+# 워커/컨테이너 중 한 곳만 사전 분석을 실행하도록 하는 advisory lock 키
+PREWARM_LOCK_KEY = advisory_lock_key("stock_analysis:prewarm")
+
+
+class PrewarmScheduler:
+    """
+    인기 종목 사전 분석 스케줄러
+
+    - 요청마다 심볼 조회 수를 메모리에 집계하고, 주기적으로 stock_access_stats에 일괄 반영
+    - 감쇠 점수 상위 N개 심볼 중 캐시 만료가 임박했거나 없는 심볼을 미리 재분석
+    - 동시 실행 수와 시간당 분석 횟수(비용 예산)를 제한
+    - PostgreSQL에서는 advisory lock으로 한 워커만 사전 분석을 실행
+    """
+
+    def __init__(self, service):
+        self.service = service
+        self.enabled = os.getenv("PREWARM_ENABLED", "false").lower() in ("1", "true", "yes")
+        self.interval_seconds = float(os.getenv("PREWARM_INTERVAL_MINUTES", "10")) * 60
+        self.top_n = int(os.getenv("PREWARM_TOP_N", "30"))
+        self.lead_minutes = float(os.getenv("PREWARM_LEAD_MINUTES", "60"))  # 만료 몇 분 전부터 재분석할지
+        self.concurrency = int(os.getenv("PREWARM_CONCURRENCY", "2"))
+        self.max_runs_per_hour = int(os.getenv("PREWARM_MAX_RUNS_PER_HOUR", "20"))  # 비용 예산
+
+        self._access_counts: Counter = Counter()
+        self._company_names: Dict[str, str] = {}
+        self._run_times: Deque[float] = deque()  # 최근 1시간 사전 분석 시각 (예산 계산용)
+        self._task: Optional[asyncio.Task] = None
+
+    def record_access(self, symbol: str, company_name: str):
+        """심볼 조회 1회 기록 (메모리 집계, DB 반영은 주기적으로 일괄 처리)"""
+        self._access_counts[symbol] += 1
+        self._company_names[symbol] = company_name
+
+    def start(self):
+        """백그라운드 루프 시작 (조회 통계 반영은 항상, 사전 분석은 PREWARM_ENABLED일 때만)"""
+        if self._task is None:
+            self._task = asyncio.create_task(self._loop(), name="prewarm-scheduler")
+
+    async def stop(self):
+        """루프 중단 후 남은 조회 통계 반영"""
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush_access_counts()
+
+    async def _loop(self):
+        while True:
+            await asyncio.sleep(self.interval_seconds)
+            try:
+                await self.flush_access_counts()
+                if self.enabled:
+                    await self.run_once()
+            except Exception as e:
+                logger.error("[PREWARM] 스케줄러 실행 오류: %s", e)
+
+    async def flush_access_counts(self):
+        """메모리에 집계된 조회 수를 DB에 일괄 반영 (실패 시 다음 주기에 재시도)"""
+        if not self._access_counts:
+            return
+
+        counts, self._access_counts = self._access_counts, Counter()
+        payload = {symbol: (self._company_names[symbol], count) for symbol, count in counts.items()}
+        try:
+            await self.service._run_db(lambda repo: repo.record_access_counts(payload))
+        except Exception as e:
+            logger.warning("[PREWARM] 조회 통계 반영 실패, 다음 주기에 재시도: %s", e)
+            self._access_counts.update(counts)
+
+    async def run_once(self):
+        """사전 분석 1회 실행 (다른 워커가 실행 중이면 건너뜀)"""
+        lock_conn = None
+        if lock_engine.dialect.name == "postgresql":
+            lock_conn = await asyncio.to_thread(try_advisory_lock, lock_engine, PREWARM_LOCK_KEY)
+            if lock_conn is None:
+                return
+
+        try:
+            targets = await self._select_targets()
+            budget = self._remaining_budget()
+            if not targets or budget <= 0:
+                return
+
+            targets = targets[:budget]
+            logger.info("[PREWARM] 사전 분석 대상 %d개: %s", len(targets), [symbol for symbol, _ in targets])
+
+            semaphore = asyncio.Semaphore(max(1, self.concurrency))
+            # 이 시각 이후 다른 워커가 갱신한 결과는 재사용 (중복 분석 방지)
+            reuse_max_age_hours = max(self.service.cache_hours - self.lead_minutes / 60, 0)
+
+            async def _refresh(symbol: str, company_name: str):
+                async with semaphore:
+                    self._run_times.append(time.monotonic())
+                    await self.service.refresh_analysis(symbol, company_name, reuse_max_age_hours)
+
+            await asyncio.gather(
+                *(_refresh(symbol, company_name) for symbol, company_name in targets),
+                return_exceptions=True,
+            )
+        finally:
+            if lock_conn is not None:
+                await asyncio.to_thread(release_advisory_lock, lock_conn, PREWARM_LOCK_KEY)
+
+    async def _select_targets(self) -> List[Tuple[str, str]]:
+        """인기 상위 N개 중 캐시가 없거나 lead_minutes 안에 만료되는 심볼 (점수 순)"""
+        top = await self.service._run_db(lambda repo: repo.get_top_accessed_symbols(self.top_n))
+        if not top:
+            return []
+
+        latest = await self.service._run_db(
+            lambda repo: repo.get_latest_analysis_times([symbol for symbol, _, _ in top])
+        )
+        refresh_before = datetime.utcnow() - timedelta(
+            hours=self.service.cache_hours, minutes=-self.lead_minutes
+        )
+        return [
+            (symbol, company_name)
+            for symbol, company_name, _ in top
+            if symbol not in latest or latest[symbol] <= refresh_before
+        ]
+
+    def _remaining_budget(self) -> int:
+        """최근 1시간 기준 남은 사전 분석 횟수"""
+        cutoff = time.monotonic() - 3600
+        while self._run_times and self._run_times[0] < cutoff:
+            self._run_times.popleft()
+        return self.max_runs_per_hour - len(self._run_times)
@@ -0,0 +1,94 @@
+import asyncio
+import logging
+import os
+from datetime import datetime, timedelta
+from typing import Optional
+
+from database import lock_engine, advisory_lock_key, try_advisory_lock, release_advisory_lock
+
+logger = logging.getLogger(__name__)
+
+# 워커/컨테이너 중 한 곳만 정리 작업을 실행하도록 하는 advisory lock 키
+RETENTION_LOCK_KEY = advisory_lock_key("stock_analysis:retention")
+
+
+class RetentionJob:
+    """
+    분석 이력 보존 기간 정리 작업
+
+    - stock_analysis_cache(이력)에서 보존 기간이 지난 행을 작은 배치로 나누어 삭제
+    - 배치마다 트랜잭션을 커밋하고 잠시 쉬어 긴 락/부하를 피함
+    - 보존 기간이 지난 완료/실패 분석 작업도 함께 정리
+    - 만료된 MCP 도구 결과 캐시는 분석 이력 보존 기간과 관계없이 정리 (TOOL_CACHE_DB=true이면 항상 실행)
+    - PostgreSQL에서는 advisory lock으로 한 워커만 실행
+    """
+
+    def __init__(self, service):
+        self.service = service
+        self.retention_days = float(os.getenv("ANALYSIS_RETENTION_DAYS", "30"))
+        self.interval_seconds = float(os.getenv("ANALYSIS_RETENTION_INTERVAL_MINUTES", "60")) * 60
+        self.batch_size = int(os.getenv("ANALYSIS_RETENTION_BATCH_SIZE", "500"))
+        self.batch_pause = float(os.getenv("ANALYSIS_RETENTION_BATCH_PAUSE_SECONDS", "0.5"))
+        self.purge_tool_results = service.agent.tool_cache.use_db
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        """백그라운드 루프 시작 (ANALYSIS_RETENTION_DAYS가 0 이하이고 도구 결과 DB 캐시도 꺼져 있으면 비활성화)"""
+        if self._task is None and (self.retention_days > 0 or self.purge_tool_results):
+            self._task = asyncio.create_task(self._loop(), name="analysis-retention")
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _loop(self):
+        while True:
+            await asyncio.sleep(self.interval_seconds)
+            try:
+                await self.run_once()
+            except Exception as e:
+                logger.error("[RETENTION] 정리 작업 오류: %s", e)
+
+    async def run_once(self) -> int:
+        """
+        정리 작업 1회 실행 (다른 워커가 실행 중이면 건너뜀)
+
+        Returns:
+            삭제된 분석 이력 행 수
+        """
+        lock_conn = None
+        if lock_engine.dialect.name == "postgresql":
+            lock_conn = await asyncio.to_thread(try_advisory_lock, lock_engine, RETENTION_LOCK_KEY)
+            if lock_conn is None:
+                return 0
+
+        try:
+            await self.service._run_db(lambda repo: repo.delete_expired_tool_results())
+
+            total = 0
+            if self.retention_days <= 0:
+                return total
+
+            cutoff_time = datetime.utcnow() - timedelta(days=self.retention_days)
+            while True:
+                deleted = await self.service._run_db(
+                    lambda repo: repo.delete_analysis_history_batch(cutoff_time, self.batch_size)
+                )
+                total += deleted
+                if deleted < self.batch_size:
+                    break
+                await asyncio.sleep(self.batch_pause)
+
+            await self.service._run_db(lambda repo: repo.delete_finished_jobs(cutoff_time))
+
+            if total:
+                logger.info("[RETENTION] %g일 지난 분석 이력 %d건 삭제", self.retention_days, total)
+            return total
+        finally:
+            if lock_conn is not None:
+                await asyncio.to_thread(release_advisory_lock, lock_conn, RETENTION_LOCK_KEY)
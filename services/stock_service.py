@@ -1,7 +1,24 @@
 import asyncio
-from agents import OpenAIAgent
-from models import StockResponse, RecommendationDetail
-from database import get_db, StockRepository
+import functools
+import logging
+import os
+from datetime import datetime, timedelta
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Tuple, TypeVar, Union
+from agents import OpenAIAgent, EventCallback
+from pydantic import ValidationError
+from models import StockResponse, RecommendationDetail, StockAnalysisResult
+from database import lock_engine, run_db, StockRepository, AnalysisCoordinator
+from utils import Deadline, SingleFlight, TTLCache, normalize_query
+from utils.log import log_payload
+from utils.metrics import CACHE_EVENTS, span
+from .jobs import AnalysisJobRunner
+from .prewarm import PrewarmScheduler
+from .retention import RetentionJob
+from .symbol_resolver import LocalSymbolResolver
+
+T = TypeVar("T")
+
+logger = logging.getLogger(__name__)
 
 
 class StockService:
@@ -10,16 +27,85 @@ class StockService:
     def __init__(self):
         self.agent = OpenAIAgent()
         self._mcp_initialized = False
+        self._mcp_init_lock = asyncio.Lock()
+        self._symbol_flight = SingleFlight()  # 입력 쿼리 단위 심볼 변환 중복 제거
+        self._analysis_flight = SingleFlight()  # 심볼 단위 분석 중복 제거
         self.cache_enabled = True  # 캐시 사용 여부
-        self.cache_hours = 24  # 캐시 유효 시간 (시간 단위)
+        self.cache_hours = 24  # 캐시 유효 시간 (시간 단위, soft TTL)
+        # soft TTL ~ hard TTL 사이: 기존 결과를 즉시 반환하고 백그라운드에서 갱신 (stale-while-revalidate)
+        self.cache_stale_hours = int(os.getenv("CACHE_STALE_HOURS", "72"))
+        # 분석 실패 시 대체로 반환할 수 있는 최대 캐시 나이 (stale-if-error)
+        self.stale_if_error_hours = int(os.getenv("CACHE_STALE_IF_ERROR_HOURS", "168"))
+        self._refresh_tasks: Dict[str, asyncio.Task] = {}  # 심볼별 백그라운드 갱신 작업
+        # 워커 간 분석 중복 제거 (DISTRIBUTED_COALESCING=true 일 때만 활성화)
+        self.coordinator = AnalysisCoordinator.from_env(lock_engine)
+
+        # L1 인메모리 캐시 (L2: PostgreSQL) - 핫 티커는 DB 조회 없이 응답
+        l1_size = int(os.getenv("L1_CACHE_SIZE", "1024"))
+        self.symbol_l1: TTLCache[tuple[str, str]] = TTLCache(l1_size, self.cache_hours * 3600)
+        # 번들 종목 데이터 기반 로컬 심볼 변환 (알려진 종목은 DB/LLM 조회 생략)
+        self.symbol_resolver = LocalSymbolResolver.from_env()
+        self.analysis_l1: TTLCache[StockResponse] = TTLCache(l1_size, self.cache_hours * 3600)
+
+        # 일괄 분석 시 캐시 미스 동시 분석 상한
+        self.batch_concurrency = int(os.getenv("BATCH_CONCURRENCY", "8"))
+
+        # 조회 빈도 집계 및 인기 종목 사전 분석 스케줄러
+        self.prewarm = PrewarmScheduler(self)
+        # 분석 이력 보존 기간 정리 (배치 삭제)
+        self.retention = RetentionJob(self)
+        # 비동기 분석 작업 (제출/조회 API + 작업 워커)
+        self.jobs = AnalysisJobRunner(self)
 
     async def _ensure_mcp_initialized(self):
-        """MCP가 초기화되지 않았다면 초기화"""
-        if not self._mcp_initialized:
-            await self.agent.initialize_mcp()
-            self._mcp_initialized = True
+        """MCP가 초기화되지 않았다면 초기화 (동시 요청 시 한 번만 실행)"""
+        if self._mcp_initialized:
+            return
+        async with self._mcp_init_lock:
+            if not self._mcp_initialized:
+                with span("mcp_init"):
+                    await self.agent.initialize_mcp()
+                self._mcp_initialized = True
+
+    async def startup(self):
+        """애플리케이션 시작 시 호출 - MCP 서버 풀 워밍업 및 사전 분석/이력 정리/분석 작업 워커 시작"""
+        await self._ensure_mcp_initialized()
+        self.prewarm.start()
+        self.retention.start()
+        self.jobs.start()
+
+    async def shutdown(self):
+        """애플리케이션 종료 시 호출 - 스케줄러/작업 워커/백그라운드 갱신 중단 및 MCP 서버 프로세스/LISTEN 연결 정리"""
+        await self.jobs.stop()
+        await self.prewarm.stop()
+        await self.retention.stop()
+        for task in list(self._refresh_tasks.values()):
+            task.cancel()
+        await self.agent.cleanup_mcp()
+        self._mcp_initialized = False
+        if self.coordinator:
+            await asyncio.to_thread(self.coordinator.close)
 
-    async def analyze_stock_async(self, company: str, use_mcp: bool = True, use_cache: bool = True) -> StockResponse:
+    async def _run_db(self, fn: Callable[[StockRepository], T]) -> T:
+        """
+        DB 작업을 이벤트 루프 블로킹 없이 실행 (비동기 엔진 또는 워커 스레드)
+
+        Args:
+            fn: StockRepository를 받아 동기 DB 작업을 수행하는 함수
+
+        Returns:
+            fn의 반환값
+        """
+        return await run_db(lambda db: fn(StockRepository(db)))
+
+    async def analyze_stock_async(
+        self,
+        company: str,
+        use_mcp: bool = True,
+        use_cache: bool = True,
+        on_event: Optional[EventCallback] = None,
+        deadline: Optional[Deadline] = None,
+    ) -> StockResponse:
         """
         주식을 종합 분석하고 투자 의견을 제공 (비동기)
 
@@ -27,99 +113,503 @@ class StockService:
             company: 기업명 또는 심볼 (예: "테슬라", "TSLA")
             use_mcp: MCP를 사용하여 최신 정보 검색 여부
             use_cache: 캐시 사용 여부
+            on_event: 진행 이벤트 콜백 (심볼 변환, 캐시 적중, 도구 호출, 모델 토큰)
+            deadline: 요청 마감 시각 (AI 호출 제한 시간 / 도구 루프 중단 기준, 없으면 호출당 제한 시간만 적용)
 
         Returns:
             StockResponse: 분석 결과
         """
-        # 데이터베이스 세션
-        with get_db() as db:
-            repo = StockRepository(db)
+        # 1단계: 기업명/심볼을 정확한 주식 심볼과 정식 기업명으로 변환 (캐시 활용)
+        with span("symbol_resolve"):
+            stock_symbol, company_name = await self._get_stock_info_with_cache(company, deadline)
+        await self._emit(on_event, "symbol", {"symbol": stock_symbol, "company_name": company_name})
+        self.prewarm.record_access(stock_symbol, company_name)
+
+        # L1 캐시 적중 시 DB/단일 비행 없이 즉시 반환
+        if use_cache and self.cache_enabled:
+            l1_result = self.analysis_l1.get(stock_symbol)
+            if l1_result:
+                logger.info("[L1 CACHE HIT] %s (%s)", stock_symbol, company_name)
+                CACHE_EVENTS.inc(cache="analysis_l1", result="hit")
+                await self._emit(on_event, "cache_hit", {"symbol": stock_symbol, "tier": "memory"})
+                return l1_result
+            CACHE_EVENTS.inc(cache="analysis_l1", result="miss")
+
+        # 2~6단계: 같은 심볼에 대한 동시 요청은 하나의 분석으로 합침
+        # (진행 이벤트는 실제 분석을 수행하는 리더 요청에만 전달됨)
+        if self._analysis_flight.in_flight((stock_symbol, use_mcp, use_cache)):
+            logger.info("[SINGLE-FLIGHT] %s - 진행 중인 분석 결과 대기", stock_symbol)
+            await self._emit(on_event, "waiting", {"symbol": stock_symbol})
+        return await self._analysis_flight.do(
+            (stock_symbol, use_mcp, use_cache),
+            lambda: self._analyze_symbol(stock_symbol, company_name, use_mcp, use_cache, on_event, deadline),
+        )
+
+    async def _analyze_symbol(
+        self,
+        stock_symbol: str,
+        company_name: str,
+        use_mcp: bool,
+        use_cache: bool,
+        on_event: Optional[EventCallback] = None,
+        deadline: Optional[Deadline] = None,
+    ) -> StockResponse:
+        """
+        심볼 단위 분석 (캐시 확인 → AI 분석 → 캐시 저장)
 
-            # 1단계: 기업명/심볼을 정확한 주식 심볼과 정식 기업명으로 변환 (캐시 활용)
-            stock_symbol, company_name = self._get_stock_info_with_cache(company, repo)
+        Args:
+            stock_symbol: 주식 심볼
+            company_name: 정식 기업명
+            use_mcp: MCP를 사용하여 최신 정보 검색 여부
+            use_cache: 캐시 사용 여부
+            on_event: 진행 이벤트 콜백
+            deadline: 요청 마감 시각
 
-            # 2단계: 캐시된 분석 결과 확인
-            if use_cache and self.cache_enabled:
-                cached_result = repo.get_cached_analysis(stock_symbol, self.cache_hours)
-                if cached_result:
-                    print(f"[CACHE HIT] {stock_symbol} ({company_name}) - 캐시된 결과 반환")
-                    return cached_result
-                else:
-                    print(f"[CACHE MISS] {stock_symbol} ({company_name}) - 새로 분석 시작")
+        Returns:
+            StockResponse: 분석 결과
+        """
+        # 2단계: 캐시된 분석 결과 확인 (hard TTL 이내의 최신 행)
+        if use_cache and self.cache_enabled:
+            with span("db_cache_lookup"):
+                cached_result = await self._get_cached_analysis(stock_symbol, self.cache_stale_hours)
+            CACHE_EVENTS.inc(
+                cache="analysis_db",
+                result="miss" if cached_result is None else ("stale" if cached_result.stale else "hit"),
+            )
+            if cached_result and not cached_result.stale:
+                logger.info("[CACHE HIT] %s (%s) - 캐시된 결과 반환", stock_symbol, company_name)
+                await self._emit(on_event, "cache_hit", {"symbol": stock_symbol, "tier": "database"})
+                return cached_result
+            elif cached_result:
+                # stale-while-revalidate: 기존 결과 즉시 반환 + 백그라운드 갱신
+                logger.info("[CACHE STALE] %s (%s) - 기존 결과 반환 후 백그라운드 갱신", stock_symbol, company_name)
+                await self._emit(
+                    on_event, "cache_hit", {"symbol": stock_symbol, "tier": "database", "stale": True}
+                )
+                self._schedule_refresh(stock_symbol, company_name, use_mcp)
+                return cached_result
+            else:
+                logger.info("[CACHE MISS] %s (%s) - 새로 분석 시작", stock_symbol, company_name)
+                await self._emit(on_event, "cache_miss", {"symbol": stock_symbol})
+
+        # 3~6단계: 분석 실행 (실패 시 가장 최근 캐시로 대체)
+        return await self._produce_with_fallback(
+            stock_symbol, company_name, use_mcp, use_cache, on_event, deadline=deadline
+        )
+
+    async def _produce_with_fallback(
+        self,
+        stock_symbol: str,
+        company_name: str,
+        use_mcp: bool,
+        use_cache: bool,
+        on_event: Optional[EventCallback] = None,
+        reuse_max_age_hours: Optional[float] = None,
+        deadline: Optional[Deadline] = None,
+    ) -> StockResponse:
+        """분석 실행 - 실패하면 stale_if_error_hours 이내의 가장 최근 캐시를 stale로 표시하여 반환"""
+        try:
+            return await self._produce_analysis(
+                stock_symbol, company_name, use_mcp, use_cache, on_event,
+                reuse_max_age_hours=reuse_max_age_hours, deadline=deadline,
+            )
+        except Exception as e:
+            if not (use_cache and self.cache_enabled):
+                raise
+            fallback = await self._get_cached_analysis(stock_symbol, self.stale_if_error_hours)
+            if fallback is None:
+                raise
+            # stale-if-error: 업스트림 장애(서킷 열림 포함) 시 오래된 결과라도 표시하여 반환
+            logger.warning("[CACHE STALE-IF-ERROR] %s - 분석 실패, 기존 결과 반환: %s", stock_symbol, e)
+            await self._emit(on_event, "stale_if_error", {"symbol": stock_symbol, "detail": str(e)})
+            return fallback.model_copy(update={"stale": True})
+
+    async def _produce_analysis(
+        self,
+        stock_symbol: str,
+        company_name: str,
+        use_mcp: bool,
+        use_cache: bool,
+        on_event: Optional[EventCallback] = None,
+        reuse_max_age_hours: Optional[float] = None,
+        deadline: Optional[Deadline] = None,
+    ) -> StockResponse:
+        """
+        분석 실행 - 워커 간 코디네이션이 켜져 있으면 심볼당 한 워커만 실행
 
-            # 3단계: MCP 초기화
-            if use_mcp:
-                await self._ensure_mcp_initialized()
+        reuse_max_age_hours: 다른 워커가 저장한 결과를 재사용할 최대 나이 (기본: cache_hours)
+        deadline: 요청 마감 시각 (백그라운드 갱신은 None)
+        """
+        if use_cache and self.cache_enabled and self.coordinator:
+            return await self.coordinator.run(
+                stock_symbol,
+                read_cached=lambda: self._get_cached_analysis(stock_symbol, reuse_max_age_hours),
+                produce=lambda: self._run_analysis(
+                    stock_symbol, company_name, use_mcp, use_cache, on_event, deadline
+                ),
+                deadline=deadline,
+            )
+        return await self._run_analysis(stock_symbol, company_name, use_mcp, use_cache, on_event, deadline)
 
-            # 4단계: 주식 종합 분석 (AI 호출)
-            if use_mcp and self.agent.mcp_tools:
-                analysis_text = await self.agent.analyze_stock_with_mcp(stock_symbol, company_name)
-            else:
-                analysis_text = self.agent.analyze_stock(stock_symbol, company_name)
-
-            print(f"\n{'='*80}")
-            print(f"[DEBUG] AI 전체 응답:")
-            print(f"{'='*80}")
-            print(analysis_text)
-            print(f"{'='*80}\n")
-
-            # 5단계: 응답 파싱
-            short_term = self._parse_recommendation_detail(analysis_text, "단기")
-            mid_term = self._parse_recommendation_detail(analysis_text, "중기")
-            long_term = self._parse_recommendation_detail(analysis_text, "장기")
-            analysis_detail = self._parse_analysis(analysis_text)
-
-            print(f"[DEBUG] Parsed short_term: {short_term}")
-            print(f"[DEBUG] Parsed mid_term: {mid_term}")
-            print(f"[DEBUG] Parsed long_term: {long_term}")
-
-            response = StockResponse(
-                symbol=stock_symbol,
-                company_name=company_name,
-                short_term=short_term,
-                mid_term=mid_term,
-                long_term=long_term,
-                analysis=analysis_detail
+    async def refresh_analysis(
+        self, stock_symbol: str, company_name: str, reuse_max_age_hours: Optional[float] = None
+    ):
+        """
+        캐시 유효 여부와 관계없이 분석 갱신 (사전 분석 스케줄러용)
+
+        같은 심볼의 백그라운드 갱신이 진행 중이면 그 작업을 기다리고,
+        요청 경로의 분석이 진행 중이면 같은 단일 비행 키로 합쳐집니다.
+        """
+        await self._schedule_refresh(stock_symbol, company_name, True, reuse_max_age_hours)
+
+    def _schedule_refresh(
+        self,
+        stock_symbol: str,
+        company_name: str,
+        use_mcp: bool,
+        reuse_max_age_hours: Optional[float] = None,
+    ) -> asyncio.Task:
+        """백그라운드 갱신 예약 (심볼당 하나만 실행, 진행 중이면 기존 작업 반환)"""
+        task = self._refresh_tasks.get(stock_symbol)
+        if task and not task.done():
+            return task
+        task = asyncio.create_task(
+            self._refresh_analysis(stock_symbol, company_name, use_mcp, reuse_max_age_hours)
+        )
+        self._refresh_tasks[stock_symbol] = task
+        return task
+
+    async def _refresh_analysis(
+        self,
+        stock_symbol: str,
+        company_name: str,
+        use_mcp: bool,
+        reuse_max_age_hours: Optional[float] = None,
+    ):
+        """
+        백그라운드 분석 갱신 (실패해도 기존 캐시는 유지)
+
+        analyze_stock_async와 같은 단일 비행 키로 실행하여, 갱신 중 들어온 캐시 미스 요청은
+        갱신 결과를 함께 기다리고 진행 중인 요청 분석이 있으면 그 결과를 재사용합니다.
+        """
+        key = (stock_symbol, use_mcp, True)
+
+        def produce():
+            return self._produce_with_fallback(
+                stock_symbol, company_name, use_mcp, use_cache=True, reuse_max_age_hours=reuse_max_age_hours
             )
 
-            # 6단계: 분석 결과 캐시 저장
-            if use_cache and self.cache_enabled:
-                repo.save_analysis(response)
-                print(f"[CACHE SAVE] {stock_symbol} 분석 결과 저장 완료")
+        try:
+            if self._analysis_flight.in_flight(key):
+                # 합류한 분석이 기존 캐시를 반환한 경우(갱신을 예약한 요청 자신 등)에는 끝난 뒤 다시 실행
+                result = await self._analysis_flight.do(key, produce)
+                if self._is_fresh(result, reuse_max_age_hours):
+                    logger.info("[CACHE REFRESH] %s 진행 중인 분석 결과로 갱신 완료", stock_symbol)
+                    return
+            result = await self._analysis_flight.do(key, produce)
+            if result.stale:
+                logger.warning("[CACHE REFRESH] %s 백그라운드 갱신 실패, 기존 캐시 유지", stock_symbol)
+            else:
+                logger.info("[CACHE REFRESH] %s 백그라운드 갱신 완료", stock_symbol)
+        except Exception as e:
+            logger.warning("[CACHE REFRESH] %s 백그라운드 갱신 실패: %s", stock_symbol, e)
+        finally:
+            self._refresh_tasks.pop(stock_symbol, None)
+
+    def _is_fresh(self, result: StockResponse, max_age_hours: Optional[float] = None) -> bool:
+        """결과가 max_age_hours(기본: cache_hours) 이내에 분석된 최신 결과인지"""
+        if result.stale or result.updated_at is None:
+            return False
+        max_age = timedelta(hours=self.cache_hours if max_age_hours is None else max_age_hours)
+        return datetime.utcnow() - result.updated_at <= max_age
+
+    @staticmethod
+    async def _emit(on_event: Optional[EventCallback], event: str, data: Dict[str, Any]):
+        """진행 이벤트 전달 (콜백 오류는 분석에 영향을 주지 않음)"""
+        if on_event is None:
+            return
+        try:
+            await on_event(event, data)
+        except Exception as e:
+            logger.warning("[EVENT] 이벤트 전달 실패 (%s): %s", event, e)
+
+    async def get_analysis_version(
+        self, company: str, deadline: Optional[Deadline] = None
+    ) -> Optional[Tuple[str, datetime]]:
+        """
+        조건부 요청(If-None-Match / If-Modified-Since) 확인용 최신 분석 시각 조회
 
-            return response
+        분석 본문은 읽지 않고 L1 → stock_analysis_current PK 조회(updated_at만)로 확인합니다.
+
+        Args:
+            company: 기업명 또는 심볼
+            deadline: 요청 마감 시각 (심볼 변환 AI 호출 제한 시간)
 
-    def _get_stock_info_with_cache(self, company: str, repo: StockRepository) -> tuple[str, str]:
+        Returns:
+            (심볼, updated_at) 튜플 - 캐시를 쓰지 않거나 유효 시간 이내의 분석이 없으면 None
+        """
+        if not self.cache_enabled:
+            return None
+        stock_symbol, _ = await self._get_stock_info_with_cache(company, deadline)
+
+        l1_result = self.analysis_l1.get(stock_symbol)
+        if l1_result and l1_result.updated_at:
+            return stock_symbol, l1_result.updated_at
+
+        times = await self._run_db(lambda repo: repo.get_latest_analysis_times([stock_symbol]))
+        updated_at = times.get(stock_symbol)
+        if updated_at is None or self.remaining_ttl(updated_at) <= 0:
+            return None
+        return stock_symbol, updated_at
+
+    def remaining_ttl(self, updated_at: datetime) -> float:
+        """분석 결과의 남은 유효 시간 (초, cache_hours 기준)"""
+        return self.cache_hours * 3600 - (datetime.utcnow() - updated_at).total_seconds()
+
+    async def _get_cached_analysis(
+        self, stock_symbol: str, max_age_hours: Optional[float] = None
+    ) -> Optional[StockResponse]:
+        """
+        DB(L2)에서 캐시된 분석 조회 (stock_analysis_current 기본 키 조회)
+
+        유효 시간(cache_hours) 이내의 결과는 남은 시간만큼 L1에 적재하고,
+        그보다 오래된 결과는 stale=True로 표시하여 반환합니다.
+
+        Args:
+            stock_symbol: 주식 심볼
+            max_age_hours: 조회할 최대 캐시 나이 (기본: cache_hours)
+        """
+        if max_age_hours is None:
+            max_age_hours = self.cache_hours
+        cached = await self._run_db(
+            lambda repo: repo.get_cached_analysis_with_timestamp(stock_symbol, max_age_hours)
+        )
+        if not cached:
+            return None
+
+        response, updated_at = cached
+        remaining_seconds = self.remaining_ttl(updated_at)
+        if remaining_seconds <= 0:
+            return response.model_copy(update={"stale": True})
+
+        self.analysis_l1.set(stock_symbol, response, remaining_seconds)
+        return response
+
+    async def _run_analysis(
+        self,
+        stock_symbol: str,
+        company_name: str,
+        use_mcp: bool,
+        use_cache: bool,
+        on_event: Optional[EventCallback] = None,
+        deadline: Optional[Deadline] = None,
+    ) -> StockResponse:
+        """AI 분석 실행 및 결과 캐시 저장 (캐시 확인 없이)"""
+        # 3단계: MCP 초기화
+        if use_mcp:
+            await self._ensure_mcp_initialized()
+
+        # 4단계: 주식 종합 분석 (AI 호출)
+        if on_event:
+            on_event = functools.partial(self._emit, on_event)
+        with span("analysis"):
+            if use_mcp and self.agent.mcp_tools:
+                analysis_text = await self.agent.analyze_stock_with_mcp(
+                    stock_symbol, company_name, on_event, deadline
+                )
+            else:
+                analysis_text = await self.agent.analyze_stock(stock_symbol, company_name, on_event, deadline)
+
+        # 전체 응답은 LOG_PAYLOAD_SAMPLE_RATE 비율로만 기록 (요청 경로에서 대용량 stdout 쓰기 방지)
+        log_payload(logger, "[ANALYSIS] AI 전체 응답", analysis_text, symbol=stock_symbol)
+
+        # 5단계: 응답 파싱 (구조화 출력 검증 → 실패 시 마크다운 파서)
+        with span("parse"):
+            structured = self._parse_structured_analysis(analysis_text)
+            if structured:
+                short_term, mid_term, long_term = structured.short_term, structured.mid_term, structured.long_term
+                analysis_detail = structured.analysis
+            else:
+                short_term = self._parse_recommendation_detail(analysis_text, "단기")
+                mid_term = self._parse_recommendation_detail(analysis_text, "중기")
+                long_term = self._parse_recommendation_detail(analysis_text, "장기")
+                analysis_detail = self._parse_analysis(analysis_text)
+
+        logger.debug(
+            "[PARSE] %s short=%s mid=%s long=%s (structured=%s)",
+            stock_symbol, short_term.action, mid_term.action, long_term.action, structured is not None,
+        )
+
+        response = StockResponse(
+            symbol=stock_symbol,
+            company_name=company_name,
+            short_term=short_term,
+            mid_term=mid_term,
+            long_term=long_term,
+            analysis=analysis_detail,
+            updated_at=datetime.utcnow(),
+        )
+
+        # 6단계: 분석 결과 캐시 저장
+        if use_cache and self.cache_enabled:
+            with span("db_save"):
+                await self._run_db(lambda repo: repo.save_analysis(response))
+            self.analysis_l1.set(stock_symbol, response)
+            logger.info("[CACHE SAVE] %s 분석 결과 저장 완료", stock_symbol)
+
+        return response
+
+    async def _get_stock_info_with_cache(
+        self, company: str, deadline: Optional[Deadline] = None
+    ) -> tuple[str, str]:
         """
-        캐시를 활용한 심볼 변환
+        캐시를 활용한 심볼 변환 (정규화 키가 같은 입력의 동시 요청은 하나로 합침)
 
         Args:
             company: 사용자 입력
-            repo: StockRepository 인스턴스
+            deadline: 요청 마감 시각 (AI 변환 호출 제한 시간)
 
         Returns:
             (심볼, 정식 기업명) 튜플
         """
+        query_key = normalize_query(company)
+        l1_mapping = self.symbol_l1.get(query_key)
+        if l1_mapping:
+            CACHE_EVENTS.inc(cache="symbol_l1", result="hit")
+            return l1_mapping
+        CACHE_EVENTS.inc(cache="symbol_l1", result="miss")
+
+        stock_info = await self._symbol_flight.do(query_key, lambda: self._resolve_stock_info(company, deadline))
+        self.symbol_l1.set(query_key, stock_info)
+        return stock_info
+
+    async def _resolve_stock_info(self, company: str, deadline: Optional[Deadline] = None) -> tuple[str, str]:
+        """로컬 종목 데이터 → 심볼 매핑 캐시 순으로 조회 후 없으면 AI로 변환하여 저장"""
+        local_mapping = self._resolve_locally(company)
+        if local_mapping:
+            return local_mapping
+
         # 캐시 확인
-        cached_mapping = repo.get_symbol_mapping(company)
+        cached_mapping = await self._run_db(lambda repo: repo.get_symbol_mapping(company))
         if cached_mapping:
-            print(f"[SYMBOL CACHE HIT] {company} → {cached_mapping[0]}")
+            logger.info("[SYMBOL CACHE HIT] %s → %s", company, cached_mapping[0])
+            CACHE_EVENTS.inc(cache="symbol_db", result="hit")
             return cached_mapping
+        CACHE_EVENTS.inc(cache="symbol_db", result="miss")
 
         # AI로 변환
-        print(f"[SYMBOL CACHE MISS] {company} - AI로 변환 중...")
-        stock_symbol, company_name = self.agent.get_stock_info(company)
+        logger.info("[SYMBOL CACHE MISS] %s - AI로 변환 중...", company)
+        stock_symbol, company_name = await self.agent.get_stock_info(company, deadline)
 
         # 캐시 저장
-        repo.save_symbol_mapping(company, stock_symbol, company_name)
-        print(f"[SYMBOL CACHE SAVE] {company} → {stock_symbol} 저장 완료")
+        await self._run_db(
+            lambda repo: repo.save_symbol_mapping(company, stock_symbol, company_name)
+        )
+        logger.info("[SYMBOL CACHE SAVE] %s → %s 저장 완료", company, stock_symbol)
 
         return (stock_symbol, company_name)
 
+    def _resolve_locally(self, company: str) -> Optional[Tuple[str, str]]:
+        """번들 종목 데이터로 심볼 변환 (없거나 모호하면 None)"""
+        if self.symbol_resolver is None:
+            return None
+        mapping = self.symbol_resolver.resolve(company)
+        if mapping:
+            logger.info("[SYMBOL LOCAL HIT] %s → %s", company, mapping[0])
+        CACHE_EVENTS.inc(cache="symbol_local", result="hit" if mapping else "miss")
+        return mapping
+
+    async def analyze_batch_async(
+        self, companies: List[str], use_mcp: bool = True, deadline_seconds: Optional[float] = None
+    ) -> AsyncIterator[Tuple[str, Union[StockResponse, Exception]]]:
+        """
+        여러 종목을 일괄 분석하여 완료되는 순서대로 반환 (비동기 제너레이터)
+
+        심볼 매핑과 캐시 분석은 각각 한 번의 IN 쿼리로 조회하고,
+        캐시 미스 종목만 batch_concurrency 한도 안에서 동시에 분석합니다.
+
+        Args:
+            companies: 기업명 또는 심볼 목록
+            use_mcp: MCP를 사용하여 최신 정보 검색 여부
+            deadline_seconds: 종목별 분석 시간 예산 (동시성 슬롯을 얻은 시점부터 계산, 없으면 제한 없음)
+
+        Yields:
+            (입력 기업명, StockResponse 또는 발생한 예외) 튜플
+        """
+        pending = list(dict.fromkeys(company for company in companies if company.strip()))
+
+        # 1단계: 심볼 매핑 일괄 조회 (L1 → 로컬 종목 데이터 → DB IN 쿼리)
+        resolved: Dict[str, Tuple[str, str]] = {}
+        for company in pending:
+            mapping = self.symbol_l1.get(normalize_query(company)) or self._resolve_locally(company)
+            if mapping:
+                self.symbol_l1.set(normalize_query(company), mapping)
+                resolved[company] = mapping
+        unresolved = [company for company in pending if company not in resolved]
+        if unresolved:
+            db_mappings = await self._run_db(lambda repo: repo.get_symbol_mappings(unresolved))
+            for company, mapping in db_mappings.items():
+                self.symbol_l1.set(normalize_query(company), mapping)
+            resolved.update(db_mappings)
+
+        # 2단계: 캐시된 분석 일괄 조회 (L1 → DB 단일 쿼리)
+        misses: List[str] = [company for company in pending if company not in resolved]
+        db_lookup: Dict[str, List[str]] = {}
+        for company, (stock_symbol, _) in resolved.items():
+            l1_result = self.analysis_l1.get(stock_symbol)
+            CACHE_EVENTS.inc(cache="analysis_l1", result="hit" if l1_result else "miss")
+            if l1_result:
+                self.prewarm.record_access(stock_symbol, l1_result.company_name)
+                yield company, l1_result
+            else:
+                db_lookup.setdefault(stock_symbol, []).append(company)
+
+        if db_lookup:
+            with span("db_cache_lookup"):
+                cached = await self._run_db(
+                    lambda repo: repo.get_cached_analyses(list(db_lookup), self.cache_hours)
+                )
+            for stock_symbol, batch_companies in db_lookup.items():
+                CACHE_EVENTS.inc(cache="analysis_db", result="hit" if stock_symbol in cached else "miss")
+                if stock_symbol not in cached:
+                    misses.extend(batch_companies)
+                    continue
+                response, updated_at = cached[stock_symbol]
+                age_seconds = (datetime.utcnow() - updated_at).total_seconds()
+                self.analysis_l1.set(stock_symbol, response, self.cache_hours * 3600 - age_seconds)
+                for company in batch_companies:
+                    self.prewarm.record_access(stock_symbol, response.company_name)
+                    yield company, response
+
+        logger.info("[BATCH] 요청 %d건 - 캐시 적중 %d건, 분석 %d건", len(pending), len(pending) - len(misses), len(misses))
+
+        # 3단계: 캐시 미스만 동시 분석 (심볼/입력 단위 중복은 SingleFlight가 합침)
+        semaphore = asyncio.Semaphore(max(1, self.batch_concurrency))
+
+        async def _analyze(company: str) -> Tuple[str, Union[StockResponse, Exception]]:
+            async with semaphore:
+                deadline = Deadline.after(deadline_seconds) if deadline_seconds else None
+                try:
+                    return company, await self.analyze_stock_async(company, use_mcp=use_mcp, deadline=deadline)
+                except Exception as e:
+                    logger.warning("[BATCH] %s 분석 실패: %s", company, e)
+                    return company, e
+
+        tasks = [asyncio.create_task(_analyze(company)) for company in misses]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                yield await next_done
+        finally:
+            for task in tasks:
+                task.cancel()
+
     def analyze_stock(self, company: str, use_mcp: bool = True, use_cache: bool = True) -> StockResponse:
         """
         주식을 종합 분석하고 투자 의견을 제공 (동기 래퍼)
 
+        스크립트 등 이벤트 루프 밖에서 사용하기 위한 래퍼입니다.
+        FastAPI 라우터에서는 analyze_stock_async를 직접 await 하세요.
+
         Args:
             company: 기업명 또는 심볼 (예: "테슬라", "TSLA")
             use_mcp: MCP를 사용하여 최신 정보 검색 여부
@@ -131,6 +621,40 @@ class StockService:
         # 비동기 함수를 동기적으로 실행
         return asyncio.run(self.analyze_stock_async(company, use_mcp, use_cache))
 
+    def cache_stats(self) -> dict:
+        """캐시 통계 (심볼 매핑 / 분석 결과 L1, MCP 도구 결과, OpenAI 프롬프트 캐시)"""
+        return {
+            "symbol_mapping": self.symbol_l1.stats(),
+            "analysis": self.analysis_l1.stats(),
+            "tool_result": self.agent.tool_cache.stats(),
+            "prompt_cache": self.agent.prompt_cache.stats(),
+        }
+
+    def _parse_structured_analysis(self, text: str) -> Optional[StockAnalysisResult]:
+        """
+        구조화 출력(JSON) 응답을 한 번에 검증
+
+        Args:
+            text: AI 응답 텍스트
+
+        Returns:
+            StockAnalysisResult (JSON이 아니거나 스키마와 맞지 않으면 None → 마크다운 파서 사용)
+        """
+        if not text or not text.lstrip().startswith("{"):
+            return None
+        try:
+            result = StockAnalysisResult.model_validate_json(text)
+        except ValidationError as e:
+            logger.warning("[PARSE] 구조화 출력 검증 실패, 마크다운 파서로 대체: %d개 오류", e.error_count())
+            return None
+
+        for detail in (result.short_term, result.mid_term, result.long_term):
+            detail.action = detail.action.strip().upper()
+            if detail.action not in ("BUY", "SELL", "HOLD"):
+                logger.warning("[PARSE] 알 수 없는 투자 의견 '%s', HOLD로 대체", detail.action)
+                detail.action = "HOLD"
+        return result
+
     def _parse_recommendation_detail(self, text: str, term: str) -> RecommendationDetail:
         """
         특정 기간(단기/중기/장기)의 투자 의견과 이유를 파싱
@@ -0,0 +1,173 @@
+import csv
+import difflib
+import logging
+import os
+import re
+from pathlib import Path
+from typing import Dict, List, Optional, Set, Tuple
+
+from utils import normalize_query
+
+logger = logging.getLogger(__name__)
+
+# 기본 종목 데이터 (미국 + KRX 코스피 .KS / 코스닥 .KQ)
+DEFAULT_SYMBOLS_PATH = Path(__file__).resolve().parent.parent / "config" / "stock_symbols.csv"
+
+# 티커 형태 입력 (GOOG, BRK-A, 005935, 005935.KS) - 한 글자 차이가 다른 종목이므로 퍼지 일치 제외
+_TICKER_SHAPED = re.compile(r"^(?:[A-Za-z]{1,5}(?:[.\-][A-Za-z]{1,2})?|\d{6}(?:\.[A-Za-z]{2})?)$")
+
+# 주식 종류 접미어 (우선주 / 클래스) - "삼성전자우", "alphabet class c"는 보통주와 다른 종목
+_SHARE_CLASS_SUFFIX = re.compile(r"\d?우b?|우선주|pref|preferred|class[a-z]|[a-z]")
+
+
+def _normalize(text: str) -> str:
+    """매칭용 키 정규화 (normalize_query + 공백 제거: "삼성 전자" == "삼성전자")"""
+    return normalize_query(text).replace(" ", "")
+
+
+class LocalSymbolResolver:
+    """
+    LLM 호출 전에 사용하는 로컬 심볼 변환기
+
+    번들된 종목 데이터(심볼, 정식 기업명, 한글/영문 별칭)를 메모리에 색인하여
+    정확 일치 → 정규화 일치 → 퍼지(difflib) 일치 순으로 조회합니다.
+    일치하는 종목이 없거나 후보가 여러 개(모호)이면 None을 반환하여 LLM으로 넘깁니다.
+    """
+
+    def __init__(
+        self,
+        entries: List[Tuple[str, str, List[str]]],
+        fuzzy_cutoff: float = 0.85,
+        ambiguity_margin: float = 0.05,
+    ):
+        self.fuzzy_cutoff = fuzzy_cutoff
+        self.ambiguity_margin = ambiguity_margin  # 1, 2위 후보 점수 차가 이보다 작으면 모호
+        self._names: Dict[str, str] = {}  # 심볼 → 정식 기업명
+        self._exact: Dict[str, Set[str]] = {}  # 원문 별칭 → 심볼 집합
+        self._normalized: Dict[str, Set[str]] = {}  # 정규화 별칭 → 심볼 집합
+
+        for symbol, company_name, aliases in entries:
+            self._names[symbol] = company_name
+            keys = {symbol, company_name, *aliases}
+            if symbol.endswith((".KS", ".KQ")):
+                keys.add(symbol.split(".")[0])  # 6자리 종목코드만 입력한 경우
+            for key in keys:
+                self._exact.setdefault(key.strip(), set()).add(symbol)
+                self._normalized.setdefault(_normalize(key), set()).add(symbol)
+
+        self._fuzzy_keys = [key for key in self._normalized if len(key) >= 2]
+
+    @classmethod
+    def from_csv(cls, path: Path = DEFAULT_SYMBOLS_PATH) -> "LocalSymbolResolver":
+        """CSV(symbol, company_name, aliases: '|' 구분)에서 생성"""
+        entries = []
+        with open(path, encoding="utf-8", newline="") as f:
+            for row in csv.DictReader(f):
+                aliases = [alias.strip() for alias in row.get("aliases", "").split("|") if alias.strip()]
+                entries.append((row["symbol"].strip(), row["company_name"].strip(), aliases))
+        return cls(entries)
+
+    @classmethod
+    def from_env(cls) -> Optional["LocalSymbolResolver"]:
+        """
+        LOCAL_SYMBOL_RESOLVER / LOCAL_SYMBOLS_PATH 환경 변수로 생성
+
+        비활성화되었거나 데이터 파일을 읽지 못하면 None (LLM만 사용)
+        """
+        if os.getenv("LOCAL_SYMBOL_RESOLVER", "true").lower() not in ("1", "true", "yes"):
+            return None
+        path = Path(os.getenv("LOCAL_SYMBOLS_PATH", str(DEFAULT_SYMBOLS_PATH)))
+        try:
+            resolver = cls.from_csv(path)
+        except (OSError, KeyError, csv.Error) as e:
+            logger.warning("[SYMBOL LOCAL] 종목 데이터 로드 실패, LLM만 사용: %s", e)
+            return None
+        logger.info("[SYMBOL LOCAL] 종목 %d개 로드 (%s)", len(resolver), path.name)
+        return resolver
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+    def resolve(self, query: str) -> Optional[Tuple[str, str]]:
+        """
+        사용자 입력을 (심볼, 정식 기업명)으로 변환
+
+        Args:
+            query: 기업명 또는 심볼 (예: "테슬라", "tsla", "005930")
+
+        Returns:
+            (심볼, 정식 기업명) 튜플 (찾지 못했거나 모호하면 None)
+        """
+        query = query.strip()
+        if not query:
+            return None
+
+        # 1) 정확 일치 (대소문자 구분 없이 심볼 입력 포함)
+        symbols = self._exact.get(query) or self._exact.get(query.upper())
+        if symbols:
+            return self._unique(symbols)
+
+        # 2) 정규화 일치
+        normalized = _normalize(query)
+        symbols = self._normalized.get(normalized)
+        if symbols:
+            return self._unique(symbols)
+
+        # 3) 퍼지 일치 (짧은 입력, 티커 형태, 알려진 종목 + 주식 종류 접미어는 다른 종목일 수 있으므로 제외)
+        if len(normalized) < 3 or _TICKER_SHAPED.match(query) or self._is_share_class_variant(normalized):
+            return None
+        # 여러 종목 별칭에 공통으로 들어가는 입력은 모호 (예: "SK바이오" → SK바이오팜 / SK바이오사이언스)
+        if self._is_shared_fragment(normalized):
+            return None
+        return self._fuzzy(normalized)
+
+    def _is_shared_fragment(self, normalized: str) -> bool:
+        """입력이 둘 이상 종목의 별칭 일부(접두어/부분 문자열)인지 (보통주의 우선주/클래스 별칭은 같은 종목으로 봄)"""
+        symbols: Set[str] = set()
+        for key, key_symbols in self._normalized.items():
+            if normalized in key and not self._is_share_class_variant(key):
+                symbols |= key_symbols
+                if len(symbols) > 1:
+                    return True
+        return False
+
+    def _is_share_class_variant(self, normalized: str) -> bool:
+        """알려진 별칭 + 우선주/클래스 접미어인지 (예: "삼성전자우", "samsungelectronicspref")"""
+        return any(
+            normalized[:index] in self._normalized and _SHARE_CLASS_SUFFIX.fullmatch(normalized[index:])
+            for index in range(1, len(normalized))
+        )
+
+    def _unique(self, symbols: Set[str]) -> Optional[Tuple[str, str]]:
+        """후보가 하나일 때만 결과 반환"""
+        if len(symbols) != 1:
+            return None
+        symbol = next(iter(symbols))
+        return symbol, self._names[symbol]
+
+    def _fuzzy(self, normalized: str) -> Optional[Tuple[str, str]]:
+        """
+        가장 비슷한 별칭의 종목 (2위 종목과 점수 차가 충분할 때만)
+
+        2위 후보는 기준 점수(fuzzy_cutoff)보다 ambiguity_margin만큼 낮은 별칭까지 포함해 비교합니다.
+        """
+        best: Dict[str, float] = {}
+        matcher = difflib.SequenceMatcher(b=normalized)
+        candidates = difflib.get_close_matches(
+            normalized, self._fuzzy_keys, n=10, cutoff=max(0.0, self.fuzzy_cutoff - self.ambiguity_margin)
+        )
+        for key in candidates:
+            matcher.set_seq1(key)
+            score = matcher.ratio()
+            for symbol in self._normalized[key]:
+                best[symbol] = max(best.get(symbol, 0.0), score)
+
+        if not best:
+            return None
+        ranked = sorted(best.items(), key=lambda item: item[1], reverse=True)
+        if ranked[0][1] < self.fuzzy_cutoff:
+            return None
+        if len(ranked) > 1 and ranked[0][1] - ranked[1][1] < self.ambiguity_margin:
+            return None
+        symbol = ranked[0][0]
+        return symbol, self._names[symbol]
@@ -0,0 +1,49 @@
+import unittest
+from datetime import datetime, timedelta
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from database import Base, StockAccessStats, StockRepository
+
+
+class AccessCountUpsertTest(unittest.TestCase):
+    def setUp(self):
+        engine = create_engine("sqlite://")
+        Base.metadata.create_all(engine)
+        self.db = sessionmaker(bind=engine)()
+        self.repo = StockRepository(self.db)
+
+    def tearDown(self):
+        self.db.close()
+
+    def stats(self, symbol: str) -> StockAccessStats:
+        self.db.expire_all()
+        return self.db.get(StockAccessStats, symbol)
+
+    def test_counts_accumulate_without_select(self):
+        self.repo.record_access_counts({"TSLA": ("Tesla", 3), "AAPL": ("Apple", 1)})
+        self.repo.record_access_counts({"TSLA": ("Tesla, Inc.", 2)})
+
+        tsla = self.stats("TSLA")
+        self.assertEqual(tsla.access_count, 5)
+        self.assertAlmostEqual(tsla.score, 5.0, places=3)
+        self.assertEqual(tsla.company_name, "Tesla, Inc.")
+        self.assertEqual(self.stats("AAPL").access_count, 1)
+
+    def test_score_decays_by_half_life(self):
+        self.repo.record_access_counts({"AAPL": ("Apple", 4)})
+        self.db.query(StockAccessStats).update(
+            {"last_accessed_at": datetime.utcnow() - timedelta(hours=24)}, synchronize_session=False
+        )
+        self.db.commit()
+
+        self.repo.record_access_counts({"AAPL": ("Apple", 1)}, half_life_hours=24.0)
+
+        aapl = self.stats("AAPL")
+        self.assertAlmostEqual(aapl.score, 3.0, places=3)  # 4 * 0.5 + 1
+        self.assertEqual(aapl.access_count, 5)
+
+
+if __name__ == "__main__":
+    unittest.main()
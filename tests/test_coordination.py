@@ -0,0 +1,43 @@
+import asyncio
+import threading
+import unittest
+from unittest import mock
+
+from database import coordination
+from database.coordination import AnalysisCoordinator
+
+
+class LockAcquireCancellationTest(unittest.IsolatedAsyncioTestCase):
+    async def test_lock_acquired_after_cancel_is_released(self):
+        entered, proceed = threading.Event(), threading.Event()
+        released = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        lock_conn = object()
+
+        def slow_try_lock(engine, key):
+            entered.set()
+            proceed.wait(5)
+            return lock_conn
+
+        def record_release(conn, key):
+            self.assertIs(conn, lock_conn)
+            loop.call_soon_threadsafe(released.set)
+
+        coordinator = AnalysisCoordinator(mock.Mock())
+        produce = mock.AsyncMock()
+        with mock.patch.object(coordination, "try_advisory_lock", slow_try_lock), \
+                mock.patch.object(coordination, "release_advisory_lock", record_release):
+            task = asyncio.create_task(coordinator.run("TSLA", mock.AsyncMock(return_value=None), produce))
+            await asyncio.to_thread(entered.wait, 5)
+            task.cancel()
+            with self.assertRaises(asyncio.CancelledError):
+                await task
+
+            proceed.set()  # 요청이 취소된 뒤에 락 획득 완료
+            await asyncio.wait_for(released.wait(), 5)
+
+        produce.assert_not_awaited()
+
+
+if __name__ == "__main__":
+    unittest.main()
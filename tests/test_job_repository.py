@@ -0,0 +1,50 @@
+import unittest
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from database import Base, StockRepository
+from models.stock import RecommendationDetail, StockResponse
+
+
+def _response(symbol: str) -> StockResponse:
+    hold = RecommendationDetail(action="HOLD", reason="-")
+    return StockResponse(
+        symbol=symbol, company_name=symbol, short_term=hold, mid_term=hold, long_term=hold, analysis="-"
+    )
+
+
+class JobAttemptGuardTest(unittest.TestCase):
+    def setUp(self):
+        engine = create_engine("sqlite://")
+        Base.metadata.create_all(engine)
+        self.db = sessionmaker(bind=engine)()
+        self.repo = StockRepository(self.db)
+        self.repo.submit_job("job-1", "테슬라", "tsla")
+
+    def tearDown(self):
+        self.db.close()
+
+    def test_stale_attempt_cannot_overwrite_newer_attempt(self):
+        _, _, first = self.repo.claim_next_job(lease_seconds=0, max_attempts=3)
+        # 임대 만료 → 다른 워커가 다시 가져감
+        _, _, second = self.repo.claim_next_job(lease_seconds=0, max_attempts=3)
+        self.assertEqual((first, second), (1, 2))
+
+        self.assertFalse(self.repo.fail_job("job-1", first, "Error: timeout"))
+        self.assertFalse(self.repo.complete_job("job-1", first, _response("OLD")))
+        self.assertEqual(self.repo.get_job("job-1").status, "running")
+
+        self.assertTrue(self.repo.complete_job("job-1", second, _response("TSLA")))
+        job = self.repo.get_job("job-1")
+        self.assertEqual((job.status, job.symbol), ("succeeded", "TSLA"))
+
+    def test_finished_job_is_not_updated_again(self):
+        _, _, attempt = self.repo.claim_next_job(lease_seconds=60, max_attempts=3)
+        self.assertTrue(self.repo.complete_job("job-1", attempt, _response("TSLA")))
+        self.assertFalse(self.repo.fail_job("job-1", attempt, "Error: late failure"))
+        self.assertEqual(self.repo.get_job("job-1").status, "succeeded")
+
+
+if __name__ == "__main__":
+    unittest.main()
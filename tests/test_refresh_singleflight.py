@@ -0,0 +1,60 @@
+import asyncio
+import os
+import unittest
+from datetime import datetime, timedelta
+from unittest import mock
+
+os.environ.setdefault("OPENAI_API_KEY", "test")
+
+from models import RecommendationDetail, StockResponse
+from services.stock_service import StockService
+
+
+def _response(updated_at: datetime, stale: bool = False) -> StockResponse:
+    hold = RecommendationDetail(action="HOLD", reason="-")
+    return StockResponse(
+        symbol="TSLA", company_name="Tesla, Inc.", short_term=hold, mid_term=hold, long_term=hold,
+        analysis="-", updated_at=updated_at, stale=stale,
+    )
+
+
+class RefreshSingleFlightTest(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.service = StockService()
+        self.service.coordinator = None
+        self.service._get_stock_info_with_cache = mock.AsyncMock(return_value=("TSLA", "Tesla, Inc."))
+        self.runs = 0
+
+        async def run_analysis(*args, **kwargs):
+            self.runs += 1
+            await asyncio.sleep(0.05)
+            return _response(datetime.utcnow())
+
+        self.service._run_analysis = run_analysis
+
+    async def test_cache_miss_joins_refresh_in_progress(self):
+        self.service._get_cached_analysis = mock.AsyncMock(return_value=None)
+
+        refresh = asyncio.create_task(self.service.refresh_analysis("TSLA", "Tesla, Inc."))
+        await asyncio.sleep(0)
+        result = await self.service.analyze_stock_async("테슬라", use_mcp=True)
+        await refresh
+
+        self.assertFalse(result.stale)
+        self.assertEqual(self.runs, 1)
+
+    async def test_stale_hit_refresh_runs_once_after_request(self):
+        stale = _response(datetime.utcnow() - timedelta(hours=30), stale=True)
+        self.service._get_cached_analysis = mock.AsyncMock(return_value=stale)
+
+        result = await self.service.analyze_stock_async("테슬라", use_mcp=True)
+        self.assertTrue(result.stale)
+
+        refresh = self.service._refresh_tasks.get("TSLA")
+        self.assertIsNotNone(refresh)
+        await refresh
+        self.assertEqual(self.runs, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
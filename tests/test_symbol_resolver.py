@@ -0,0 +1,38 @@
+import unittest
+
+from services.symbol_resolver import LocalSymbolResolver
+
+
+class LocalSymbolResolverTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.resolver = LocalSymbolResolver.from_csv()
+
+    def symbol(self, query: str):
+        match = self.resolver.resolve(query)
+        return match[0] if match else None
+
+    def test_exact_aliases(self):
+        self.assertEqual(self.symbol("SK바이오팜"), "326030.KS")
+        self.assertEqual(self.symbol("SK바이오사이언스"), "302440.KS")
+        self.assertEqual(self.symbol("삼성전자"), "005930.KS")
+
+    def test_shared_prefix_is_ambiguous(self):
+        # 둘 이상 종목 별칭의 접두어는 어느 한쪽으로 확정하지 않음
+        self.assertIsNone(self.symbol("SK바이오"))
+        self.assertIsNone(self.symbol("sk 바이오"))
+        self.assertIsNone(self.symbol("samsung"))
+
+    def test_share_class_and_ticker_not_fuzzy(self):
+        self.assertEqual(self.symbol("삼성전자우"), "005935.KS")
+        self.assertEqual(self.symbol("GOOG"), "GOOG")
+        self.assertIsNone(self.symbol("SK하이닉스우"))
+
+    def test_fuzzy_typo(self):
+        self.assertEqual(self.symbol("microsfot"), "MSFT")
+        self.assertEqual(self.symbol("SK바이오사이언"), "302440.KS")
+        self.assertEqual(self.symbol("samsung electronic"), "005930.KS")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,113 @@
+import os
+import types
+import unittest
+
+os.environ.setdefault("OPENAI_API_KEY", "test")
+
+from mcp import StdioServerParameters
+from mcp.types import CallToolResult, TextContent
+from sqlalchemy import create_engine
+
+import database.connection as connection
+from agents import MCPResultCache, MCPSessionManager, MCPToolError, OpenAIAgent
+from database import Base, ToolResultCache
+
+# 요청 스레드(run_db)에서도 같은 DB를 보도록 공유 메모리 SQLite 사용
+_engine = create_engine(
+    "sqlite:///file:tool_cache_test?mode=memory&cache=shared&uri=true",
+    connect_args={"check_same_thread": False},
+)
+Base.metadata.create_all(_engine)
+connection.SessionLocal.configure(bind=_engine)
+
+
+class _FakeSession:
+    def __init__(self, *results: CallToolResult):
+        self.results = list(results)
+        self.calls = 0
+
+    async def call_tool(self, tool_name, arguments, read_timeout_seconds=None):
+        self.calls += 1
+        return self.results[min(self.calls, len(self.results)) - 1]
+
+
+def _result(text: str, is_error: bool = False) -> CallToolResult:
+    return CallToolResult(content=[TextContent(type="text", text=text)], isError=is_error)
+
+
+def _agent_with_results(*results: CallToolResult):
+    """도구 결과를 차례로 돌려주는 MCP 서버 풀 + DB 캐시를 켠 에이전트 (재시도 없음)"""
+    manager = MCPSessionManager("test", StdioServerParameters(command="true"), pool_size=1)
+    session = _FakeSession(*results)
+    manager.servers = [types.SimpleNamespace(name="test-0", healthy=True, in_flight=0, session=session)]
+    agent = OpenAIAgent()
+    agent.mcp = manager
+    agent.tool_cache = MCPResultCache(use_db=True)
+    agent.mcp_retry.max_attempts = 1
+    return agent, session
+
+
+def _stored_rows() -> int:
+    with connection.get_db() as db:
+        return db.query(ToolResultCache).count()
+
+
+class ToolErrorCacheTest(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        with connection.get_db() as db:
+            db.query(ToolResultCache).delete()
+
+    async def test_error_result_is_not_cached(self):
+        agent, session = _agent_with_results(_result("Rate limit exceeded", is_error=True))
+
+        result = await agent._call_mcp_tool("brave_web_search", {"query": "tsla earnings"})
+        again = await agent._call_mcp_tool("brave_web_search", {"query": "tsla earnings"})
+
+        self.assertEqual(result, "")
+        self.assertEqual(again, "")
+        self.assertEqual(session.calls, 2)  # 캐시되지 않았으므로 다시 호출
+        self.assertEqual(len(agent.tool_cache.memory), 0)
+        self.assertEqual(_stored_rows(), 0)
+
+    async def test_successful_result_is_cached(self):
+        agent, session = _agent_with_results(_result("Tesla reports record deliveries"))
+
+        result = await agent._call_mcp_tool("brave_web_search", {"query": "tsla news"})
+        again = await agent._call_mcp_tool("brave_web_search", {"query": "tsla news"})
+
+        self.assertEqual(result, "Tesla reports record deliveries")
+        self.assertEqual(again, result)
+        self.assertEqual(session.calls, 1)
+        self.assertEqual(len(agent.tool_cache.memory), 1)
+        self.assertEqual(_stored_rows(), 1)
+
+
+class ToolErrorResilienceTest(unittest.IsolatedAsyncioTestCase):
+    async def test_rate_limited_result_is_retried_after_hint(self):
+        agent, session = _agent_with_results(
+            _result("Error: Brave API error: 429 Too Many Requests (retry after 0.05s)", is_error=True),
+            _result("Tesla stock rises"),
+        )
+        agent.mcp_retry.max_attempts = 2
+        agent.tool_cache = MCPResultCache()
+
+        result = await agent._call_mcp_tool("brave_web_search", {"query": "tsla price"})
+
+        self.assertEqual(result, "Tesla stock rises")
+        self.assertEqual(session.calls, 2)
+        self.assertEqual(agent.mcp_retry.backoff(0, MCPToolError("t", "Rate limit exceeded, retry after 3")), 3.0)
+
+    async def test_error_results_open_the_breaker(self):
+        agent, session = _agent_with_results(_result("Brave API error: 503 Service Unavailable", is_error=True))
+        agent.tool_cache = MCPResultCache()
+        agent.mcp_breaker.failure_threshold = 2
+
+        for query in ("a", "b", "c"):
+            self.assertEqual(await agent._call_mcp_tool("brave_web_search", {"query": query}), "")
+
+        self.assertEqual(agent.mcp_breaker.state, "open")
+        self.assertEqual(session.calls, 2)  # 서킷이 열린 뒤에는 호출하지 않음
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,16 @@
+from .deadline import Deadline
+from .resilience import CircuitBreaker, CircuitOpenError, RetryPolicy, hedged
+from .singleflight import SingleFlight
+from .text import normalize_query
+from .ttl_cache import TTLCache
+
+__all__ = [
+    "CircuitBreaker",
+    "CircuitOpenError",
+    "Deadline",
+    "RetryPolicy",
+    "SingleFlight",
+    "TTLCache",
+    "hedged",
+    "normalize_query",
+]
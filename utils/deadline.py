@@ -0,0 +1,48 @@
+import time
+from typing import Optional
+
+
+class Deadline:
+    """
+    요청 단위 마감 시각 (monotonic 기준)
+
+    API 계층에서 만들어 서비스/에이전트로 전달하고, 각 단계는 남은 시간으로
+    호출 제한 시간을 정합니다.
+
+    사용 예시:
+        deadline = Deadline.after(90)
+        await asyncio.wait_for(call(), deadline.timeout(30))
+    """
+
+    def __init__(self, expires_at: float):
+        self.expires_at = expires_at
+
+    @classmethod
+    def after(cls, seconds: float) -> "Deadline":
+        """지금부터 seconds초 뒤에 만료되는 마감 시각"""
+        return cls(time.monotonic() + seconds)
+
+    def remaining(self) -> float:
+        """남은 시간 (초, 만료되었으면 0)"""
+        return max(0.0, self.expires_at - time.monotonic())
+
+    @property
+    def expired(self) -> bool:
+        return self.remaining() <= 0
+
+    def timeout(self, cap: Optional[float] = None, reserve: float = 0.0) -> float:
+        """
+        호출 제한 시간 계산
+
+        Args:
+            cap: 호출 자체의 최대 제한 시간 (None이면 남은 시간 전부)
+            reserve: 이후 단계를 위해 남겨 둘 시간
+
+        Returns:
+            min(cap, 남은 시간 - reserve) (0 이상)
+        """
+        available = max(0.0, self.remaining() - reserve)
+        return available if cap is None else min(cap, available)
+
+    def __repr__(self) -> str:
+        return f"Deadline(remaining={self.remaining():.1f}s)"
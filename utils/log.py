@@ -0,0 +1,185 @@
+"""
+구조화 로깅 (비차단 큐 핸들러 + 요청 ID + 페이로드 샘플링)
+
+요청 경로에서는 QueueHandler가 레코드를 큐에 넣기만 하고,
+실제 포맷/stdout 쓰기는 QueueListener 스레드가 처리합니다.
+AI 전체 응답 같은 큰 페이로드는 LOG_PAYLOAD_SAMPLE_RATE 비율로만 기록합니다.
+
+환경 변수:
+    LOG_LEVEL: 애플리케이션 로그 레벨 (기본 INFO)
+    LOG_FORMAT: json(기본) / text
+    LOG_PAYLOAD_SAMPLE_RATE: 전체 페이로드 기록 비율 0~1 (기본 0)
+    LOG_PAYLOAD_MAX_CHARS: 기록할 페이로드 최대 길이 (기본 2000)
+"""
+import atexit
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import random
+import sys
+import uuid
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from typing import Any, Optional
+
+# 애플리케이션 패키지 로거 (LOG_LEVEL 적용 대상, 그 외 라이브러리는 WARNING 이상만)
+APP_LOGGERS = ("agents", "api", "config", "database", "services", "utils", "main")
+
+REQUEST_ID_HEADER = "x-request-id"
+
+request_id_var: ContextVar[str] = ContextVar("request_id", default="-")
+
+# LogRecord 기본 속성 (JSON 출력 시 extra 필드만 골라내기 위함)
+_RESERVED = set(logging.LogRecord("", 0, "", 0, "", (), None).__dict__) | {"message", "asctime", "request_id"}
+
+_listener: Optional[logging.handlers.QueueListener] = None
+_queue_handler: Optional[logging.handlers.QueueHandler] = None
+_stream_handler: Optional[logging.Handler] = None
+_payload_sample_rate = 0.0
+_payload_max_chars = 2000
+
+
+class RequestIdFilter(logging.Filter):
+    """현재 요청 ID를 레코드에 추가 (호출 스레드/태스크의 컨텍스트에서 실행)"""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        # 큐를 거친 레코드는 리스너 스레드에서 덮어쓰지 않음
+        if not hasattr(record, "request_id"):
+            record.request_id = request_id_var.get()
+        return True
+
+
+class JsonFormatter(logging.Formatter):
+    """한 줄 JSON 로그 (extra로 넘긴 필드 포함)"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "request_id": getattr(record, "request_id", "-"),
+            "msg": record.getMessage(),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RESERVED and not key.startswith("_"):
+                entry[key] = value
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class TextFormatter(logging.Formatter):
+    """사람이 읽는 한 줄 형식 (샘플링된 페이로드는 다음 줄에 출력)"""
+
+    def __init__(self):
+        super().__init__("%(asctime)s %(levelname)s [%(request_id)s] %(name)s: %(message)s")
+
+    def format(self, record: logging.LogRecord) -> str:
+        text = super().format(record)
+        payload = getattr(record, "payload", None)
+        return f"{text}\n{payload}" if payload else text
+
+
+def setup_logging():
+    """
+    로깅 초기화 (여러 번 호출해도 한 번만 설정)
+
+    루트 로거에 QueueHandler를 달고, 리스너 스레드가 stdout으로 출력합니다.
+    """
+    global _listener, _queue_handler, _stream_handler, _payload_sample_rate, _payload_max_chars
+    if _listener is not None:
+        return
+
+    if _stream_handler is None:
+        _payload_sample_rate = min(1.0, max(0.0, float(os.getenv("LOG_PAYLOAD_SAMPLE_RATE", "0"))))
+        _payload_max_chars = int(os.getenv("LOG_PAYLOAD_MAX_CHARS", "2000"))
+
+        _stream_handler = logging.StreamHandler(sys.stdout)
+        _stream_handler.addFilter(RequestIdFilter())
+        text_format = os.getenv("LOG_FORMAT", "json").lower() == "text"
+        _stream_handler.setFormatter(TextFormatter() if text_format else JsonFormatter())
+
+        _queue_handler = logging.handlers.QueueHandler(queue.SimpleQueue())
+        _queue_handler.addFilter(RequestIdFilter())
+
+        logging.getLogger().setLevel(logging.WARNING)
+        level = os.getenv("LOG_LEVEL", "INFO").upper()
+        for name in APP_LOGGERS:
+            logging.getLogger(name).setLevel(level)
+        atexit.register(shutdown_logging)
+
+    logging.getLogger().handlers = [_queue_handler]
+    _listener = logging.handlers.QueueListener(_queue_handler.queue, _stream_handler, respect_handler_level=True)
+    _listener.start()
+
+
+def shutdown_logging():
+    """리스너 스레드 종료 (큐에 남은 레코드는 모두 출력, 이후 로그는 직접 출력)"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+        logging.getLogger().handlers = [_stream_handler]
+
+
+def log_payload(logger: logging.Logger, message: str, payload: Optional[str], **fields: Any):
+    """
+    큰 페이로드(AI 전체 응답 등)를 샘플링하여 기록
+
+    샘플링되지 않은 호출은 길이만 DEBUG로 남기므로 요청 경로 비용이 거의 없습니다.
+
+    Args:
+        logger: 기록할 로거
+        message: 로그 메시지
+        payload: 기록할 텍스트
+        **fields: 함께 기록할 필드 (JSON 형식에서 개별 키로 출력)
+    """
+    payload = payload or ""
+    if _payload_sample_rate and random.random() < _payload_sample_rate:
+        truncated = len(payload) > _payload_max_chars
+        logger.info(
+            message,
+            extra={**fields, "payload": payload[:_payload_max_chars], "payload_chars": len(payload),
+                   "payload_truncated": truncated},
+        )
+    elif logger.isEnabledFor(logging.DEBUG):
+        logger.debug(message, extra={**fields, "payload_chars": len(payload)})
+
+
+class RequestIdMiddleware:
+    """
+    요청마다 상관관계 ID 설정 (ASGI 미들웨어)
+
+    X-Request-ID 헤더가 있으면 그대로 쓰고 없으면 새로 만들어 응답 헤더로 돌려줍니다.
+    요청 처리 중 만든 태스크(백그라운드 갱신 등)도 같은 ID를 물려받습니다.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request_id = ""
+        for name, value in scope.get("headers", []):
+            if name == REQUEST_ID_HEADER.encode():
+                request_id = value.decode("latin-1")[:64]
+                break
+        request_id = request_id or uuid.uuid4().hex[:16]
+        token = request_id_var.set(request_id)
+
+        async def send_with_request_id(message):
+            if message["type"] == "http.response.start":
+                headers = list(message.get("headers", []))
+                headers.append((REQUEST_ID_HEADER.encode(), request_id.encode("latin-1")))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_request_id)
+        finally:
+            request_id_var.reset(token)
@@ -0,0 +1,362 @@
+"""
+Prometheus 텍스트 형식 메트릭 (외부 의존성 없음)
+
+카운터/히스토그램을 프로세스 메모리에 집계하고 render()로 노출 형식(text/plain; version=0.0.4) 문자열을 만듭니다.
+
+uvicorn 워커가 여러 개이면 METRICS_MULTIPROC_DIR(python main.py 실행 시 자동 설정)에
+워커별 스냅샷 파일을 주기적으로 기록하고, 어느 워커가 스크레이프를 받든 모든 파일을 합산해 노출합니다.
+종료된 워커의 파일도 남겨 두므로 카운터는 워커 재시작 후에도 단조 증가합니다.
+
+사용 예시:
+    with span("symbol_resolve"):
+        await resolve()
+    CACHE_EVENTS.inc(cache="analysis_l1", result="hit")
+"""
+import glob
+import json
+import logging
+import math
+import os
+import tempfile
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+
+LabelValues = Tuple[str, ...]
+
+# 워커별 스냅샷 파일 디렉터리 (비어 있으면 프로세스 단독 집계)
+MULTIPROC_DIR_ENV = "METRICS_MULTIPROC_DIR"
+
+logger = logging.getLogger(__name__)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    if not names:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in zip(names, values)) + "}"
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        REGISTRY.register(self)
+
+    def _key(self, labels: Dict[str, str]) -> LabelValues:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name}: 레이블 {self.labelnames} 필요 (받은 값: {tuple(labels)})")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def _header(self) -> List[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(_Metric):
+    """단조 증가 카운터"""
+
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: str):
+        if amount < 0:
+            raise ValueError("카운터는 감소할 수 없습니다")
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def total(self) -> float:
+        """모든 레이블 조합의 합계"""
+        with self._lock:
+            return sum(self._values.values())
+
+    def export(self) -> List[Any]:
+        """스냅샷 파일용 값 목록 ([레이블 값, 값])"""
+        with self._lock:
+            return [[list(key), value] for key, value in self._values.items()]
+
+    def merge(self, merged: Dict[LabelValues, Any], rows: List[Any]):
+        """다른 프로세스의 스냅샷 값을 merged에 더함"""
+        for key, value in rows:
+            key = tuple(key)
+            merged[key] = merged.get(key, 0.0) + value
+
+    def render(self, values: Optional[Dict[LabelValues, Any]] = None) -> List[str]:
+        lines = self._header()
+        if values is None:
+            with self._lock:
+                values = dict(self._values)
+        for key, value in sorted(values.items()):
+            lines.append(f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}")
+        return lines
+
+
+class Histogram(_Metric):
+    """누적 버킷 히스토그램 (_bucket / _sum / _count)"""
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+        self._values: Dict[LabelValues, Tuple[List[int], List[float]]] = {}  # (버킷별 개수, [합계])
+
+    def observe(self, value: float, **labels: str):
+        key = self._key(labels)
+        with self._lock:
+            counts, total = self._values.setdefault(key, ([0] * len(self.buckets), [0.0]))
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[i] += 1
+                    break
+            total[0] += value
+
+    def export(self) -> List[Any]:
+        """스냅샷 파일용 값 목록 ([레이블 값, 버킷별 개수, 합계])"""
+        with self._lock:
+            return [[list(key), list(counts), total[0]] for key, (counts, total) in self._values.items()]
+
+    def merge(self, merged: Dict[LabelValues, Any], rows: List[Any]):
+        """다른 프로세스의 스냅샷 값을 merged에 더함 (버킷 구성이 다르면 무시)"""
+        for key, counts, total in rows:
+            if len(counts) != len(self.buckets):
+                continue
+            current_counts, current_total = merged.setdefault(tuple(key), ([0] * len(self.buckets), [0.0]))
+            for i, count in enumerate(counts):
+                current_counts[i] += count
+            current_total[0] += total
+
+    def render(self, values: Optional[Dict[LabelValues, Any]] = None) -> List[str]:
+        lines = self._header()
+        if values is None:
+            with self._lock:
+                values = {key: (list(counts), list(total)) for key, (counts, total) in self._values.items()}
+        for key, (counts, total) in sorted(values.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets, counts):
+                cumulative += count
+                labels = _format_labels(self.labelnames + ("le",), key + (_format_value(bound),))
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(total[0])}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+class Registry:
+    """메트릭 등록 및 Prometheus 노출 형식 출력 (멀티 프로세스 모드에서는 워커 합산)"""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        # 스냅샷 파일 이름 (pid 재사용 시 이전 워커 파일을 덮어쓰지 않도록 임의 토큰 포함)
+        self._file_id = f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        self._flusher: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    def register(self, metric: _Metric):
+        if metric.name in self._metrics:
+            raise ValueError(f"이미 등록된 메트릭입니다: {metric.name}")
+        self._metrics[metric.name] = metric
+
+    @staticmethod
+    def multiprocess_dir() -> Optional[str]:
+        """워커별 스냅샷 디렉터리 (설정되지 않았으면 None)"""
+        return os.getenv(MULTIPROC_DIR_ENV) or None
+
+    def start(self, interval: Optional[float] = None):
+        """멀티 프로세스 모드이면 스냅샷을 주기적으로 기록하는 스레드 시작 (METRICS_FLUSH_INTERVAL_SECONDS)"""
+        if self.multiprocess_dir() is None or (self._flusher and self._flusher.is_alive()):
+            return
+        if interval is None:
+            interval = float(os.getenv("METRICS_FLUSH_INTERVAL_SECONDS", "2"))
+        self._stop.clear()
+        self._flusher = threading.Thread(target=self._flush_loop, args=(interval,), name="metrics-flush", daemon=True)
+        self._flusher.start()
+
+    def stop(self):
+        """기록 스레드 중단 후 마지막 스냅샷 기록"""
+        self._stop.set()
+        if self._flusher is not None:
+            self._flusher.join(timeout=5)
+            self._flusher = None
+        self.flush()
+
+    def _flush_loop(self, interval: float):
+        while not self._stop.wait(interval):
+            self.flush()
+
+    def flush(self):
+        """현재 프로세스의 스냅샷 파일 기록 (임시 파일 + rename으로 원자적 교체)"""
+        directory = self.multiprocess_dir()
+        if directory is None:
+            return
+        snapshot = {name: metric.export() for name, metric in self._metrics.items()}
+        path = os.path.join(directory, f"metrics_{self._file_id}.json")
+        try:
+            with tempfile.NamedTemporaryFile("w", dir=directory, suffix=".tmp", delete=False) as f:
+                json.dump(snapshot, f)
+            os.replace(f.name, path)
+        except OSError as e:
+            logger.warning("[METRICS] 스냅샷 기록 실패: %s", e)
+
+    def _collect(self, directory: str) -> Dict[str, Dict[LabelValues, Any]]:
+        """모든 워커 스냅샷 파일 합산 (현재 프로세스는 최신 값으로 먼저 기록)"""
+        self.flush()
+        merged: Dict[str, Dict[LabelValues, Any]] = {name: {} for name in self._metrics}
+        for path in glob.glob(os.path.join(directory, "metrics_*.json")):
+            try:
+                with open(path, encoding="utf-8") as f:
+                    snapshot = json.load(f)
+            except (OSError, ValueError) as e:
+                logger.warning("[METRICS] 스냅샷 읽기 실패 (%s): %s", os.path.basename(path), e)
+                continue
+            for name, rows in snapshot.items():
+                metric = self._metrics.get(name)
+                if metric is not None:
+                    metric.merge(merged[name], rows)
+        return merged
+
+    def render(self) -> str:
+        directory = self.multiprocess_dir()
+        merged = self._collect(directory) if directory else None
+        lines: List[str] = []
+        for name, metric in self._metrics.items():
+            lines.extend(metric.render(merged[name] if merged is not None else None))
+        return "\n".join(lines) + "\n"
+
+
+def prepare_multiprocess_dir() -> str:
+    """
+    워커 기동 전 상위 프로세스에서 호출 - 워커 간 메트릭 합산 디렉터리 준비
+
+    METRICS_MULTIPROC_DIR가 없으면 임시 디렉터리를 만들고, 있으면 이전 실행의 스냅샷을 삭제합니다.
+    환경 변수로 설정하므로 이후 생성되는 워커 프로세스가 같은 디렉터리를 사용합니다.
+
+    Returns:
+        디렉터리 경로
+    """
+    directory = os.getenv(MULTIPROC_DIR_ENV) or tempfile.mkdtemp(prefix="stock-metrics-")
+    os.makedirs(directory, exist_ok=True)
+    for path in glob.glob(os.path.join(directory, "metrics_*.json")):
+        os.remove(path)
+    os.environ[MULTIPROC_DIR_ENV] = directory
+    return directory
+
+
+REGISTRY = Registry()
+
+# ============================================================
+# 애플리케이션 메트릭
+# ============================================================
+
+STAGE_DURATION = Histogram(
+    "stock_stage_duration_seconds",
+    "분석 요청 단계별 소요 시간 (symbol_resolve, db_cache_lookup, mcp_init, analysis, tool_round, tool_call, parse, db_save, job)",
+    ["stage"],
+)
+CACHE_EVENTS = Counter(
+    "stock_cache_events_total",
+    "캐시 계층별 조회 결과 (hit/miss/stale)",
+    ["cache", "result"],
+)
+TOOL_CALLS = Counter(
+    "stock_tool_calls_total",
+    "MCP 도구 호출 수 (status: ok/error/rate_limited/timeout/circuit_open)",
+    ["tool", "status"],
+)
+TOOL_CALLS_PER_ANALYSIS = Histogram(
+    "stock_tool_calls_per_analysis",
+    "분석 1회당 MCP 도구 호출 수",
+    buckets=(0, 1, 2, 3, 5, 8, 13, 21),
+)
+TOOL_ROUNDS_PER_ANALYSIS = Histogram(
+    "stock_tool_rounds_per_analysis",
+    "분석 1회당 도구 호출 라운드 수",
+    buckets=(0, 1, 2, 3, 4, 5, 8),
+)
+JOB_EVENTS = Counter(
+    "stock_jobs_total",
+    "비동기 분석 작업 이벤트 (event: submitted/deduplicated/succeeded/failed/stale)",
+    ["event"],
+)
+FORCED_FINAL_ANSWERS = Counter(
+    "stock_forced_final_answers_total",
+    "도구 루프를 중단하고 최종 답변을 강제한 횟수 (reason: max_rounds/deadline/timeout)",
+    ["reason"],
+)
+OPENAI_REQUEST_DURATION = Histogram(
+    "openai_request_duration_seconds",
+    "OpenAI Chat Completion 호출 소요 시간 (프롬프트 템플릿별)",
+    ["prompt", "model"],
+)
+MODEL_FALLBACKS = Counter(
+    "openai_model_fallback_total",
+    "주 모델 응답 지연으로 대체 모델을 사용한 호출 수 (단계별)",
+    ["stage"],
+)
+OPENAI_TOKENS = Counter(
+    "openai_tokens_total",
+    "OpenAI 토큰 사용량 (type: prompt/cached/completion)",
+    ["prompt", "model", "type"],
+)
+OPENAI_COST = Counter(
+    "openai_cost_usd_total",
+    "OpenAI 예상 비용 (USD, OPENAI_PRICE_* 단가 기준)",
+    ["prompt", "model"],
+)
+UPSTREAM_RETRIES = Counter(
+    "upstream_retries_total",
+    "일시적 오류로 재시도한 횟수 (target: openai/mcp)",
+    ["target"],
+)
+CIRCUIT_TRANSITIONS = Counter(
+    "circuit_breaker_transitions_total",
+    "서킷 브레이커 상태 전환 횟수 (state: open/half_open/closed)",
+    ["name", "state"],
+)
+HEDGED_REQUESTS = Counter(
+    "hedged_requests_total",
+    "헤지 요청을 보낸 호출 중 먼저 성공한 쪽 (winner: primary/hedge)",
+    ["label", "winner"],
+)
+HTTP_REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds",
+    "HTTP 요청 처리 시간 (스트리밍 응답은 헤더 전송까지)",
+    ["method", "route", "status"],
+)
+
+
+@contextmanager
+def span(stage: str) -> Iterator[None]:
+    """블록 실행 시간을 stock_stage_duration_seconds{stage}에 기록 (예외가 나도 기록)"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        STAGE_DURATION.observe(time.perf_counter() - start, stage=stage)
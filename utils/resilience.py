@@ -0,0 +1,239 @@
+"""
+업스트림 호출 복원력 헬퍼 (재시도 / 헤징 / 서킷 브레이커)
+
+외부 의존성 없이 asyncio만 사용하며, 어떤 오류를 일시적 장애로 볼지는 호출부가 판단합니다.
+
+사용 예시:
+    breaker = CircuitBreaker("openai")
+    retry = RetryPolicy("openai", max_attempts=3)
+    result = await breaker.call(lambda: retry.run(call, is_transient), is_transient)
+    result = await hedged(call, delay=1.5)
+"""
+import asyncio
+import logging
+import random
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional, TypeVar
+
+from .deadline import Deadline
+from .metrics import CIRCUIT_TRANSITIONS, HEDGED_REQUESTS, UPSTREAM_RETRIES
+
+T = TypeVar("T")
+
+logger = logging.getLogger(__name__)
+
+
+class CircuitOpenError(RuntimeError):
+    """서킷이 열려 있어 호출하지 않고 즉시 실패"""
+
+    def __init__(self, name: str, retry_after: float):
+        super().__init__(f"{name} 업스트림 장애로 호출을 일시 중단했습니다 ({retry_after:.0f}초 후 재시도)")
+        self.name = name
+        self.retry_after = retry_after
+
+
+class RetryPolicy:
+    """
+    지수 백오프 + full jitter 재시도
+
+    Retry-After를 알 수 있는 오류는 그 시간만큼 기다립니다. 요청된 시간이 max_delay나
+    남은 마감 시간보다 길면 더 일찍 재시도해 봐야 다시 거절되므로 재시도하지 않고 오류를 그대로 발생시킵니다
+    (서킷 브레이커 안에서 호출하면 업스트림 장애로 집계됨).
+    """
+
+    def __init__(
+        self,
+        name: str,
+        max_attempts: int = 3,
+        base_delay: float = 0.5,
+        max_delay: float = 8.0,
+        retry_after: Optional[Callable[[BaseException], Optional[float]]] = None,
+    ):
+        """
+        Args:
+            name: 메트릭 / 로그용 대상 이름
+            max_attempts: 최초 호출을 포함한 최대 시도 횟수
+            base_delay: 첫 재시도 대기 상한 (초, 시도마다 두 배)
+            max_delay: 재시도 대기 최대값 (초)
+            retry_after: 오류에서 Retry-After(초)를 꺼내는 함수
+        """
+        self.name = name
+        self.max_attempts = max(1, max_attempts)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.retry_after = retry_after
+
+    def backoff(self, attempt: int, error: Optional[BaseException] = None) -> float:
+        """attempt번째(0부터) 재시도 전 대기 시간 (Retry-After가 있으면 그 값, max_delay로 줄이지 않음)"""
+        hinted = self.retry_after(error) if self.retry_after and error is not None else None
+        if hinted is not None:
+            return max(0.0, hinted)
+        return random.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+
+    async def run(
+        self,
+        fn: Callable[[], Awaitable[T]],
+        is_transient: Callable[[BaseException], bool],
+        deadline: Optional[Deadline] = None,
+    ) -> T:
+        """
+        일시적 오류면 재시도하며 호출
+
+        Args:
+            fn: 호출할 코루틴 팩토리 (시도마다 새로 호출)
+            is_transient: 재시도할 오류인지 판단하는 함수
+            deadline: 이 호출의 마감 시각 (대기 후 재시도할 시간이 남지 않으면 재시도하지 않음)
+
+        Returns:
+            fn의 결과 (마지막 시도까지 실패하거나 대기 한도를 넘으면 마지막 오류를 그대로 발생)
+        """
+        attempt = 0
+        while True:
+            try:
+                return await fn()
+            except Exception as e:
+                if attempt + 1 >= self.max_attempts or not is_transient(e):
+                    raise
+                delay = self.backoff(attempt, e)
+                if delay > self.max_delay or (deadline is not None and delay >= deadline.remaining()):
+                    logger.warning(
+                        "[RETRY] %s 재시도 대기 %.2f초가 한도(최대 %.2f초, 남은 시간 %s)를 넘어 재시도 중단: %s",
+                        self.name, delay, self.max_delay,
+                        f"{deadline.remaining():.2f}초" if deadline is not None else "제한 없음", e,
+                    )
+                    raise
+                logger.warning(
+                    "[RETRY] %s 일시적 오류 (%d/%d), %.2f초 후 재시도: %s",
+                    self.name, attempt + 1, self.max_attempts, delay, e,
+                )
+                UPSTREAM_RETRIES.inc(target=self.name)
+                await asyncio.sleep(delay)
+            attempt += 1
+
+
+class CircuitBreaker:
+    """
+    연속 실패 기반 서킷 브레이커 (closed → open → half_open)
+
+    failure_threshold번 연속으로 일시적 장애가 나면 recovery_timeout 동안 호출을 막고
+    CircuitOpenError로 즉시 실패합니다. 이후 한 건만 시험 호출하여 성공하면 닫습니다.
+    """
+
+    CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+    def __init__(self, name: str, failure_threshold: int = 5, recovery_timeout: float = 30.0):
+        """
+        Args:
+            name: 메트릭 / 로그용 대상 이름
+            failure_threshold: 서킷을 여는 연속 실패 횟수
+            recovery_timeout: 열린 뒤 시험 호출까지 대기 시간 (초)
+        """
+        self.name = name
+        self.failure_threshold = max(1, failure_threshold)
+        self.recovery_timeout = recovery_timeout
+        self.state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probing = False
+
+    @property
+    def is_open(self) -> bool:
+        """호출이 막혀 있는지 (시험 호출 대기 중 포함)"""
+        return self.state != self.CLOSED and not self._probe_ready()
+
+    def _probe_ready(self) -> bool:
+        return (
+            self.state == self.OPEN and time.monotonic() - self._opened_at >= self.recovery_timeout
+        ) or (self.state == self.HALF_OPEN and not self._probing)
+
+    def _transition(self, state: str):
+        if state != self.state:
+            logger.warning("[CIRCUIT] %s: %s → %s", self.name, self.state, state)
+            CIRCUIT_TRANSITIONS.inc(name=self.name, state=state)
+            self.state = state
+
+    def before_call(self):
+        """호출 가능 여부 확인 (막혀 있으면 CircuitOpenError)"""
+        if self.state == self.CLOSED:
+            return
+        if self._probe_ready():
+            self._transition(self.HALF_OPEN)
+            self._probing = True
+            return
+        raise CircuitOpenError(self.name, max(0.0, self.recovery_timeout - (time.monotonic() - self._opened_at)))
+
+    def record_success(self):
+        self._failures = 0
+        self._probing = False
+        self._transition(self.CLOSED)
+
+    def record_failure(self):
+        self._failures += 1
+        self._probing = False
+        if self.state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+            self._opened_at = time.monotonic()
+            self._transition(self.OPEN)
+
+    async def call(self, fn: Callable[[], Awaitable[T]], is_failure: Callable[[BaseException], bool]) -> T:
+        """
+        서킷 상태를 확인하고 호출
+
+        Args:
+            fn: 호출할 코루틴 팩토리
+            is_failure: 업스트림 장애로 집계할 오류인지 판단하는 함수 (요청 오류 등은 제외)
+        """
+        self.before_call()
+        try:
+            result = await fn()
+        except asyncio.CancelledError:
+            self._probing = False
+            raise
+        except Exception as e:
+            if is_failure(e):
+                self.record_failure()
+            else:
+                self._probing = False
+            raise
+        self.record_success()
+        return result
+
+    def stats(self) -> Dict[str, Any]:
+        """서킷 상태 / 연속 실패 횟수"""
+        return {"state": self.state, "consecutive_failures": self._failures}
+
+
+async def hedged(fn: Callable[[], Awaitable[T]], delay: float, label: str = "request") -> T:
+    """
+    헤지 요청: delay초 안에 끝나지 않으면 같은 요청을 하나 더 보내고 먼저 성공한 결과 사용
+
+    한쪽이 실패하면 다른 쪽 결과를 기다리고, 둘 다 실패하면 먼저 발생한 오류를 발생시킵니다.
+    남은 요청은 취소합니다. 멱등한 짧은 호출(심볼 변환 등)에만 사용하세요.
+
+    Args:
+        fn: 호출할 코루틴 팩토리
+        delay: 두 번째 요청을 보내기 전 대기 시간 (초)
+        label: 메트릭 / 로그용 이름
+    """
+    primary = asyncio.ensure_future(fn())
+    hedge: Optional[asyncio.Future] = None
+    try:
+        done, _ = await asyncio.wait({primary}, timeout=delay)
+        if done:
+            return primary.result()
+
+        logger.info("[HEDGE] %s %.2f초 내 응답 없음 - 헤지 요청 전송", label, delay)
+        hedge = asyncio.ensure_future(fn())
+        pending = {primary, hedge}
+        first_error: Optional[BaseException] = None
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is None:
+                    HEDGED_REQUESTS.inc(label=label, winner="primary" if task is primary else "hedge")
+                    return task.result()
+                first_error = first_error or task.exception()
+        raise first_error
+    finally:
+        for task in (primary, hedge):
+            if task is not None and not task.done():
+                task.cancel()
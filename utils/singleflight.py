@@ -0,0 +1,55 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable, TypeVar
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    """
+    동일 키에 대한 동시 비동기 작업을 하나로 합치는 헬퍼 (in-process single-flight)
+
+    같은 키로 실행 중인 작업이 있으면 새 작업을 시작하지 않고 기존(리더) 작업의
+    결과를 함께 기다립니다. 작업은 별도 태스크로 실행되므로 리더 요청이 취소되어도
+    나머지 대기자(팔로워)에게는 결과가 전달됩니다.
+
+    사용 예시:
+        flight = SingleFlight()
+        result = await flight.do("TSLA", lambda: analyze("TSLA"))
+    """
+
+    def __init__(self):
+        self._calls: Dict[Hashable, asyncio.Task] = {}
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[T]]) -> T:
+        """
+        키 단위로 중복 제거하여 작업 실행
+
+        Args:
+            key: 중복 제거 키 (예: 주식 심볼)
+            fn: 실제 작업을 수행하는 코루틴 팩토리
+
+        Returns:
+            작업 결과 (리더/팔로워 모두 동일한 결과)
+        """
+        task = self._calls.get(key)
+        # 완료됐지만 아직 정리 콜백(_forget)이 실행되지 않은 작업의 결과는 재사용하지 않음
+        if task is None or task.done():
+            task = asyncio.ensure_future(fn())
+            self._calls[key] = task
+            task.add_done_callback(lambda t, k=key: self._forget(k, t))
+
+        # shield: 대기자 한 명이 취소되어도 공유 작업은 계속 진행
+        return await asyncio.shield(task)
+
+    def in_flight(self, key: Hashable) -> bool:
+        """해당 키의 작업이 실행 중인지 여부"""
+        task = self._calls.get(key)
+        return task is not None and not task.done()
+
+    def _forget(self, key: Hashable, task: asyncio.Task[Any]):
+        """완료된 작업 제거 (같은 키로 새 작업이 등록된 경우는 유지)"""
+        if self._calls.get(key) is task:
+            del self._calls[key]
+        # 모든 대기자가 취소된 경우 'exception was never retrieved' 경고 방지
+        if not task.cancelled():
+            task.exception()
@@ -0,0 +1,38 @@
+import re
+import unicodedata
+
+# 검색어 끝에 붙는 의미 없는 접미어 (붙여 쓴 한글 접미어도 제거)
+_KO_SUFFIXES = ("주가", "주식", "종목", "시세")
+_EN_SUFFIXES = ("stock price", "share price", "stocks", "stock", "shares", "price")
+
+_PUNCTUATION = re.compile(r"[^\w&+]+")  # &, + 는 기업명 일부로 유지 (AT&T, LG U+)
+_EN_SUFFIX_PATTERN = re.compile(r"\s+(?:" + "|".join(re.escape(s) for s in _EN_SUFFIXES) + r")$")
+
+
+def normalize_query(text: str) -> str:
+    """
+    사용자 입력을 심볼 매핑 캐시 키로 정규화
+
+    - 유니코드 NFKC 정규화 (한글 NFC/NFD, 전각 문자 통일) + casefold
+    - 문장부호를 공백으로 바꾸고 연속 공백을 하나로 정리
+    - 끝에 붙은 "주가", "주식", "stock" 등 접미어 제거 (입력 전체가 접미어이면 유지)
+
+    Args:
+        text: 사용자 입력 (예: " Tesla 주가", "TSLA stock")
+
+    Returns:
+        정규화된 키 (예: "tesla", "tsla")
+    """
+    normalized = unicodedata.normalize("NFKC", text).casefold()
+    normalized = _PUNCTUATION.sub(" ", normalized)
+    normalized = " ".join(normalized.split())
+
+    while True:
+        stripped = _EN_SUFFIX_PATTERN.sub("", normalized)
+        for suffix in _KO_SUFFIXES:
+            if stripped.endswith(suffix):
+                stripped = stripped[: -len(suffix)].rstrip()
+                break
+        if not stripped or stripped == normalized:
+            return normalized
+        normalized = stripped